@@ -1,39 +1,113 @@
-from quart import Quart, jsonify
-from FPV.API.routes.path.clean import clean_bp
-from FPV.API.routes.path.isValid import isvalid_bp
-from FPV.API.routes.path.dynamic import dynamic_bp
-
-app = Quart(__name__)
-
-# Register blueprints
-app.register_blueprint(clean_bp, url_prefix="/api/v1")
-app.register_blueprint(isvalid_bp, url_prefix="/api/v1")
-app.register_blueprint(dynamic_bp, url_prefix="/api/v1")
-
-@app.route("/")
-async def root():
-    return jsonify({
-        "message": "File Path Validator API (Quart)",
-        "version": "1.0.0",
-        "endpoints": {
-            "clean": "/api/v1/clean",
-            "validate": "/api/v1/isValid",
-            "dynamic": {
-                "add_part": "/api/v1/path/add",
-                "remove_part": "/api/v1/path/remove",
-                "build_path": "/api/v1/path/build"
-            }
-        },
-        "supported_services": [
-            "windows", "macos", "linux", 
-            "dropbox", "box", "egnyte", 
-            "onedrive", "sharepoint", "sharefile"
-        ]
-    })
-
-@app.route("/health")
-async def health_check():
-    return jsonify({"status": "healthy"})
+"""
+Quart application for the FPV HTTP API.
+
+Quart and the route blueprints are imported by `create_app()`, not at module
+import, so tools that only import FPV (or FPV.API.metrics) never load the web
+framework. `from FPV.API.api import app` still works: the module-level `app`
+is built on first access.
+"""
+
+import os
+import time
+
+from FPV.API import metrics
+
+_app = None
+
+
+def create_app():
+    """
+    Build the Quart app with every blueprint and the metrics handlers registered.
+
+    Raises:
+        RuntimeError: If FPV_STATE_SECRET is not set. State tokens must verify on
+            every worker and after a restart, so the API never signs with a random key.
+    """
+    secret = os.environ.get("FPV_STATE_SECRET")
+    if not secret:
+        raise RuntimeError("Set FPV_STATE_SECRET to the key used to sign state tokens before starting the API.")
+    from quart import Quart, jsonify, request, g, Response
+    from FPV.API.routes.path.clean import clean_bp
+    from FPV.API.routes.path.isValid import isvalid_bp
+    from FPV.API.routes.path.dynamic import dynamic_bp, service_mapping
+    from FPV.API.routes.path.ws import ws_bp
+
+    app = Quart(__name__)
+    app.config["FPV_STATE_SECRET"] = secret
+
+    # Register blueprints
+    app.register_blueprint(clean_bp, url_prefix="/api/v1")
+    app.register_blueprint(isvalid_bp, url_prefix="/api/v1")
+    app.register_blueprint(dynamic_bp, url_prefix="/api/v1")
+    app.register_blueprint(ws_bp, url_prefix="/api/v1")
+
+    @app.before_request
+    async def start_request_timer():
+        g.request_start = time.perf_counter()
+        metrics.requests_in_flight.inc()
+
+    @app.after_request
+    async def record_request_metrics(response):
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        # Only known services become label values, so request bodies can't grow the label set.
+        service = "unknown"
+        if request.method == "POST":
+            data = await request.get_json(silent=True)
+            value = data.get("service") if isinstance(data, dict) else None
+            if isinstance(value, str) and value.lower() in service_mapping:
+                service = value.lower()
+        metrics.requests_total.inc(route=route, method=request.method, status=response.status_code)
+        metrics.request_seconds.observe(time.perf_counter() - g.request_start, route=route, service=service)
+        return response
+
+    @app.teardown_request
+    async def finish_request(exc):
+        metrics.requests_in_flight.dec()
+
+    @app.route("/")
+    async def root():
+        return jsonify({
+            "message": "File Path Validator API (Quart)",
+            "version": "1.0.0",
+            "endpoints": {
+                "clean": "/api/v1/clean",
+                "validate": "/api/v1/isValid",
+                "dynamic": {
+                    "add_part": "/api/v1/path/add",
+                    "remove_part": "/api/v1/path/remove",
+                    "rename_part": "/api/v1/path/rename",
+                    "insert_part": "/api/v1/path/insert",
+                    "build_path": "/api/v1/path/build",
+                    "websocket": "/api/v1/path/ws"
+                },
+                "metrics": "/metrics"
+            },
+            "supported_services": [
+                "windows", "macos", "linux", 
+                "dropbox", "box", "egnyte", 
+                "onedrive", "sharepoint", "sharefile"
+            ]
+        })
+
+    @app.route("/health")
+    async def health_check():
+        return jsonify({"status": "healthy"})
+
+    @app.route("/metrics")
+    async def metrics_endpoint():
+        return Response(metrics.registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+    return app
+
+
+def __getattr__(name):
+    global _app
+    if name == "app":
+        if _app is None:
+            _app = create_app()
+        return _app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8000, debug=True)
+    create_app().run(host="0.0.0.0", port=8000, debug=True)
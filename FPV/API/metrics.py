@@ -0,0 +1,193 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Nothing here depends on Quart or on an external client library, so the
+registry can be used (and tested) without the web framework installed.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from FPV.Helpers.instrumentation import RuleHook
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_number(value) -> str:
+    if isinstance(value, float) and value == float("inf"):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames=()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def header(self) -> list:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_number(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            series = self._values.get(key)
+            if series is None:
+                # Per-bucket (non-cumulative) counts, then sum and count.
+                series = self._values[key] = [[0] * (len(self.buckets) + 1), 0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._values.get(self._key(labels))
+        return series[2] if series else 0
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, (bucket_counts, total, count) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_number(bound)}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them together for the /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames=()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class RuleMetricsHook(RuleHook):
+    """`FPV_Base.rule_hook` implementation that accumulates time spent per rule."""
+
+    def __init__(self, seconds: Counter, calls: Counter):
+        self.seconds = seconds
+        self.calls = calls
+
+    def record(self, rule, service, part_type, action, elapsed_ns, produced):
+        self.seconds.inc(elapsed_ns / 1e9, service=service, rule=rule, action=action)
+        self.calls.inc(service=service, rule=rule, action=action, produced=str(produced).lower())
+
+
+registry = MetricsRegistry()
+
+requests_total = registry.counter(
+    "fpv_http_requests_total", "HTTP requests handled.", ("route", "method", "status"))
+request_seconds = registry.histogram(
+    "fpv_http_request_duration_seconds", "HTTP request latency by route and service.", ("route", "service"))
+requests_in_flight = registry.gauge(
+    "fpv_http_requests_in_flight", "Requests accepted but not yet answered.")
+stage_seconds = registry.histogram(
+    "fpv_stage_duration_seconds", "Time spent in individual request stages such as JSON parsing and from_state.", ("stage",))
+batch_size = registry.histogram(
+    "fpv_batch_size", "Number of paths or parts handled by one request.", ("route",), buckets=SIZE_BUCKETS)
+cache_lookups = registry.counter(
+    "fpv_cache_lookups_total", "Cache lookups by cache and result (hit or miss).", ("cache", "result"))
+websocket_message_seconds = registry.histogram(
+    "fpv_websocket_message_duration_seconds", "Time to apply one websocket operation.", ("op",))
+rule_seconds = registry.counter(
+    "fpv_rule_seconds_total", "Cumulative time spent in each process_* rule.", ("service", "rule", "action"))
+rule_calls = registry.counter(
+    "fpv_rule_calls_total", "Rule invocations, split by whether they produced an issue or action.", ("service", "rule", "action", "produced"))
+
+rule_hook = RuleMetricsHook(rule_seconds, rule_calls)
+
+
+@contextmanager
+def time_stage(stage: str):
+    """Observe the duration of a block in fpv_stage_duration_seconds."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stage_seconds.observe(time.perf_counter() - start, stage=stage)
+
+
+def record_cache_lookup(cache: str, hit: bool, count: int = 1):
+    """Count cache lookups so hit rates can be derived from fpv_cache_lookups_total."""
+    if count:
+        cache_lookups.inc(count, cache=cache, result="hit" if hit else "miss")
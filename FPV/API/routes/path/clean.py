@@ -1,11 +1,13 @@
 from quart import Blueprint, request, jsonify
 import importlib
+from FPV.API import metrics
 
 clean_bp = Blueprint('clean', __name__)
 
 @clean_bp.route('/clean', methods=['POST'])
 async def clean_path():
-    data = await request.get_json()
+    with metrics.time_stage("parse_json"):
+        data = await request.get_json()
     service = data.get('service', '').lower()
     path = data.get('path')
     relative = data.get('relative', True)
@@ -29,7 +31,8 @@ async def clean_path():
 
     fpv_module = importlib.import_module("FPV.Helpers")
     fpv_class = getattr(fpv_module, service_mapping[service])
-    kwargs = {"auto_clean": False, "auto_validate": False, "relative": relative, "file_added": file_added}
+    kwargs = {"auto_clean": False, "auto_validate": False, "relative": relative, "file_added": file_added,
+              "rule_hook": metrics.rule_hook}
     if sep:
         kwargs["sep"] = sep
     try:
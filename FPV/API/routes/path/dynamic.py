@@ -1,5 +1,6 @@
-from quart import Blueprint, request, jsonify
+from quart import Blueprint, current_app, request, jsonify
 import importlib
+from FPV.API import metrics
 
 dynamic_bp = Blueprint('dynamic', __name__)
 service_mapping = {
@@ -16,11 +17,13 @@ service_mapping = {
 
 @dynamic_bp.route('/path/add', methods=['POST'])
 async def add_path_part():
-    data = await request.get_json()
+    with metrics.time_stage("parse_json"):
+        data = await request.get_json()
     service = data.get('service', '').lower()
     base_path = data.get('base_path', '')
     parts_to_add = data.get('parts', [])
     existing_errors = data.get('errors', [])
+    state_token = data.get('state')
     validate = data.get('validate', True)
     relative = data.get('relative', True)
     file_added = data.get('file_added', False)
@@ -49,12 +52,16 @@ async def add_path_part():
         fpv_class = getattr(fpv_module, service_mapping[service])
         
         # Create validator from existing state to avoid revalidation
-        kwargs = {"relative": relative, "file_added": file_added}
+        kwargs = {"relative": relative, "file_added": file_added, "rule_hook": metrics.rule_hook}
         if sep:
             kwargs["sep"] = sep
             
-        validator = fpv_class.from_state(base_path, existing_errors=existing_errors, **kwargs)
+        with metrics.time_stage("from_state"):
+            validator = fpv_class.from_state(base_path, existing_errors=existing_errors, state_token=state_token,
+                                             secret=current_app.config["FPV_STATE_SECRET"], **kwargs)
         
+        metrics.batch_size.observe(len(parts_to_add), route="/path/add")
+
         # Add parts one by one with incremental validation
         new_errors = []
         for i, part in enumerate(parts_to_add):
@@ -75,6 +82,7 @@ async def add_path_part():
             "new_errors": new_errors,
             "all_errors": all_errors,
             "path_parts": [part["part"] for part in validator._path_helper.parts],
+            "state": validator.to_state_token(secret=current_app.config["FPV_STATE_SECRET"]),
             "error": None
         })
         
@@ -89,11 +97,13 @@ async def add_path_part():
 
 @dynamic_bp.route('/path/remove', methods=['POST'])
 async def remove_path_part():
-    data = await request.get_json()
+    with metrics.time_stage("parse_json"):
+        data = await request.get_json()
     service = data.get('service', '').lower()
     base_path = data.get('base_path', '')
     part_index = data.get('part_index')
     existing_errors = data.get('errors', [])
+    state_token = data.get('state')
     relative = data.get('relative', True)
     file_added = data.get('file_added', False)
     sep = data.get('sep', None)
@@ -119,11 +129,13 @@ async def remove_path_part():
         fpv_class = getattr(fpv_module, service_mapping[service])
         
         # Create validator from existing state
-        kwargs = {"relative": relative, "file_added": file_added}
+        kwargs = {"relative": relative, "file_added": file_added, "rule_hook": metrics.rule_hook}
         if sep:
             kwargs["sep"] = sep
             
-        validator = fpv_class.from_state(base_path, existing_errors=existing_errors, **kwargs)
+        with metrics.time_stage("from_state"):
+            validator = fpv_class.from_state(base_path, existing_errors=existing_errors, state_token=state_token,
+                                             secret=current_app.config["FPV_STATE_SECRET"], **kwargs)
         
         # Remove the specified part with automatic error cleanup
         if part_index < len(validator._path_helper.parts):
@@ -140,6 +152,7 @@ async def remove_path_part():
             "remaining_errors": remaining_errors,
             "removed_part": removed_part,
             "path_parts": [part["part"] for part in validator._path_helper.parts],
+            "state": validator.to_state_token(secret=current_app.config["FPV_STATE_SECRET"]),
             "error": None
         })
         
@@ -151,13 +164,106 @@ async def remove_path_part():
             "error": str(e)
         }), 500
 
+@dynamic_bp.route('/path/rename', methods=['POST'])
+async def rename_path_part():
+    """Rename one part in place; only that part is revalidated."""
+    return await _edit_path_part("rename")
+
+@dynamic_bp.route('/path/insert', methods=['POST'])
+async def insert_path_part():
+    """Insert a folder part before part_index; later parts keep their issues, shifted by one."""
+    return await _edit_path_part("insert")
+
+async def _edit_path_part(op):
+    with metrics.time_stage("parse_json"):
+        data = await request.get_json()
+    service = data.get('service', '').lower()
+    base_path = data.get('base_path', '')
+    part_index = data.get('part_index')
+    part = data.get('part')
+    existing_errors = data.get('errors', [])
+    state_token = data.get('state')
+    relative = data.get('relative', True)
+    file_added = data.get('file_added', False)
+    sep = data.get('sep', None)
+
+    if service not in service_mapping:
+        return jsonify({
+            "success": False,
+            "updated_path": "",
+            "new_errors": [],
+            "all_errors": [],
+            "error": f"Unsupported service: {service}"
+        }), 400
+
+    if part_index is None or part is None:
+        return jsonify({
+            "success": False,
+            "updated_path": base_path,
+            "new_errors": [],
+            "all_errors": existing_errors,
+            "error": "part_index and part are required"
+        }), 400
+
+    try:
+        fpv_module = importlib.import_module("FPV.Helpers")
+        fpv_class = getattr(fpv_module, service_mapping[service])
+
+        kwargs = {"relative": relative, "file_added": file_added, "rule_hook": metrics.rule_hook}
+        if sep:
+            kwargs["sep"] = sep
+
+        with metrics.time_stage("from_state"):
+            validator = fpv_class.from_state(base_path, existing_errors=existing_errors, state_token=state_token,
+                                             secret=current_app.config["FPV_STATE_SECRET"], **kwargs)
+
+        length_issues_before = [issue for issue in validator.get_logs()["issues"] if issue.get("category") == "PATH_LENGTH"]
+        if op == "rename":
+            validator.rename_part(part_index, part)
+        else:
+            validator.insert_part(part_index, part)
+
+        all_errors = validator.get_logs()["issues"]
+        new_errors = [issue for issue in all_errors
+                      if issue.get("details", {}).get("index") == part_index
+                      or (issue.get("category") == "PATH_LENGTH" and issue not in length_issues_before)]
+
+        return jsonify({
+            "success": True,
+            "updated_path": validator.get_full_path(),
+            "new_errors": new_errors,
+            "all_errors": all_errors,
+            "path_parts": [part["part"] for part in validator._path_helper.parts],
+            "state": validator.to_state_token(secret=current_app.config["FPV_STATE_SECRET"]),
+            "error": None
+        })
+
+    except (IndexError, ValueError) as e:
+        # Out-of-range indexes, inserts before an absolute root or after a file, bad tokens
+        return jsonify({
+            "success": False,
+            "updated_path": base_path,
+            "new_errors": [],
+            "all_errors": existing_errors,
+            "error": str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "updated_path": "",
+            "new_errors": [],
+            "all_errors": existing_errors,
+            "error": str(e)
+        }), 500
+
 @dynamic_bp.route('/path/build', methods=['POST'])
 async def build_path_incrementally():
     """
     Build a path incrementally with full validation tracking.
     This is useful for building paths step by step while maintaining error state.
     """
-    data = await request.get_json()
+    with metrics.time_stage("parse_json"):
+        data = await request.get_json()
     service = data.get('service', '').lower()
     root_path = data.get('root_path', '')
     path_parts = data.get('path_parts', [])
@@ -179,12 +285,15 @@ async def build_path_incrementally():
         fpv_class = getattr(fpv_module, service_mapping[service])
         
         # Create validator with root path
-        kwargs = {"relative": relative, "file_added": file_added}
+        kwargs = {"relative": relative, "file_added": file_added, "rule_hook": metrics.rule_hook}
         if sep:
             kwargs["sep"] = sep
             
-        validator = fpv_class.from_state(root_path, **kwargs)
+        with metrics.time_stage("from_state"):
+            validator = fpv_class.from_state(root_path, **kwargs)
         
+        metrics.batch_size.observe(len(path_parts), route="/path/build")
+
         step_errors = []
         all_errors = []
         
@@ -208,6 +317,7 @@ async def build_path_incrementally():
             "all_errors": all_errors,
             "step_errors": step_errors,
             "path_parts": [part["part"] for part in validator._path_helper.parts],
+            "state": validator.to_state_token(secret=current_app.config["FPV_STATE_SECRET"]),
             "error": None
         })
         
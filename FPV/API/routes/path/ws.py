@@ -0,0 +1,148 @@
+from quart import Blueprint, websocket
+import importlib
+import json
+import time
+
+from FPV.API import metrics
+from FPV.API.routes.path.dynamic import service_mapping
+
+ws_bp = Blueprint('ws', __name__)
+
+
+def _issue_key(issue: dict, shift=None) -> str:
+    """
+    Hashable identity for an issue so two snapshots can be diffed by value.
+    `shift` maps a part index from before an edit to after it (None if the part is gone).
+    """
+    details = issue.get("details")
+    if shift is not None and isinstance(details, dict) and "index" in details:
+        issue = dict(issue, details=dict(details, index=shift(details["index"])))
+    return json.dumps(issue, sort_keys=True, default=str)
+
+
+def _snapshot(validator) -> list:
+    return [_issue_key(issue) for issue in validator.get_logs()["issues"]]
+
+
+def _diff(before: list, validator, shift=None):
+    """
+    Return (new_errors, removed_errors) between a snapshot and the validator's current issues.
+    Old indexes go through `shift` first, so issues that only moved with their part are unchanged.
+    """
+    after = {_issue_key(issue): issue for issue in validator.get_logs()["issues"]}
+    moved = {_issue_key(json.loads(key), shift): key for key in before}
+    new_errors = [issue for key, issue in after.items() if key not in moved]
+    # Removals rebuild from the key because reindexing mutates surviving issue dicts in place.
+    removed_errors = [json.loads(original) for key, original in moved.items() if key not in after]
+    return new_errors, removed_errors
+
+
+def _create_validator(message: dict):
+    service = message.get('service', '').lower()
+    if service not in service_mapping:
+        raise ValueError(f"Unsupported service: {service}")
+
+    fpv_module = importlib.import_module("FPV.Helpers")
+    fpv_class = getattr(fpv_module, service_mapping[service])
+
+    kwargs = {"relative": message.get('relative', True), "file_added": message.get('file_added', False),
+              "rule_hook": metrics.rule_hook}
+    sep = message.get('sep', None)
+    if sep:
+        kwargs["sep"] = sep
+
+    return fpv_class.from_state(message.get('base_path', ''), existing_errors=message.get('errors', []), **kwargs)
+
+
+def _apply(validator, message: dict) -> dict:
+    """Apply one operation to the connection's validator and return the reply payload."""
+    op = message.get('op')
+    before = _snapshot(validator)
+    reply = {}
+    shift = None  # how the op moves part indexes
+
+    if op == 'add':
+        parts = message.get('parts')
+        if parts is None:
+            parts = [message.get('part', '')]
+        is_file = message.get('is_file', False)
+        for i, part in enumerate(parts):
+            validator.add_part(part, is_file=is_file and i == len(parts) - 1, validate_new_only=True)
+
+    elif op == 'remove':
+        index = message.get('index')
+        if index is None:
+            raise ValueError("index is required")
+        if not 0 <= index < len(validator._path_helper.parts):
+            raise IndexError("Invalid index for path parts.")
+        reply["removed_part"] = validator._path_helper.parts[index]["part"]
+        validator.remove_part(index, remove_related_errors=True)
+        shift = lambda old: old - 1 if old > index else (None if old == index else old)
+
+    elif op in ('rename', 'insert'):
+        index = message.get('index')
+        if index is None:
+            raise ValueError("index is required")
+        if op == 'rename':
+            validator.rename_part(index, message.get('part', ''))
+        else:
+            validator.insert_part(index, message.get('part', ''))
+            shift = lambda old: old + 1 if old >= index else old
+
+    elif op == 'clean':
+        actions_before = len(validator.get_logs()["actions"])
+        validator.clean(raise_error=False)
+        reply["new_actions"] = validator.get_logs()["actions"][actions_before:]
+
+    else:
+        raise ValueError(f"Unsupported op: {op}")
+
+    new_errors, removed_errors = _diff(before, validator, shift)
+    reply.update({
+        "new_errors": new_errors,
+        "removed_errors": removed_errors,
+        "updated_path": validator.get_full_path(),
+    })
+    return reply
+
+
+@ws_bp.websocket('/path/ws')
+async def path_socket():
+    """
+    Interactive path building over a single connection.
+
+    The first message must be an ``init`` carrying the same fields as
+    ``/path/add`` (service, base_path, errors, relative, file_added, sep).
+    After that the client sends ``add``, ``remove``, ``rename``, ``insert`` and ``clean``
+    messages and each reply carries only the issues that appeared or went away.
+    """
+    validator = None
+    dumps = json.JSONEncoder(separators=(',', ':')).encode
+
+    while True:
+        raw = await websocket.receive()
+        start = time.perf_counter()
+        message_id = None
+        op = None
+        try:
+            message = json.loads(raw)
+            message_id = message.get('id')
+            op = message.get('op')
+
+            if op == 'init':
+                validator = _create_validator(message)
+                payload = {
+                    "all_errors": validator.get_logs()["issues"],
+                    "updated_path": validator.get_full_path(),
+                }
+            elif validator is None:
+                raise ValueError("The first message must be an 'init' op")
+            else:
+                payload = _apply(validator, message)
+
+            payload.update({"id": message_id, "op": op, "success": True, "error": None})
+        except Exception as e:
+            payload = {"id": message_id, "success": False, "error": str(e)}
+
+        metrics.websocket_message_seconds.observe(time.perf_counter() - start, op=str(op))
+        await websocket.send(dumps(payload))
@@ -1,15 +1,23 @@
 # FPV/Helpers/__init__.py
+#
+# Service classes are loaded on first access (PEP 562), so importing one
+# service does not pay for importing the other eight.
 
-from .os_classes import FPV_Windows
-from .os_classes import FPV_MacOS
-from .os_classes import FPV_Linux
-from .dropbox import FPV_Dropbox
-from .egnyte import FPV_Egnyte
-from .onedrive import FPV_OneDrive
-from .sharepoint import FPV_SharePoint
-from .sharefile import FPV_ShareFile
-from .box import FPV_Box
-from ._path import Path
+import importlib
+
+_LAZY_ATTRIBUTES = {
+    "FPV_Windows": ".os_classes",
+    "FPV_MacOS": ".os_classes",
+    "FPV_Linux": ".os_classes",
+    "FPV_Dropbox": ".dropbox",
+    "FPV_Egnyte": ".egnyte",
+    "FPV_OneDrive": ".onedrive",
+    "FPV_SharePoint": ".sharepoint",
+    "FPV_ShareFile": ".sharefile",
+    "FPV_Box": ".box",
+    "Path": "._path",
+    "IssueCategory": "._categories",
+}
 
 __all__ = [
     "FPV_Windows",
@@ -21,4 +29,18 @@ __all__ = [
     "FPV_SharePoint",
     "FPV_ShareFile",
     "FPV_Box",
+    "IssueCategory",
 ]
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
@@ -1,8 +1,56 @@
 import re
-import json
+import time
 from typing import List, Dict
+from ._categories import IssueCategory
 from ._path import Path
 
+# json and the state token codec (hashlib, hmac, base64) are imported where they are
+# used, so that importing a service class stays cheap for short-lived processes.
+
+_rule_names = {}
+_fingerprints = {}
+
+# bytes.strip() only removes ASCII whitespace; str.strip() also removes these and non-ASCII spaces.
+_STR_ONLY_WHITESPACE = b"\x1c\x1d\x1e\x1f"
+
+
+def _strip_bytes(value: bytes) -> bytes:
+    """Strip a bytes part exactly as str.strip() would strip its UTF-8 (surrogateescape) decoding."""
+    stripped = value.strip()
+    if stripped and (stripped[0] > 0x7F or stripped[-1] > 0x7F
+                     or stripped[0] in _STR_ONLY_WHITESPACE or stripped[-1] in _STR_ONLY_WHITESPACE):
+        return stripped.decode("utf-8", "surrogateescape").strip().encode("utf-8", "surrogateescape")
+    return stripped
+
+
+def _text(value):
+    """A part as text for issue and action reasons; bytes parts decode with surrogateescape."""
+    return value.decode("utf-8", "surrogateescape") if isinstance(value, bytes) else value
+
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "surrogateescape")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def rule_name(process_method) -> str:
+    """
+    Return the name of the `process_*` rule behind a processing method.
+    Processing methods are usually lambdas, so the name is read from the code object once and cached.
+    """
+    code = getattr(process_method, "__code__", None)
+    if code is None:
+        return getattr(process_method, "__name__", repr(process_method))
+    name = _rule_names.get(code)
+    if name is None:
+        name = process_method.__name__
+        if name == "<lambda>":
+            name = next((n for n in code.co_names if n.startswith("process_")), name)
+        _rule_names[code] = name
+    return name
+
+
 class FPV_Base:
     """Base class for path validation and cleaning."""
 
@@ -12,7 +60,28 @@ class FPV_Base:
     restricted_names: set = set()
     acceptable_root_patterns: List[str] = []
 
-    def __init__(self, path: str, sep: str = '/', auto_validate: bool = True, auto_clean: bool = False, relative: bool = True, file_added: bool = False, existing_errors: List[dict] = None, existing_actions: List[dict] = None):
+    # Optional instrumentation hook called around every rule invocation
+    # (see FPV.Helpers.instrumentation). None keeps the processing loops untimed.
+    rule_hook = None
+
+    # Bump when the logic of a process_* method changes in a way its class attributes
+    # don't show, so ruleset_fingerprint() (and every cache keyed by it) changes too.
+    ruleset_version = 1
+
+    # Targets that treat names differing only in case as the same name (see FPV.Helpers.collisions).
+    case_insensitive = False
+
+    # Services whose rules can run on bytes paths (os.fsencode / os.scandir(bytes) output).
+    accepts_bytes = False
+
+    def __init__(self, path: str, sep: str = '/', auto_validate: bool = True, auto_clean: bool = False, relative: bool = True, file_added: bool = False, existing_errors: List[dict] = None, existing_actions: List[dict] = None, rule_hook=None):
+        if rule_hook is not None:
+            self.rule_hook = rule_hook
+        if isinstance(path, bytes):
+            if not self.accepts_bytes:
+                raise ValueError(f"{type(self).__name__} does not accept bytes paths; decode the path first.")
+            if isinstance(sep, str):
+                sep = sep.encode("ascii")
         self._path_helper = Path(initial_path=path.strip(sep), sep=sep, relative=relative, file_added=file_added, existing_errors=existing_errors, existing_actions=existing_actions)
         self.auto_validate = auto_validate
         self.auto_clean = auto_clean
@@ -32,6 +101,10 @@ class FPV_Base:
         """Retrieve logs from Path helper."""
         return self._path_helper.get_logs()
     
+    def get_issues_for_part(self, index: int) -> List[dict]:
+        """Retrieve the validation issues recorded for a specific part."""
+        return self._path_helper.get_issues_for_part(index)
+
     def add_part(self, part: str, is_file: bool = False, mode: str = "validate", validate_new_only: bool = True):
         """
         Add a new part to the path, process it, and check validity.
@@ -89,16 +162,79 @@ class FPV_Base:
                     if action.get("details", {}).get("index") != index
                 ]
                 
-                # Reindex remaining errors and actions
-                self._reindex_errors_and_actions(index)
+                # Reindex remaining errors and actions. Issues left on other parts are
+                # expected here, so they must not be raised as a failed removal.
+                self._reindex_errors_and_actions(index, raise_error=False)
         
         # Check path length after removal
         self.process_path_length(part={}, action="validate" if mode == "validate" else "clean")
 
+    def rename_part(self, index: int, new_part: str, mode: str = "validate"):
+        """
+        Replace one part in place. Only that part is revalidated; the other parts keep
+        their issues and indexes, and the path length is updated incrementally.
+
+        Args:
+            index: Index of the part to rename
+            new_part: The new part string
+            mode: "validate" or "clean"
+        """
+        self._path_helper.rename_part(index, new_part)
+        self._forget_part(index)
+        self._process_single_part(index, mode)
+
+    def insert_part(self, index: int, part: str, mode: str = "validate"):
+        """
+        Insert a folder part before `index` (or append it when `index` equals the part count).
+        Issues and actions of the later parts are shifted by one; only the new part is validated.
+
+        Args:
+            index: Position of the new part
+            part: The folder name to insert
+            mode: "validate" or "clean"
+        """
+        if index == 0 and not self._path_helper.relative:
+            raise ValueError("Cannot insert a part before the root of an absolute path.")
+        if index == len(self._path_helper.parts) and self._path_helper.file_added_to_parts:
+            raise ValueError("Cannot add more parts after a file has been added.")
+        self._path_helper.insert_part(index, part)
+        self._process_single_part(index, mode)
+
+    def _forget_part(self, index: int):
+        """Drop the issues and queued actions recorded for one part."""
+        helper = self._path_helper
+        helper.logs["issues"] = [issue for issue in helper.logs["issues"] if issue.get("details", {}).get("index") != index]
+        helper.logs["actions"] = [action for action in helper.logs["actions"] if action.get("details", {}).get("index") != index]
+        helper.actions_queue = [action for action in helper.actions_queue if action.get("details", {}).get("index") != index]
+
+    def _process_single_part(self, index: int, mode: str):
+        if mode.lower() == "clean" or self.auto_clean:
+            self._clean_single_part(index)
+        if mode.lower() == "validate" or self.auto_validate:
+            self._validate_single_part(index)
+            self._recheck_path_length()
+
+    def _recheck_path_length(self):
+        """
+        Replace the PATH_LENGTH issue with the one a full validation of the current path
+        would log. process_path_length flags the path through its longest part, so only
+        part lengths are compared; no rule is rerun.
+        """
+        helper = self._path_helper
+        helper.logs["issues"] = [issue for issue in helper.logs["issues"] if issue.get("category") != "PATH_LENGTH"]
+        if not self.max_length:
+            return
+        checked = {part_type for part_type, rules in self.rule_names().items() if "process_path_length" in rules}
+        candidates = [part for part in helper.parts if helper.get_part_type(part) in checked]
+        if candidates:
+            self.process_path_length(max(candidates, key=lambda part: len(part["part"])), action="validate")
+
     def process_invalid_characters(self, part: dict, action: str):
         """Process invalid characters for a specific part based on the specified action."""
         part_str = part["part"]
         index = part["index"]
+        if isinstance(part_str, bytes):
+            return self._process_invalid_bytes(part_str, index, action)
         invalid_chars = [char for char in part_str if char in self.invalid_characters]
 
         if invalid_chars:
@@ -126,6 +262,38 @@ class FPV_Base:
                 return cleaned_part  # Return the cleaned part to replace the original
         return part_str
 
+    def _process_invalid_bytes(self, part_str: bytes, index: int, action: str):
+        """process_invalid_characters for bytes parts: one translate() call finds and strips the invalid bytes."""
+        invalid_bytes = self.invalid_characters.encode("utf-8")
+        cleaned_part = part_str.translate(None, invalid_bytes)
+        if len(cleaned_part) == len(part_str):
+            return part_str
+
+        invalid_chars = [bytes((byte,)) for byte in part_str if byte in invalid_bytes]
+        if action == "validate":
+            self._path_helper.add_issue(
+                {
+                    "type": "issue",
+                    "category": "INVALID_CHAR",
+                    "details": {"part": part_str, "invalid_chars": invalid_chars, "index": index},
+                    "reason": f"Invalid characters {[_text(char) for char in invalid_chars]} "
+                              f"found in part: '{_text(part_str)}'.",
+                }
+            )
+        elif action == "clean":
+            self._path_helper.add_action(
+                {
+                    "type": "action",
+                    "category": "INVALID_CHAR",
+                    "subtype": "MODIFY",
+                    "details": {"original": part_str, "new_value": cleaned_part, "index": index},
+                    "reason": "Removed invalid characters.",
+                },
+                priority=2
+            )
+            return cleaned_part
+        return part_str
+
     def process_root_folder_format(self, part: dict, action: str):
         """Process the root folder format based on acceptable patterns."""
         part_str = part["part"]
@@ -142,7 +310,7 @@ class FPV_Base:
                         "type": "issue",
                         "category": "ROOT_FORMAT",
                         "details": {"root": part_str},
-                        "reason": f"Root '{part_str}' does not match any acceptable pattern: {self.acceptable_root_patterns}.",
+                        "reason": f"Root '{_text(part_str)}' does not match any acceptable pattern: {self.acceptable_root_patterns}.",
                     }
                 )
             elif action == "clean":
@@ -193,7 +361,7 @@ class FPV_Base:
                         "category": "PATH_LENGTH",
                         "subtype": "REMOVE",
                         "details": {"index": index, "part": part_str},
-                        "reason": f"Removed '{part_str}' to reduce path length to within {self.max_length} characters.",
+                        "reason": f"Removed '{_text(part_str)}' to reduce path length to within {self.max_length} characters.",
                     },
                     priority=1
                 )
@@ -206,7 +374,7 @@ class FPV_Base:
                         "category": "PATH_LENGTH",
                         "subtype": "MODIFY",
                         "details": {"original": part_str, "new_value": truncated_part, "index": index},
-                        "reason": f"Truncated '{part_str}' to '{truncated_part}' to reduce path length.",
+                        "reason": f"Truncated '{_text(part_str)}' to '{_text(truncated_part)}' to reduce path length.",
                     },
                     priority=1
                 )
@@ -217,14 +385,18 @@ class FPV_Base:
         """Process restricted names for a specific part based on the specified action."""
         part_str = part["part"]
         index = part["index"]
-        if part_str.lower() in [name.lower() for name in self.restricted_names]:
+        candidate = part_str
+        if isinstance(part_str, bytes):
+            # Restricted names are compared case-insensitively as text, so bytes are decoded here.
+            candidate = part_str.decode("utf-8", "surrogateescape")
+        if candidate.lower() in [name.lower() for name in self.restricted_names]:
             if action == "validate":
                 self._path_helper.add_issue(
                     {
                         "type": "issue",
                         "category": "RESTRICTED_NAME",
                         "details": {"part": part_str, "index": index},
-                        "reason": f"Restricted name '{part_str}' found in path.",
+                        "reason": f"Restricted name '{candidate}' found in path.",
                     }
                 )
             elif action == "clean":
@@ -234,7 +406,7 @@ class FPV_Base:
                         "category": "RESTRICTED_NAME",
                         "subtype": "REMOVE",
                         "details": {"index": index, "part": part_str},
-                        "reason": f"Removed restricted name '{part_str}' to avoid conflicts.",
+                        "reason": f"Removed restricted name '{candidate}' to avoid conflicts.",
                     },
                     priority=2
                 )
@@ -252,7 +424,7 @@ class FPV_Base:
                         "type": "issue",
                         "category": "TRAILING_PERIOD",
                         "details": {"part": part_str, "index": index},
-                        "reason": f"The part '{part_str}' ends with a trailing period.",
+                        "reason": f"The part '{_text(part_str)}' ends with a trailing period.",
                     }
                 )
             elif action == "clean":
@@ -275,11 +447,15 @@ class FPV_Base:
         part_str = part["part"]
         index = part["index"]
         is_file = part.get("is_file", False)
-        cleaned_part = part_str.strip()
+        if isinstance(part_str, bytes):
+            strip, dot = _strip_bytes, b'.'
+        else:
+            strip, dot = str.strip, '.'
+        cleaned_part = strip(part_str)
 
-        if is_file and '.' in cleaned_part:
-            name, ext = '.'.join(cleaned_part.split('.')[:-1]).strip(), cleaned_part.split('.')[-1].strip()
-            cleaned_part = f"{name}.{ext}"
+        if is_file and dot in cleaned_part:
+            name, ext = strip(dot.join(cleaned_part.split(dot)[:-1])), strip(cleaned_part.split(dot)[-1])
+            cleaned_part = name + dot + ext
 
         if part_str != cleaned_part:
             if action == "validate":
@@ -310,7 +486,7 @@ class FPV_Base:
         part_str = part["part"]
         index = part["index"]
         part_is_file = part.get("is_file", False)
-        if part_str == "":
+        if not part_str:
             if action == "validate":
                 self._path_helper.add_issue(
                     {
@@ -353,13 +529,8 @@ class FPV_Base:
             part_index = part["index"]
             part_type = self._path_helper.get_part_type(part)
 
-            # Get the appropriate processing methods based on the part type
-            processing_methods = self.processing_methods().get(part_type, [])
-
-            # Process the part with each method
-            for process_method in processing_methods:
-                cleaned_item = process_method(part, action="clean")
-                self._path_helper.parts[part_index]["part"] = cleaned_item
+            # Process the part with each method for its type
+            self._run_rules(part, part_type, action="clean")
 
             # Determine the cleaned status based on pending actions
             pending_actions = self._path_helper.get_pending_actions_for_part(part_index)
@@ -369,6 +540,8 @@ class FPV_Base:
 
         if validate_after_clean:
             self.validate(**kwargs)
+
+        return self.get_full_path()
     
     def _reindex_errors_and_actions(self, removed_index: int, validate_after_clean: bool = True, **kwargs):
         """
@@ -412,12 +585,8 @@ class FPV_Base:
             part_index = part["index"]
             part_type = self._path_helper.get_part_type(part)
 
-            # Get the appropriate processing methods based on the part type
-            processing_methods = self.processing_methods().get(part_type, [])
-
-            # Process the part with each method
-            for process_method in processing_methods:
-                process_method(part, action="validate")
+            # Process the part with each method for its type
+            self._run_rules(part, part_type, action="validate")
 
             # Determine the checked status based on validation issues
             issues_for_part = self._path_helper.get_issues_for_part(part_index)
@@ -426,10 +595,145 @@ class FPV_Base:
 
         issues = self._path_helper.get_logs().get("issues", [])
         if issues and raise_error:
-            raise ValueError(json.dumps(issues, indent=4))
+            import json
+            raise ValueError(json.dumps(issues, indent=4, default=_json_default))
 
         return issues
     
+    def issue_mask(self, per_part: bool = False):
+        """
+        Validate the path and return its issue categories as an IssueCategory mask.
+
+        Args:
+            per_part (bool): Also return one mask per part, by part index. ROOT_FORMAT
+                issues carry no index and count for part 0. Issues that belong to the
+                whole path (PATH_LENGTH) are only in the path mask.
+
+        Returns:
+            IssueCategory, or (IssueCategory, List[IssueCategory]) with per_part.
+        """
+        issues = self.validate(raise_error=False)
+        mask = IssueCategory.from_issues(issues)
+        if not per_part:
+            return mask
+        part_masks = [IssueCategory(0)] * len(self._path_helper.parts)
+        for issue in issues:
+            index = issue.get("details", {}).get("index")
+            if index is None and issue.get("category") == "ROOT_FORMAT" and part_masks:
+                index = 0
+            if index is not None:
+                part_masks[index] |= IssueCategory.from_issues([issue])
+        return mask, part_masks
+
+    def is_valid(self, order=None) -> bool:
+        """
+        Short-circuit validation: stop at the first issue instead of collecting them all.
+        The verdict always matches `not validate(raise_error=False)`; the logs hold only
+        the issue(s) found before stopping.
+
+        Args:
+            order: Optional AdaptiveRuleOrder (FPV.Helpers.adaptive) that learns, or
+                replays, which rules to try first.
+
+        Returns:
+            bool: True if no rule flags any part.
+        """
+        cls = type(self)
+        issues = self._path_helper.logs["issues"]
+        if issues:
+            return False
+        methods_by_type = self.processing_methods()
+        learn = order is not None and order.should_learn(cls)
+        if order is not None and not learn:
+            methods_by_type = {part_type: [methods[index] for index in order.order(cls, part_type, len(methods))]
+                               for part_type, methods in methods_by_type.items()}
+        for part in self._path_helper.get_parts_to_check():
+            part_type = self._path_helper.get_part_type(part)
+            methods = methods_by_type.get(part_type, [])
+            if not learn:
+                for process_method in methods:
+                    process_method(part, action="validate")
+                    if issues:
+                        return False
+                continue
+            for index in order.order(cls, part_type, len(methods)):
+                start = time.perf_counter_ns()
+                methods_by_type[part_type][index](part, action="validate")
+                order.record(cls, part_type, index, len(methods), bool(issues), time.perf_counter_ns() - start)
+                if issues:
+                    return False
+        return True
+
+    def _run_rules(self, part: dict, part_type: str, action: str):
+        """
+        Apply the processing methods for a part type to one part.
+        When cleaning, each method's return value replaces the part before the next method runs.
+        """
+        processing_methods = self.processing_methods().get(part_type, [])
+        stored_part = self._path_helper.parts[part["index"]]
+        hook = self.rule_hook
+
+        if hook is None:
+            if action == "clean":
+                for process_method in processing_methods:
+                    stored_part["part"] = process_method(part, action="clean")
+            else:
+                for process_method in processing_methods:
+                    process_method(part, action=action)
+            return
+
+        service = type(self).__name__
+        logs = self._path_helper.logs
+        log_key = "actions" if action == "clean" else "issues"
+        for process_method in processing_methods:
+            logged_before = len(logs[log_key])
+            start = time.perf_counter_ns()
+            result = process_method(part, action=action)
+            elapsed = time.perf_counter_ns() - start
+            if action == "clean":
+                stored_part["part"] = result
+            hook.record(rule_name(process_method), service, part_type, action, elapsed, len(logs[log_key]) != logged_before)
+
+    @classmethod
+    def ruleset_fingerprint(cls, refresh: bool = False) -> str:
+        """
+        Return a stable hash of everything that decides this service's verdicts: its rule
+        attributes (invalid_characters, max_length, restricted_names, ...), the rule order
+        from processing_methods() and ruleset_version. Computed once per class.
+
+        Args:
+            refresh: Recompute instead of returning the cached value (after patching rules at runtime).
+
+        Returns:
+            str: 16 hex characters, identical across processes and Python versions.
+        """
+        fingerprint = None if refresh else _fingerprints.get(cls)
+        if fingerprint is None:
+            import hashlib
+            import json
+
+            attributes = {}
+            for name in dir(cls):
+                if name.startswith("_") or name == "rule_hook":
+                    continue
+                value = getattr(cls, name)
+                if isinstance(value, (str, int, float, list, tuple, set, frozenset, dict)) or value is None:
+                    attributes[name] = sorted(value) if isinstance(value, (set, frozenset)) else value
+            definition = {"service": cls.__name__, "attributes": attributes, "rules": cls.rule_names()}
+            canonical = json.dumps(definition, sort_keys=True, ensure_ascii=True)
+            fingerprint = hashlib.sha256(canonical.encode("ascii")).hexdigest()[:16]
+            _fingerprints[cls] = fingerprint
+        return fingerprint
+
+    @classmethod
+    def rule_names(cls) -> Dict[str, tuple]:
+        """
+        Return the ordered `process_*` rule names applied to each part type ("root", "folder", "file").
+        Processing methods only bind `self` lazily, so no path is needed to inspect them.
+        """
+        methods = cls.processing_methods(cls.__new__(cls))
+        return {part_type: tuple(rule_name(method) for method in rules) for part_type, rules in methods.items()}
+
     def processing_methods(self) -> dict:
         """
         Define the list of processing methods to apply for both cleaning and validation.
@@ -458,6 +762,22 @@ class FPV_Base:
             "actions": self._path_helper.get_logs().get("actions", [])
         }
     
+    def to_state_token(self, secret=None) -> str:
+        """
+        Export the current state as a compact, signed token for stateless clients.
+
+        Args:
+            secret: HMAC key (str or bytes). Defaults to the FPV_STATE_SECRET environment
+                variable, or a per-process key if that is not set.
+
+        Returns:
+            A url-safe base64 string accepted by `from_state(state_token=...)`.
+        """
+        if isinstance(self._path_helper.sep, bytes):
+            raise ValueError("State tokens are only available for str paths.")
+        from ._state_token import encode_state
+        return encode_state(self._path_helper, secret=secret, fingerprint=self.ruleset_fingerprint())
+
     def get_path_parts(self) -> List[str]:
         """
         Get the current path parts as a list of strings.
@@ -468,14 +788,16 @@ class FPV_Base:
         return [part["part"] for part in self._path_helper.parts]
     
     @classmethod
-    def from_state(cls, path: str, existing_errors: List[dict] = None, existing_actions: List[dict] = None, **kwargs):
+    def from_state(cls, path: str, existing_errors: List[dict] = None, existing_actions: List[dict] = None, state_token: str = None, secret=None, **kwargs):
         """
         Create a new FPV instance from existing state without revalidating.
         
         Args:
-            path: The current path
+            path: The current path (ignored when a state token is given)
             existing_errors: List of existing validation errors
             existing_actions: List of existing actions
+            state_token: Token from `to_state_token()`, used instead of existing_errors
+            secret: HMAC key the token was signed with
             **kwargs: Other constructor arguments
             
         Returns:
@@ -484,6 +806,21 @@ class FPV_Base:
         # Disable auto-validation and auto-clean to prevent rechecking
         kwargs['auto_validate'] = False
         kwargs['auto_clean'] = False
+
+        if state_token is not None:
+            from ._state_token import decode_state, build_issue
+            state = decode_state(state_token, secret=secret)
+            if state["fingerprint"] != cls.ruleset_fingerprint():
+                raise ValueError("State token was created with a different ruleset; rebuild it from the path.")
+            validator = cls(state["sep"].join(part["part"] for part in state["parts"]), **kwargs)
+            if validator.sep != state["sep"]:
+                raise ValueError(f"State token was created with separator {state['sep']!r}, not {validator.sep!r}.")
+            issues = [build_issue(category, index, state, cls.max_length) for category, index in state["issues"]]
+            validator._path_helper.restore_state(state, issues)
+            validator.file_added = state["file_added"]
+            validator.path = validator._path_helper.get_full_path()
+            return validator
+
         kwargs['existing_errors'] = existing_errors or []
         kwargs['existing_actions'] = existing_actions or []
         
@@ -500,12 +837,8 @@ class FPV_Base:
             part = self._path_helper.parts[part_index]
             part_type = self._path_helper.get_part_type(part)
             
-            # Get the appropriate processing methods based on the part type
-            processing_methods = self.processing_methods().get(part_type, [])
-            
-            # Process the part with each method
-            for process_method in processing_methods:
-                process_method(part, action="validate")
+            # Process the part with each method for its type
+            self._run_rules(part, part_type, action="validate")
             
             # Determine the checked status based on validation issues
             issues_for_part = self._path_helper.get_issues_for_part(part_index)
@@ -523,13 +856,8 @@ class FPV_Base:
             part = self._path_helper.parts[part_index]
             part_type = self._path_helper.get_part_type(part)
             
-            # Get the appropriate processing methods based on the part type
-            processing_methods = self.processing_methods().get(part_type, [])
-            
-            # Process the part with each method
-            for process_method in processing_methods:
-                cleaned_item = process_method(part, action="clean")
-                self._path_helper.parts[part_index]["part"] = cleaned_item
+            # Process the part with each method for its type
+            self._run_rules(part, part_type, action="clean")
             
             # Determine the cleaned status based on pending actions
             pending_actions = self._path_helper.get_pending_actions_for_part(part_index)
@@ -0,0 +1,85 @@
+"""Stable numeric codes for the issue categories produced by the service classes."""
+
+from enum import IntFlag
+
+# The position of each name is part of the state token format, so new
+# categories must be appended and existing ones never reordered.
+CATEGORIES = (
+    "INVALID_CHAR",
+    "ROOT_FORMAT",
+    "PATH_LENGTH",
+    "RESTRICTED_NAME",
+    "TRAILING_PERIOD",
+    "WHITESPACE",
+    "EMPTY_PART",
+    "SUFFIX",
+    "PREFIX",
+    "TEMP_PATTERN",
+    "PART_LENGTH",
+    "LEADING_PERIOD",
+    "RESTRICTED_PREFIX",
+)
+
+# Code 0 is reserved for categories defined outside the library (custom subclasses).
+CUSTOM_CATEGORY = 0
+CATEGORY_CODES = {name: code for code, name in enumerate(CATEGORIES, start=1)}
+
+
+def category_code(category: str) -> int:
+    """Return the code for a category, or CUSTOM_CATEGORY if it is not a built-in one."""
+    return CATEGORY_CODES.get(category, CUSTOM_CATEGORY)
+
+
+def category_name(code: int) -> str:
+    """Return the category name for a built-in code."""
+    if not 1 <= code <= len(CATEGORIES):
+        raise ValueError(f"Unknown category code {code}.")
+    return CATEGORIES[code - 1]
+
+
+# Bit used in category masks for any category without a built-in code.
+CUSTOM_CATEGORY_BIT = 1 << 31
+
+
+class IssueCategory(IntFlag):
+    """
+    Bit of each issue category in a category mask. Built-in code N is bit N - 1,
+    so the values are as stable as CATEGORIES. A mask is a plain int: store it as
+    is, test it with `&` and combine masks with `|`.
+    """
+    INVALID_CHAR = 1 << 0
+    ROOT_FORMAT = 1 << 1
+    PATH_LENGTH = 1 << 2
+    RESTRICTED_NAME = 1 << 3
+    TRAILING_PERIOD = 1 << 4
+    WHITESPACE = 1 << 5
+    EMPTY_PART = 1 << 6
+    SUFFIX = 1 << 7
+    PREFIX = 1 << 8
+    TEMP_PATTERN = 1 << 9
+    PART_LENGTH = 1 << 10
+    LEADING_PERIOD = 1 << 11
+    RESTRICTED_PREFIX = 1 << 12
+    CUSTOM = CUSTOM_CATEGORY_BIT
+
+    @classmethod
+    def from_issues(cls, issues) -> "IssueCategory":
+        """Fold issue dicts into one mask."""
+        return cls(categories_to_mask(issue["category"] for issue in issues))
+
+
+def categories_to_mask(categories) -> int:
+    """Fold category names into a bitmask; built-in code N sets bit N - 1."""
+    mask = 0
+    for category in categories:
+        code = category_code(category)
+        mask |= CUSTOM_CATEGORY_BIT if code == CUSTOM_CATEGORY else 1 << (code - 1)
+    return mask
+
+
+def mask_to_categories(mask: int) -> list:
+    """Return the built-in category names set in a mask, in code order ("CUSTOM" for the custom bit)."""
+    names = [name for code, name in enumerate(CATEGORIES, start=1) if mask & (1 << (code - 1))]
+    if mask & CUSTOM_CATEGORY_BIT:
+        names.append("CUSTOM")
+    return names
@@ -28,7 +28,7 @@ class Path:
         """Generate and return the cleaned path after applying all actions."""
         self.apply_actions()  # Apply pending actions before returning the path
         full_path = self.sep.join([p["part"] for p in self.parts])
-        return f"{self.sep}{full_path}" if self.relative and full_path else full_path
+        return self.sep + full_path if self.relative and full_path else full_path
 
     def get_parts_to_clean(self) -> list:
         """Retrieve all parts that need to be cleaned."""
@@ -105,6 +105,8 @@ class Path:
                 entry["index"] = i  # Reindex parts after removal
             if index == len(self.parts) and self.file_added:
                 self.file_added = False
+            if removed_part["is_file"]:
+                self.file_added_to_parts = False
             self.path_length -= len(removed_part["part"]) + len(self.sep)
             # remove any related issues involving that part
             self.logs["issues"] = [issue for issue in self.logs["issues"] if issue.get("details", {}).get("index") != index]
@@ -112,6 +114,30 @@ class Path:
         else:
             raise IndexError("Invalid index for path parts.")
 
+    def rename_part(self, index: int, part: str):
+        """Replace the string of one part in place; its issues are left to the caller."""
+        if not 0 <= index < len(self.parts):
+            raise IndexError("Invalid index for path parts.")
+        entry = self.parts[index]
+        self.path_length += len(part) - len(entry["part"])
+        entry["part"] = part
+        entry["cleaned_status"] = entry["checked_status"] = "unseen"
+
+    def insert_part(self, index: int, part: str):
+        """Insert a folder part before `index`, shifting the indexes of later parts and their logs by one."""
+        if not 0 <= index <= len(self.parts):
+            raise IndexError("Invalid index for path parts.")
+        for entry in self.parts[index:]:
+            entry["index"] += 1
+        shifted = set()  # queued actions are also in logs["actions"]; shift each dict once
+        for record in self.logs["issues"] + self.logs["actions"] + self.actions_queue:
+            details = record.get("details", {})
+            if id(record) not in shifted and details.get("index") is not None and details["index"] >= index:
+                details["index"] += 1
+                shifted.add(id(record))
+        self.path_length += len(part) + len(self.sep)
+        self.parts.insert(index, {"index": index, "part": part, "cleaned_status": "unseen", "checked_status": "unseen", "is_file": False})
+
     def mark_part(self, index: int, state: str, status: str):
         """Mark a part with a specific status for checked or cleaned states."""
         valid_states = {"cleaned_status", "checked_status"}
@@ -142,9 +168,20 @@ class Path:
     def apply_actions(self):
         """Apply all actions in the queue, sorted by priority."""
         self.actions_queue.sort(key=lambda x: x.get("priority", float("inf")))
+        # Removals are collected and applied last, highest index first, so the indexes
+        # recorded by the other actions still point at the right parts and a part flagged
+        # by several rules is only removed once.
+        removals = set()
         while self.actions_queue:
             action = self.actions_queue.pop(0)
-            self.apply_action(action)
+            index = action.get("details", {}).get("index")
+            if action.get("subtype") == "REMOVE" and index is not None:
+                removals.add(index)
+            else:
+                self.apply_action(action)
+        for index in sorted(removals, reverse=True):
+            if index < len(self.parts):
+                self.remove_part(index)
 
         # Mark parts as "complete" if no actions remain for them
         for part in self.parts:
@@ -219,6 +256,19 @@ class Path:
         """Retrieve all logs."""
         return self.logs
     
+    def restore_state(self, state: dict, issues: list):
+        """
+        Replace parts, statuses and issues with a decoded state token.
+        Statuses come from the token itself, so the logs are not re-scanned.
+        """
+        self.parts = state["parts"]
+        self.relative = state["relative"]
+        self.file_added = state["file_added"]
+        self.file_added_to_parts = state["file_added_to_parts"]
+        self.path_length = state["path_length"]
+        self.actions_queue = []
+        self.logs = {"actions": [], "issues": issues}
+
     def _mark_existing_parts_as_processed(self):
         """
         Mark parts that already have errors or actions as processed to avoid revalidation.
@@ -0,0 +1,234 @@
+"""
+Compact, signed encoding of a validator's state for stateless clients.
+
+Layout (version 2), before base64:
+    version, flags, ruleset fingerprint, sep, path_length, part count,
+    per part: status byte + utf-8 text,
+    issue count, per issue: category code (+ name for custom categories) + index,
+    truncated HMAC-SHA256 signature over everything before it.
+
+Integers are LEB128 varints (path_length is zigzag encoded) and strings are
+length-prefixed utf-8. Issue reasons are not stored; they are regenerated in a
+short form when the token is loaded.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+
+from ._categories import CUSTOM_CATEGORY, category_code, category_name
+
+TOKEN_VERSION = 2
+SIGNATURE_SIZE = 16
+
+_FLAG_RELATIVE = 1
+_FLAG_FILE_ADDED = 2
+_FLAG_FILE_ADDED_TO_PARTS = 4
+_IS_FILE_BIT = 0x40
+
+STATUSES = ("unseen", "pending", "complete", "valid", "invalid", "issue")
+_STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+# Used only when neither an explicit secret nor FPV_STATE_SECRET is available.
+# Tokens signed with it are only readable by the process that made them.
+_PROCESS_SECRET = os.urandom(32)
+
+REASONS = {
+    "INVALID_CHAR": "Invalid characters found in part: '{part}'.",
+    "ROOT_FORMAT": "Root '{part}' does not match any acceptable pattern.",
+    "PATH_LENGTH": "Path exceeds maximum length of {max_length} characters.",
+    "RESTRICTED_NAME": "Restricted name '{part}' found in path.",
+    "TRAILING_PERIOD": "The part '{part}' ends with a trailing period.",
+    "WHITESPACE": "Whitespace detected in path part.",
+    "EMPTY_PART": "Empty part found in the path.",
+    "SUFFIX": "Part has a restricted suffix.",
+    "PREFIX": "Part has a restricted prefix.",
+    "TEMP_PATTERN": "Part matches a restricted temporary file pattern.",
+    "PART_LENGTH": "Part exceeds the maximum part length.",
+    "LEADING_PERIOD": "Folder name '{part}' starts with a leading period, which is not allowed.",
+    "RESTRICTED_PREFIX": "Restricted prefix found in path part.",
+}
+
+
+def _resolve_secret(secret) -> bytes:
+    if secret is None:
+        secret = os.environ.get("FPV_STATE_SECRET") or _PROCESS_SECRET
+    if isinstance(secret, str):
+        secret = secret.encode("utf-8")
+    return secret
+
+
+def _sign(payload: bytes, secret) -> bytes:
+    return hmac.new(_resolve_secret(secret), payload, hashlib.sha256).digest()[:SIGNATURE_SIZE]
+
+
+def _write_varint(out: bytearray, value: int):
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _write_text(out: bytearray, text: str):
+    data = text.encode("utf-8", "surrogatepass")
+    _write_varint(out, len(data))
+    out += data
+
+
+class _Reader:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.pos = 0
+
+    def byte(self) -> int:
+        if self.pos >= len(self.data):
+            raise ValueError("Truncated state token.")
+        value = self.data[self.pos]
+        self.pos += 1
+        return value
+
+    def varint(self) -> int:
+        value = shift = 0
+        while True:
+            byte = self.byte()
+            value |= (byte & 0x7F) << shift
+            if not byte & 0x80:
+                return value
+            shift += 7
+
+    def text(self) -> str:
+        size = self.varint()
+        end = self.pos + size
+        if end > len(self.data):
+            raise ValueError("Truncated state token.")
+        value = self.data[self.pos:end].decode("utf-8", "surrogatepass")
+        self.pos = end
+        return value
+
+
+def encode_state(path_helper, secret=None, fingerprint: str = "") -> str:
+    """
+    Encode the parts, statuses, issues and length tracked by a Path helper,
+    tagged with the ruleset fingerprint of the service that produced the issues.
+    """
+    out = bytearray((TOKEN_VERSION,))
+    flags = 0
+    if path_helper.relative:
+        flags |= _FLAG_RELATIVE
+    if path_helper.file_added:
+        flags |= _FLAG_FILE_ADDED
+    if path_helper.file_added_to_parts:
+        flags |= _FLAG_FILE_ADDED_TO_PARTS
+    out.append(flags)
+    fingerprint = bytes.fromhex(fingerprint)
+    _write_varint(out, len(fingerprint))
+    out += fingerprint
+    _write_text(out, path_helper.sep)
+
+    length = path_helper.path_length
+    _write_varint(out, (length << 1) ^ (length >> 63))
+
+    parts = path_helper.parts
+    _write_varint(out, len(parts))
+    for part in parts:
+        status = _STATUS_CODES[part["checked_status"]] | (_STATUS_CODES[part["cleaned_status"]] << 3)
+        if part["is_file"]:
+            status |= _IS_FILE_BIT
+        out.append(status)
+        _write_text(out, part["part"])
+
+    issues = path_helper.logs["issues"]
+    _write_varint(out, len(issues))
+    for issue in issues:
+        category = issue["category"]
+        code = category_code(category)
+        _write_varint(out, code)
+        if code == CUSTOM_CATEGORY:
+            _write_text(out, category)
+        index = issue.get("details", {}).get("index")
+        _write_varint(out, 0 if index is None else index + 1)
+
+    out += _sign(bytes(out), secret)
+    return base64.urlsafe_b64encode(bytes(out)).rstrip(b"=").decode("ascii")
+
+
+def decode_state(token: str, secret=None) -> dict:
+    """
+    Verify and decode a state token.
+
+    Raises:
+        ValueError: If the token is malformed, signed with another secret, or of an unknown version.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    except (ValueError, TypeError):
+        raise ValueError("State token is not valid base64.")
+
+    payload, signature = raw[:-SIGNATURE_SIZE], raw[-SIGNATURE_SIZE:]
+    if len(payload) < 2 or not hmac.compare_digest(signature, _sign(payload, secret)):
+        raise ValueError("State token signature does not match.")
+    if payload[0] != TOKEN_VERSION:
+        raise ValueError(f"Unsupported state token version {payload[0]}.")
+
+    reader = _Reader(payload)
+    reader.pos = 1
+    flags = reader.byte()
+    size = reader.varint()
+    fingerprint = bytes(reader.byte() for _ in range(size)).hex()
+    sep = reader.text()
+    zigzag = reader.varint()
+    path_length = (zigzag >> 1) ^ -(zigzag & 1)
+
+    parts = []
+    for index in range(reader.varint()):
+        status = reader.byte()
+        parts.append({
+            "index": index,
+            "part": reader.text(),
+            "cleaned_status": STATUSES[(status >> 3) & 0x7],
+            "checked_status": STATUSES[status & 0x7],
+            "is_file": bool(status & _IS_FILE_BIT),
+        })
+
+    issues = []
+    for _ in range(reader.varint()):
+        code = reader.varint()
+        category = reader.text() if code == CUSTOM_CATEGORY else category_name(code)
+        index = reader.varint() - 1
+        issues.append((category, None if index < 0 else index))
+
+    return {
+        "relative": bool(flags & _FLAG_RELATIVE),
+        "file_added": bool(flags & _FLAG_FILE_ADDED),
+        "file_added_to_parts": bool(flags & _FLAG_FILE_ADDED_TO_PARTS),
+        "fingerprint": fingerprint,
+        "sep": sep,
+        "path_length": path_length,
+        "parts": parts,
+        "issues": issues,
+    }
+
+
+def build_issue(category: str, index, state: dict, max_length: int) -> dict:
+    """Rebuild an issue dict, with a short reason, from its decoded category and index."""
+    parts = state["parts"]
+    if index is None:
+        if category == "PATH_LENGTH":
+            details = {"current_length": state["path_length"], "max_length": max_length}
+        elif category == "ROOT_FORMAT" and parts:
+            details = {"root": parts[0]["part"]}
+        else:
+            details = {}
+        part_str = details.get("root", "")
+    else:
+        part_str = parts[index]["part"] if index < len(parts) else ""
+        details = {"part": part_str, "index": index}
+
+    reason = REASONS.get(category, "{category} issue found in path.")
+    return {
+        "type": "issue",
+        "category": category,
+        "details": details,
+        "reason": reason.format(part=part_str, max_length=max_length, category=category),
+    }
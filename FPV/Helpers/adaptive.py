@@ -0,0 +1,146 @@
+"""
+Adaptive rule ordering for short-circuit validation.
+
+`FPV_Base.is_valid()` stops at the first issue, so the order of the rules decides
+how much work a rejected path costs. In validate mode, rules only log issues and
+never change the part, so any order gives the same valid/invalid verdict. Only
+which issue is found first can differ.
+
+`AdaptiveRuleOrder` samples one validation in LEARN_SAMPLE and, for those, counts
+per service and part type how often each rule rejects a part and how long it
+takes. The other validations just replay the current order, so the bookkeeping
+stays off the hot path. Rules are then ranked by
+rejection rate per unit of cost, the optimal order for a chain of independent
+checks that stops at the first hit. Once the order is good, `freeze()` exports it
+so later runs can reuse it unchanged and reproducibly.
+
+Usage:
+    order = AdaptiveRuleOrder()
+    for path in paths:
+        if not FPV_Egnyte(path, auto_validate=False).is_valid(order=order):
+            rejected.append(path)
+    order.save("egnyte-order.json")
+
+    frozen = AdaptiveRuleOrder.load("egnyte-order.json")  # fixed order, no learning
+"""
+
+import json
+from typing import Dict, List, Optional, Sequence
+
+# One is_valid() call in LEARN_SAMPLE records rule hits and timings; counting every call
+# would cost more than a better order saves.
+LEARN_SAMPLE = 16
+
+
+class _RuleCounters:
+    __slots__ = ("calls", "hits", "timed", "total_ns")
+
+    def __init__(self):
+        self.calls = self.hits = self.timed = self.total_ns = 0
+
+    def score(self, default_ns: float) -> float:
+        hit_rate = (self.hits + 1) / (self.calls + 2)
+        cost = self.total_ns / self.timed if self.timed else default_ns
+        return hit_rate / max(cost, 1.0)
+
+
+class AdaptiveRuleOrder:
+    """
+    Learned (or frozen) rule order per (service, part type).
+
+    Args:
+        reorder_every: Recompute an order after this many recorded (sampled) rule calls for it.
+        frozen: Orders from `freeze()`. Services listed there are never reordered.
+    """
+
+    def __init__(self, reorder_every: int = 500, frozen: Optional[dict] = None):
+        self.reorder_every = reorder_every
+        self._counters = {}  # (service, part type) -> [_RuleCounters per rule]
+        self._orders = {}  # (service, part type) -> tuple of rule indexes
+        self._pending = {}  # (service, part type) -> calls since the last reorder
+        self._frozen = {}  # service name -> (fingerprint, {part type: [rule names]})
+        self._classes = {}
+        self._calls = 0
+        for service, entry in (frozen or {}).items():
+            self._frozen[service] = (entry["fingerprint"], entry["order"])
+
+    def order(self, cls, part_type: str, count: int) -> Sequence[int]:
+        """Indexes into `cls.processing_methods()[part_type]`, in the order to run them."""
+        key = (cls.__name__, part_type)
+        order = self._orders.get(key)
+        if order is None:
+            self._classes[cls.__name__] = cls
+            order = self._frozen_order(cls, part_type) if cls.__name__ in self._frozen else tuple(range(count))
+            self._orders[key] = order
+        return order
+
+    def _frozen_order(self, cls, part_type: str) -> tuple:
+        fingerprint, orders = self._frozen[cls.__name__]
+        if fingerprint != cls.ruleset_fingerprint():
+            raise ValueError(f"Frozen rule order for {cls.__name__} was learned for a different ruleset.")
+        names = list(cls.rule_names().get(part_type, ()))
+        order = []
+        for name in orders.get(part_type, []):
+            index = names.index(name)
+            names[index] = None  # a rule listed twice maps to its next occurrence
+            order.append(index)
+        # Rules the frozen order doesn't list still run, after the listed ones.
+        return tuple(order) + tuple(index for index, name in enumerate(names) if name is not None)
+
+    def should_learn(self, cls) -> bool:
+        """Whether this validation should record its rule calls."""
+        if cls.__name__ in self._frozen:
+            return False
+        self._calls += 1
+        return self._calls % LEARN_SAMPLE == 1
+
+    def record(self, cls, part_type: str, index: int, count: int, rejected: bool, elapsed_ns: int):
+        """Count one rule call of a sampled validation."""
+        key = (cls.__name__, part_type)
+        counters = self._counters.get(key)
+        if counters is None:
+            counters = self._counters[key] = [_RuleCounters() for _ in range(count)]
+        counter = counters[index]
+        counter.calls += 1
+        counter.hits += rejected
+        counter.timed += 1
+        counter.total_ns += elapsed_ns
+
+        pending = self._pending.get(key, 0) + 1
+        if pending >= self.reorder_every:
+            pending = 0
+            self._reorder(key, counters)
+        self._pending[key] = pending
+
+    def _reorder(self, key, counters: List[_RuleCounters]):
+        timed = [counter.total_ns / counter.timed for counter in counters if counter.timed]
+        default_ns = sum(timed) / len(timed) if timed else 1.0
+        scores = [counter.score(default_ns) for counter in counters]
+        # Stable on ties, so rules nobody has seen fire keep their declared order.
+        self._orders[key] = tuple(sorted(range(len(counters)), key=lambda index: -scores[index]))
+
+    def freeze(self) -> Dict[str, dict]:
+        """
+        Export the current orders as rule names, tagged with each service's ruleset
+        fingerprint. Pass the result as `frozen=` (or `save()`/`load()` it) for
+        reproducible runs; a frozen order is rejected once the service's rules change.
+        """
+        frozen = {service: {"fingerprint": fingerprint, "order": dict(orders)}
+                  for service, (fingerprint, orders) in self._frozen.items()}
+        for (service, part_type), order in sorted(self._orders.items()):
+            if service in self._frozen:
+                continue
+            cls = self._classes[service]
+            names = cls.rule_names().get(part_type, ())
+            entry = frozen.setdefault(service, {"fingerprint": cls.ruleset_fingerprint(), "order": {}})
+            entry["order"][part_type] = [names[index] for index in order]
+        return frozen
+
+    def save(self, filename: str):
+        with open(filename, "w", encoding="utf-8") as f:
+            json.dump(self.freeze(), f, indent=2, sort_keys=True)
+
+    @classmethod
+    def load(cls, filename: str) -> "AdaptiveRuleOrder":
+        with open(filename, encoding="utf-8") as f:
+            return cls(frozen=json.load(f))
@@ -0,0 +1,116 @@
+"""
+Validate the member paths of zip and tar archives without extracting them.
+
+Zip member names come from the central directory alone. Tar members are read
+header by header and their data is skipped; an uncompressed tar skips it with
+seeks, while a compressed one still has to be decompressed in passing. No member
+content is ever read into memory. Names go straight into `validate_batch`, so a
+verdict cache can be shared with other batch jobs.
+
+Usage:
+    for result in validate_archive("sharepoint", "upload.zip"):
+        if not result.is_valid:
+            print(result.path, result.categories)
+
+From the command line:
+    python -m FPV.Helpers.archive sharepoint upload.zip
+"""
+
+import argparse
+import sys
+import tarfile
+import zipfile
+from collections import deque
+from typing import Iterator, Tuple
+
+from .batch import BatchResult, validate_batch
+from .corpus import resolve_service
+from .os_classes import FPV_Windows
+
+# Tar members kept in TarFile.members before the list is dropped.
+_TAR_MEMBER_WINDOW = 1000
+
+
+def _normalize(name: str) -> str:
+    """Member name as a relative path: no leading "./" or "/", no trailing "/"."""
+    while name.startswith("./"):
+        name = name[2:]
+    return name.strip("/")
+
+
+def archive_members(filename: str) -> Iterator[Tuple[str, bool]]:
+    """
+    Yield (name, is_dir) for every member of a zip or tar archive, in archive order.
+
+    Raises:
+        ValueError: If the file is neither a zip nor a tar archive.
+    """
+    if zipfile.is_zipfile(filename):
+        with zipfile.ZipFile(filename) as archive:
+            for info in archive.infolist():
+                yield info.filename, info.is_dir()
+    elif tarfile.is_tarfile(filename):
+        with tarfile.open(filename, "r:*") as archive:
+            for count, member in enumerate(archive, 1):
+                yield member.name, member.isdir()
+                if count % _TAR_MEMBER_WINDOW == 0:
+                    archive.members = []  # TarFile otherwise keeps every header it has read
+    else:
+        raise ValueError(f"{filename} is not a zip or tar archive.")
+
+
+def validate_archive(service, filename: str, cache=None, clean: bool = False, with_issues: bool = False,
+                     chunk_size: int = 1000) -> Iterator[BatchResult]:
+    """
+    Validate every member path of an archive for `service`.
+
+    Files are validated as they are read, with `file_added=True`. Directory entries
+    are validated as folders once all files are done; directories that only appear
+    inside file paths are covered by those paths. Each result's `path` is the member
+    name as stored in the archive.
+
+    Args:
+        service: Service class or name.
+        filename: Zip or tar archive (tar may be gzip, bzip2 or xz compressed).
+        cache, clean, with_issues, chunk_size: Passed to `validate_batch`.
+    """
+    cls = resolve_service(service)
+    sep = "\\" if issubclass(cls, FPV_Windows) else "/"
+    directories = []
+    originals = deque()
+
+    def files():
+        for name, is_dir in archive_members(filename):
+            if is_dir:
+                directories.append(name)
+                continue
+            originals.append(name)
+            yield _normalize(name).replace("/", sep)
+
+    batch_kwargs = {"cache": cache, "clean": clean, "with_issues": with_issues, "chunk_size": chunk_size}
+    for result in validate_batch(cls, files(), file_added=True, **batch_kwargs):
+        yield result._replace(path=originals.popleft())
+
+    paths = [_normalize(name).replace("/", sep) for name in directories]
+    for name, result in zip(directories, validate_batch(cls, paths, file_added=False, **batch_kwargs)):
+        yield result._replace(path=name)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate the member paths of a zip or tar archive.")
+    parser.add_argument("service")
+    parser.add_argument("archive")
+    args = parser.parse_args(argv)
+
+    total = invalid = 0
+    for result in validate_archive(args.service, args.archive):
+        total += 1
+        if not result.is_valid:
+            invalid += 1
+            print(f"{result.path}\t{','.join(result.categories)}")
+    print(f"{invalid} of {total} members invalid", file=sys.stderr)
+    return 1 if invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
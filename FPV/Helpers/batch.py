@@ -0,0 +1,113 @@
+"""
+Batch validation of many paths for one service, with an optional verdict cache.
+
+Usage:
+    from FPV.Helpers.batch import validate_batch
+    from FPV.Helpers.verdict_cache import VerdictCache
+
+    with VerdictCache("verdicts.db") as cache:
+        for result in validate_batch("windows", paths, cache=cache, file_added=True):
+            if not result.is_valid:
+                print(result.path, result.categories)
+"""
+
+from itertools import islice
+from typing import Iterable, Iterator, List, NamedTuple, Optional
+
+from ._categories import categories_to_mask, mask_to_categories
+from .corpus import resolve_service
+from .prescreen import screen
+
+
+class BatchResult(NamedTuple):
+    """
+    Verdict for one path.
+
+    `issues` holds the full issue dicts when the rules ran for this path, and is
+    None when the verdict came from the cache (pass `with_issues=True` to rerun
+    the rules for invalid cached paths) or from the pre-screen. `cleaned_path` is
+    None unless cleaning was requested.
+    """
+    path: str
+    is_valid: bool
+    issue_mask: int
+    issues: Optional[List[dict]]
+    cleaned_path: Optional[str]
+    cached: bool
+
+    @property
+    def categories(self) -> List[str]:
+        return mask_to_categories(self.issue_mask)
+
+
+def _run(cls, path: str, clean: bool, kwargs: dict) -> BatchResult:
+    issues = cls(path, auto_validate=False, **kwargs).validate(raise_error=False)
+    mask = categories_to_mask(issue["category"] for issue in issues)
+    cleaned_path = cls(path, auto_validate=False, **kwargs).clean(raise_error=False) if clean else None
+    return BatchResult(path, not issues, mask, issues, cleaned_path, False)
+
+
+def validate_batch(service, paths: Iterable[str], cache=None, clean: bool = False, with_issues: bool = False,
+                   relative: bool = True, file_added: bool = False, chunk_size: int = 1000,
+                   prescreen: bool = False) -> Iterator[BatchResult]:
+    """
+    Validate (and optionally clean) paths, consulting a VerdictCache first.
+
+    Paths are processed in chunks of `chunk_size`: one cache transaction looks the
+    whole chunk up, the rules run only for the misses, and one more transaction
+    stores the new verdicts. Results are yielded in input order.
+
+    Args:
+        service: Service class or name ("windows", "egnyte", ...).
+        paths: Any iterable of paths; it is consumed lazily.
+        cache: Optional VerdictCache. Bytes paths can't be cached and raise ValueError.
+        clean: Also compute the cleaned path for every entry.
+        with_issues: Rerun the rules for invalid paths served from the cache, so every
+            invalid result carries its issue dicts.
+        relative: Passed to the service class.
+        file_added: Passed to the service class.
+        chunk_size: Paths per cache transaction.
+        prescreen: Screen each chunk for PATH_LENGTH and INVALID_CHAR first (see
+            `prescreen.screen`, vectorized when NumPy is installed). Flagged paths are
+            reported invalid without running the rules, so their `issue_mask` only
+            holds the screened categories and they are not cached. Ignored with
+            `clean` or `with_issues`, which need the rules for every invalid path.
+    """
+    cls = resolve_service(service)
+    kwargs = {"relative": relative, "file_added": file_added}
+    ruleset = cache.ruleset_id(cls, relative, file_added) if cache is not None else None
+    prescreen = prescreen and not (clean or with_issues)
+    paths = iter(paths)
+
+    while True:
+        chunk = list(islice(paths, chunk_size))
+        if not chunk:
+            return
+
+        if cache is not None and any(isinstance(path, bytes) for path in chunk):
+            raise ValueError("The verdict cache holds str paths only; decode bytes paths or pass cache=None.")
+        found = cache.get_many(ruleset, chunk) if cache is not None else {}
+        screened = {}
+        if prescreen:
+            misses = [path for path in chunk if path not in found]
+            screened = dict(zip(misses, screen(cls, misses, relative=relative, file_added=file_added)))
+        results = []
+        new_entries = []
+        for path in chunk:
+            verdict = found.get(path)
+            if verdict is not None and not (clean and verdict[1] is None):
+                mask, cleaned_path = verdict
+                if with_issues and mask:
+                    result = _run(cls, path, False, kwargs)._replace(cleaned_path=cleaned_path if clean else None, cached=True)
+                else:
+                    result = BatchResult(path, not mask, mask, None if mask else [], cleaned_path if clean else None, True)
+            elif screened.get(path):
+                result = BatchResult(path, False, screened[path], None, None, False)
+            else:
+                result = _run(cls, path, clean, kwargs)
+                new_entries.append((path, result.issue_mask, result.cleaned_path))
+            results.append(result)
+
+        if cache is not None and new_entries:
+            cache.put_many(ruleset, new_entries)
+        yield from results
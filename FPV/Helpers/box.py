@@ -5,6 +5,7 @@ class FPV_Box(FPV_Base):
     # Box-specific invalid characters, maximum length, and restricted names
     invalid_characters = '<>:"|?*'
     max_length = 255
+    case_insensitive = True
     restricted_names = {
         "outlook.pst", "quickbooks.qbb", "google_docs.gdoc", 
         "google_sheets.gsheet", "google_slides.gslides", "mac_package.pkg"
@@ -0,0 +1,383 @@
+"""
+Sibling collision detection for migrations.
+
+FPV validates one path at a time, but a migration also fails when two source
+names land on the same target name: `Report.docx` and `report.docx` on a
+case-insensitive target, or `a?b` and `ab` once `clean()` has removed the `?`.
+A collision key is the cleaned name, casefolded when the service's
+`case_insensitive` flag is set; siblings sharing a key form a collision group.
+
+Only one directory's siblings are compared at a time. `tree_collisions` walks a
+directory tree one folder at a time, and `find_collisions` streams a manifest in
+tree order (see `manifest.sort_manifest`), keeping just the folders on the
+current branch open, so memory grows with depth and fan-out rather than with the
+size of the manifest.
+
+`clean_unique` goes one step further and assigns every path a target name that
+is clean and unique among its siblings ("name (1).ext", ...), in one pass.
+
+Usage:
+    for group in manifest_collisions("sharepoint", "share.txt"):
+        print(group.parent, group.names)
+
+From the command line:
+    python -m FPV.Helpers.collisions sharepoint share.txt
+    python -m FPV.Helpers.collisions windows /mnt/share --tree
+    python -m FPV.Helpers.collisions windows share.txt --plan > renames.tsv
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple
+
+from .corpus import resolve_service
+from .manifest import read_records, sort_manifest
+
+# Cleaned names memoized per detector before the memo is reset.
+_MAX_MEMO = 100_000
+
+
+class CollisionGroup(NamedTuple):
+    """Siblings under `parent` that map to the same target name `key`."""
+    parent: str
+    key: str
+    names: Tuple[str, ...]
+
+
+class CollisionDetector:
+    """
+    Computes collision keys for one service and groups siblings by them.
+
+    Args:
+        service: Service class or name ("windows", "sharepoint", ...).
+        case_insensitive: Compare names case-insensitively. Defaults to the
+            service's `case_insensitive` flag.
+        clean: Compare the names `clean()` would produce rather than the names as given.
+    """
+
+    def __init__(self, service, case_insensitive: Optional[bool] = None, clean: bool = True):
+        self.cls = resolve_service(service)
+        self.case_insensitive = self.cls.case_insensitive if case_insensitive is None else case_insensitive
+        self.clean = clean
+        self.part_length = getattr(self.cls, "part_length", 0)
+        self._memo = {}
+
+    def cleaned_name(self, name: str, is_file: bool) -> str:
+        """Return `name` as the service's `clean()` leaves it, or "" if cleaning removes it."""
+        memo_key = (name, is_file)
+        cleaned = self._memo.get(memo_key)
+        if cleaned is None:
+            validator = self.cls(name, auto_validate=False, file_added=is_file)
+            cleaned = validator.clean(raise_error=False).strip(validator.sep)
+            if len(self._memo) >= _MAX_MEMO:
+                self._memo.clear()
+            self._memo[memo_key] = cleaned
+        return cleaned
+
+    def fold(self, name: str) -> str:
+        return name.casefold() if self.case_insensitive else name
+
+    def key(self, name: str, is_file: bool) -> str:
+        """Collision key of one name; names with equal keys cannot coexist in one folder."""
+        return self.fold(self.cleaned_name(name, is_file) if self.clean else name)
+
+    def group(self, parent: str, entries: Iterable[Tuple[str, bool]]) -> Iterator[CollisionGroup]:
+        """Yield the collision groups among the (name, is_file) entries of one folder."""
+        siblings = {}
+        for name, is_file in entries:
+            key = self.key(name, is_file)
+            if key:  # names that clean() removes entirely cannot collide
+                siblings.setdefault(key, []).append(name)
+        for key, names in siblings.items():
+            if len(names) > 1:
+                yield CollisionGroup(parent, key, tuple(names))
+
+
+    def available(self, parent_length: int) -> Optional[int]:
+        """
+        Characters left for a name under a parent path of `parent_length` characters,
+        separator included: 0 if the service has no `max_length`, None if none are left.
+        """
+        if not self.cls.max_length:
+            return 0
+        room = self.cls.max_length - parent_length
+        return room if room > 0 else None
+
+    def fit(self, name: str, is_file: bool, suffix: str = "", available: int = 0) -> str:
+        """
+        Insert `suffix` before a file's extension and shorten the name to the service's
+        `part_length` and to `available` characters (0 means unlimited). Returns "" if
+        not even one character of the name fits.
+        """
+        dot = name.rfind(".") if is_file else -1
+        stem, extension = (name[:dot], name[dot:]) if dot > 0 else (name, "")
+        limit = min(length for length in (self.part_length, available, len(name) + len(suffix)) if length > 0)
+        room = limit - len(suffix) - len(extension)
+        if room < len(stem):
+            # A cut can leave trailing whitespace or periods, which most targets reject.
+            stem = stem[:max(room, 0)].rstrip(" .")
+        return stem + suffix + extension if stem else ""
+
+    def assign(self, siblings: "_Siblings", name: str, is_file: bool, available: int = 0) -> Optional[str]:
+        """
+        Clean `name` and make it unique among `siblings`, adding " (1)", " (2)", ...
+        on a collision. Returns None if cleaning removes the name or it cannot fit.
+        """
+        cleaned = self.cleaned_name(name, is_file)
+        if not cleaned:
+            return None
+        base = self.fold(cleaned)
+        number = siblings.next_number.get(base, 0)
+        while True:
+            candidate = self.fit(cleaned, is_file, f" ({number})" if number else "", available)
+            if not candidate:
+                return None
+            key = self.fold(candidate)
+            if key not in siblings.taken:
+                siblings.taken.add(key)
+                siblings.next_number[base] = number + 1
+                return candidate
+            number += 1
+
+
+class _Siblings:
+    """Names already handed out in one folder, and the next suffix to try per cleaned name."""
+    __slots__ = ("taken", "next_number")
+
+    def __init__(self):
+        self.taken = set()
+        self.next_number = {}
+
+
+class UniqueName(NamedTuple):
+    """Target path for one source path; `cleaned_path` is None if the entry cannot be placed."""
+    path: str
+    cleaned_path: Optional[str]
+
+
+def _tree_entries(paths: Iterable[str], sep: str, file_added: bool) -> Iterator[Tuple[int, str, bool, Optional[str]]]:
+    """
+    Yield (depth, name, is_file, record) for every file and folder of tree-ordered paths.
+
+    Folders only implied by deeper paths are yielded too, with `record` None. A folder
+    always comes before its contents, and an entry at depth d means every folder deeper
+    than d that was open before it is complete. The last part of a path is a file when
+    `file_added`, unless the next path lies inside it.
+    """
+    previous, previous_path = [], None
+    for path in paths:
+        parts = path.strip(sep).split(sep)
+        if parts == previous:
+            continue
+        common = 0
+        for old, new in zip(previous, parts):
+            if old != new:
+                break
+            common += 1
+        if previous:
+            yield len(previous) - 1, previous[-1], file_added and common < len(previous), previous_path
+        for depth in range(common, len(parts) - 1):
+            yield depth, parts[depth], False, None
+        previous, previous_path = parts, path
+    if previous:
+        yield len(previous) - 1, previous[-1], file_added, previous_path
+
+
+def find_collisions(service, paths: Iterable[str], sep: str = "/", file_added: bool = True,
+                    case_insensitive: Optional[bool] = None, clean: bool = True) -> Iterator[CollisionGroup]:
+    """
+    Stream collision groups from paths in tree order.
+
+    Folders that are only implied by deeper paths count as siblings too. A group is
+    reported once its folder is complete, i.e. as soon as the stream leaves it.
+
+    Args:
+        service: Service class or name.
+        paths: Paths sorted with `manifest.sort_key`, so that everything inside a
+            folder is contiguous. Duplicate paths are ignored.
+        sep: Separator used by the paths.
+        file_added: The last part of a path is a file, unless a later path lies inside it.
+        case_insensitive: Overrides the service's `case_insensitive` flag.
+        clean: Compare cleaned names.
+    """
+    detector = CollisionDetector(service, case_insensitive=case_insensitive, clean=clean)
+    open_folders = []  # open_folders[d] holds the children seen so far of branch[:d]
+    branch = []
+
+    def close_folders(depth):
+        while len(open_folders) > depth:
+            children = open_folders.pop()
+            yield from detector.group(sep.join(branch[:len(open_folders)]), children.items())
+
+    for depth, name, is_file, _ in _tree_entries(paths, sep, file_added):
+        yield from close_folders(depth + 1)
+        if depth == len(open_folders):
+            open_folders.append({})
+        open_folders[depth][name] = is_file
+        del branch[depth:]
+        branch.append(name)
+    yield from close_folders(0)
+
+
+def clean_unique(service, paths: Iterable[str], sep: str = "/", file_added: bool = True,
+                 case_insensitive: Optional[bool] = None) -> Iterator[UniqueName]:
+    """
+    Clean tree-ordered paths so that no two siblings end up with the same target name.
+
+    Every name is cleaned on its own. The first sibling to claim a cleaned name keeps it,
+    later ones become "name (1).ext", "name (2).ext", ... Names are shortened to fit the
+    service's `max_length` and `part_length`. A renamed folder carries its new name
+    into everything inside it. An entry whose name `clean()` removes, or that cannot fit,
+    gets `cleaned_path` None, and so does everything inside it. Only the folders on the
+    current branch are kept in memory, so one pass handles manifests of any size. The
+    result depends only on the set of paths.
+
+    Args:
+        service: Service class or name.
+        paths: Paths sorted with `manifest.sort_key`. Duplicate paths are ignored.
+        sep: Separator of `paths` and of the returned cleaned paths.
+        file_added: The last part of a path is a file, unless a later path lies inside it.
+        case_insensitive: Overrides the service's `case_insensitive` flag.
+
+    Yields:
+        UniqueName: One per distinct input path, in input order.
+    """
+    detector = CollisionDetector(service, case_insensitive=case_insensitive)
+    folders = []  # folders[d] holds the names given out among the children of branch[:d]
+    branch = []  # target names of the entries on the current branch, None once one is dropped
+
+    for depth, name, is_file, record in _tree_entries(paths, sep, file_added):
+        del folders[depth + 1:]
+        del branch[depth:]
+        if depth == len(folders):
+            folders.append(_Siblings())
+        cleaned = None
+        if None not in branch:
+            available = detector.available(len(sep.join(branch)) + len(sep) if branch else 0)
+            if available is not None:
+                cleaned = detector.assign(folders[depth], name, is_file, available)
+        branch.append(cleaned)
+        if record is not None:
+            yield UniqueName(record, None if cleaned is None else sep.join(branch))
+
+
+def tree_clean_unique(service, root: str, sep: str = "/",
+                      case_insensitive: Optional[bool] = None) -> Iterator[UniqueName]:
+    """
+    `clean_unique` for a local directory tree, walked one folder at a time. Siblings
+    are visited in sorted order, so the names match those `clean_unique` gives a
+    manifest of the same tree. `path` is relative to `root`.
+    """
+    detector = CollisionDetector(service, case_insensitive=case_insensitive)
+    targets = {root: ""}  # target path of every folder waiting to be walked
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        parent = targets.pop(dirpath)
+        relative = os.path.relpath(dirpath, root)
+        siblings = _Siblings()
+        is_dir = set(dirnames)
+        for name in sorted(dirnames + filenames):
+            cleaned = None
+            if parent is not None:
+                available = detector.available(len(parent) + len(sep) if parent else 0)
+                if available is not None:
+                    cleaned = detector.assign(siblings, name, name not in is_dir, available)
+            target = None if cleaned is None else (parent + sep + cleaned if parent else cleaned)
+            if name in is_dir:
+                targets[os.path.join(dirpath, name)] = target
+            yield UniqueName(name if relative == os.curdir else os.path.join(relative, name), target)
+
+
+def manifest_collisions(service, filename: str, sep: str = "/", delimiter: str = "\n", presorted: bool = False,
+                        file_added: bool = True, case_insensitive: Optional[bool] = None, clean: bool = True,
+                        tmpdir: str = None) -> Iterator[CollisionGroup]:
+    """
+    Collision groups of a manifest file. Unless `presorted`, the manifest is first
+    put into tree order with the external `sort_manifest`, in a temporary file.
+    """
+    if presorted:
+        yield from find_collisions(service, read_records(filename, delimiter), sep=sep, file_added=file_added,
+                                   case_insensitive=case_insensitive, clean=clean)
+        return
+
+    fd, sorted_name = tempfile.mkstemp(prefix="fpv-collisions-", dir=tmpdir)
+    os.close(fd)
+    try:
+        sort_manifest(filename, sorted_name, sep=sep, delimiter=delimiter, tmpdir=tmpdir)
+        yield from find_collisions(service, read_records(sorted_name, delimiter), sep=sep, file_added=file_added,
+                                   case_insensitive=case_insensitive, clean=clean)
+    finally:
+        os.remove(sorted_name)
+
+
+def tree_collisions(service, root: str, case_insensitive: Optional[bool] = None,
+                    clean: bool = True) -> Iterator[CollisionGroup]:
+    """Walk a local directory tree one folder at a time; `parent` is the folder's path relative to `root`."""
+    detector = CollisionDetector(service, case_insensitive=case_insensitive, clean=clean)
+    for dirpath, dirnames, filenames in os.walk(root):
+        parent = os.path.relpath(dirpath, root)
+        entries = [(name, False) for name in dirnames] + [(name, True) for name in filenames]
+        yield from detector.group("" if parent == os.curdir else parent, entries)
+
+
+def _print_plan(args, case_insensitive) -> int:
+    if args.tree:
+        names = tree_clean_unique(args.service, args.source, sep=args.sep, case_insensitive=case_insensitive)
+    else:
+        delimiter = "\0" if args.null else "\n"
+        source = args.source
+        if not args.presorted:
+            fd, source = tempfile.mkstemp(prefix="fpv-plan-", dir=args.tmpdir)
+            os.close(fd)
+            sort_manifest(args.source, source, sep=args.sep, delimiter=delimiter, tmpdir=args.tmpdir)
+        names = clean_unique(args.service, read_records(source, delimiter), sep=args.sep,
+                             file_added=not args.folders_only, case_insensitive=case_insensitive)
+    try:
+        changed = 0
+        for path, cleaned_path in names:
+            if cleaned_path != path.strip(args.sep):
+                changed += 1
+                print(f"{path}\t{'' if cleaned_path is None else cleaned_path}")
+        print(f"{changed} paths to rename", file=sys.stderr)
+    finally:
+        if not args.tree and not args.presorted:
+            os.remove(source)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Find sibling names that collide on the target service.")
+    parser.add_argument("service")
+    parser.add_argument("source", help="Manifest file, or a directory with --tree")
+    parser.add_argument("--tree", action="store_true", help="Walk a local directory instead of reading a manifest")
+    parser.add_argument("--sep", default="/")
+    parser.add_argument("--null", action="store_true", help="Records are NUL delimited")
+    parser.add_argument("--presorted", action="store_true")
+    parser.add_argument("--folders-only", action="store_true", help="The last part of each path is a folder")
+    parser.add_argument("--case-sensitive", action="store_true", help="Ignore the service's case-insensitivity")
+    parser.add_argument("--plan", action="store_true",
+                        help="Print a unique cleaned target for every path that needs renaming instead")
+    parser.add_argument("--tmpdir")
+    args = parser.parse_args(argv)
+
+    case_insensitive = False if args.case_sensitive else None
+    if args.plan:
+        return _print_plan(args, case_insensitive)
+    if args.tree:
+        groups = tree_collisions(args.service, args.source, case_insensitive=case_insensitive)
+    else:
+        groups = manifest_collisions(args.service, args.source, sep=args.sep, delimiter="\0" if args.null else "\n",
+                                     presorted=args.presorted, file_added=not args.folders_only,
+                                     case_insensitive=case_insensitive, tmpdir=args.tmpdir)
+    found = 0
+    for group in groups:
+        found += 1
+        print(f"{group.parent or '.'}\t" + "\t".join(group.names))
+    print(f"{found} collision groups", file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+"""
+Column-oriented validation for inventories held as lists, NumPy arrays or pandas Series.
+
+`validate_column` runs a whole column through `validate_batch` and packs the
+verdicts into columns again: one boolean per row, one category bitmask per row
+(see `_categories`) and, if requested, the cleaned paths. Nothing per row
+outlives the batch loop, so no FPV object or issue list is kept for the column.
+
+Rows are not validated as a column, though. Every row that the cache or the
+pre-screen doesn't settle still builds a short-lived validator and issue list
+(two validators with `clean=True`). Pass a `cache` or `prescreen=True` to skip
+them for repeat or clearly invalid rows.
+
+Usage:
+    result = validate_column("box", df["path"], file_added=True)
+    df["valid"], df["issues"] = result.is_valid, result.issue_mask
+    invalid = df[~result.is_valid]
+"""
+
+from array import array
+from typing import Any, NamedTuple, Optional
+
+from .batch import validate_batch
+from .prescreen import numpy_available
+
+
+class ColumnResult(NamedTuple):
+    """
+    Verdicts for a column, row-aligned with the input.
+
+    With NumPy installed, `is_valid` and `issue_mask` are NumPy arrays (bool and
+    int64); otherwise they are `array.array` objects ("B" and "q"). For a pandas
+    Series input, all columns are Series sharing its index. `cleaned_path` is None
+    unless cleaning was requested.
+    """
+    is_valid: Any
+    issue_mask: Any
+    cleaned_path: Optional[Any]
+
+
+def _rows(column):
+    """The column's values as a flat sequence of Python objects."""
+    if hasattr(column, "tolist"):  # NumPy arrays and pandas Series convert in one C call
+        values = column.tolist()
+        if values and isinstance(values[0], list):
+            raise ValueError("validate_column expects a one-dimensional column.")
+        return values
+    return list(column)
+
+
+def _checked(rows):
+    for row, path in enumerate(rows):
+        if not isinstance(path, (str, bytes)):
+            raise ValueError(f"Row {row} is not a path: {path!r}.")
+        yield path
+
+
+def validate_column(service, column, clean: bool = False, cache=None, relative: bool = True,
+                    file_added: bool = False, chunk_size: int = 1000, prescreen: bool = False) -> ColumnResult:
+    """
+    Validate every path of a column.
+
+    Args:
+        service: Service class or name.
+        column: List, tuple, one-dimensional NumPy array (object, str or bytes dtype)
+            or pandas Series of paths. Missing values (None, NaN) are rejected.
+        clean: Also return the cleaned path of every row.
+        cache, relative, file_added, chunk_size, prescreen: Passed to `validate_batch`.
+
+    Returns:
+        ColumnResult: Row-aligned is_valid, issue_mask and cleaned_path columns.
+
+    Raises:
+        ValueError: If a row is not a str or bytes path, or a bytes row meets a cache.
+    """
+    rows = _rows(column)
+    is_valid, issue_mask = array("B"), array("q")
+    cleaned = [] if clean else None
+    results = validate_batch(service, _checked(rows), cache=cache, clean=clean, relative=relative,
+                             file_added=file_added, chunk_size=chunk_size, prescreen=prescreen)
+    for result in results:
+        is_valid.append(result.is_valid)
+        issue_mask.append(result.issue_mask)
+        if clean:
+            cleaned.append(result.cleaned_path)
+
+    if numpy_available():
+        import numpy as np
+        is_valid = np.array(is_valid, dtype=np.bool_)
+        issue_mask = np.array(issue_mask, dtype=np.int64)
+        if clean:
+            cleaned_column = np.empty(len(cleaned), dtype=object)
+            cleaned_column[:] = cleaned
+            cleaned = cleaned_column
+    if hasattr(column, "index") and hasattr(column, "to_numpy"):  # pandas Series, without importing pandas
+        series = type(column)
+        is_valid = series(is_valid, index=column.index, name="is_valid")
+        issue_mask = series(issue_mask, index=column.index, name="issue_mask")
+        if clean:
+            cleaned = series(cleaned, index=column.index, name="cleaned_path")
+    return ColumnResult(is_valid, issue_mask, cleaned)
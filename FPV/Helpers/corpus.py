@@ -0,0 +1,365 @@
+"""
+Deterministic synthetic path corpora for benchmarks and load tests.
+
+`PathCorpus` streams relative paths for one service class. Folders come from a
+virtual tree (so the same folder names repeat across paths, as they do in real
+shares), file names are drawn per path, and a configurable share of paths has
+exactly one violation injected, chosen from the categories that service checks.
+The same seed always produces the same stream.
+
+Usage:
+    corpus = PathCorpus("egnyte", seed=7, depth=(2, 12), violation_rate=0.1)
+    for item in corpus.generate(1_000_000):
+        FPV_Egnyte(item.path, auto_validate=False, file_added=True).validate(raise_error=False)
+"""
+
+import os
+import random
+import re
+import zlib
+from bisect import bisect
+from itertools import accumulate
+from typing import Iterator, NamedTuple, Optional
+
+from ._base import FPV_Base
+from .os_classes import FPV_Windows, FPV_MacOS, FPV_Linux
+from .dropbox import FPV_Dropbox
+from .egnyte import FPV_Egnyte
+from .onedrive import FPV_OneDrive
+from .sharepoint import FPV_SharePoint
+from .sharefile import FPV_ShareFile
+from .box import FPV_Box
+
+SERVICES = {
+    "windows": FPV_Windows,
+    "macos": FPV_MacOS,
+    "linux": FPV_Linux,
+    "dropbox": FPV_Dropbox,
+    "box": FPV_Box,
+    "egnyte": FPV_Egnyte,
+    "onedrive": FPV_OneDrive,
+    "sharepoint": FPV_SharePoint,
+    "sharefile": FPV_ShareFile,
+}
+
+# Category -> the rule that detects it. A service supports injecting a category
+# when one of its part types runs that rule.
+CATEGORY_RULES = {
+    "INVALID_CHAR": "process_invalid_characters",
+    "RESTRICTED_NAME": "process_restricted_names",
+    "TRAILING_PERIOD": "process_trailing_periods",
+    "WHITESPACE": "process_whitespace",
+    "PATH_LENGTH": "process_path_length",
+    "SUFFIX": "process_restricted_suffixes",
+    "PREFIX": "process_restricted_prefixes",
+    "TEMP_PATTERN": "process_temp_patterns",
+    "RESTRICTED_PREFIX": "process_restricted_prefix",
+    "LEADING_PERIOD": "process_leading_periods",
+}
+INJECTABLE_CATEGORIES = tuple(CATEGORY_RULES)
+
+# None of these trip any service's rules on their own.
+FOLDER_WORDS = (
+    "Projects", "Reports", "Clients", "Finance", "Archive", "Shared", "Marketing",
+    "Engineering", "Legal", "HR", "Invoices", "Contracts", "Photos", "Drafts",
+    "Templates", "Design", "Research", "Meetings", "Budget", "Sales", "Q1", "Q2",
+    "Q3", "Q4", "2021", "2022", "2023", "2024", "Backups", "Exports", "Assets",
+    "Docs", "Team", "Personal", "Scans", "Notes", "Vendors", "Training",
+    "Policies", "Working Files",
+)
+UNICODE_WORDS = (
+    "Résumé", "Données", "Über uns", "Año fiscal", "データ", "資料", "Отчёты",
+    "Документы", "文档", "项目", "Ελληνικά", "Ürünler", "Café", "Naïve",
+    "Øresund", "Zürich", "Kraków", "São Paulo",
+)
+FILE_STEMS = (
+    "notes", "summary", "invoice", "scan", "draft", "final", "report", "budget",
+    "minutes", "photo", "contract", "agenda", "backup", "export", "plan",
+)
+EXTENSIONS = (".txt", ".docx", ".pdf", ".xlsx", ".csv", ".jpg", ".png", ".pptx", ".md", ".json")
+
+# Long parts are never truncated below this when a path has to be fitted under max_length.
+_MIN_FITTED_PART = 32
+
+
+class CorpusPath(NamedTuple):
+    """One generated path and the violation injected into it, if any."""
+    path: str
+    category: Optional[str]
+    index: Optional[int]
+
+
+def resolve_service(service):
+    """Accept a service class or its lowercase name ("windows", "egnyte", ...)."""
+    if isinstance(service, type) and issubclass(service, FPV_Base):
+        return service
+    try:
+        return SERVICES[str(service).lower()]
+    except KeyError:
+        raise ValueError(f"Unsupported service: {service}")
+
+
+def supported_categories(cls) -> tuple:
+    """Return the injectable categories that `cls` actually checks."""
+    rules = cls.rule_names()
+    checked = set(rules["folder"]) | set(rules["file"])
+    supported = []
+    for category, rule in CATEGORY_RULES.items():
+        if rule not in checked:
+            continue
+        if category == "INVALID_CHAR" and not cls.invalid_characters:
+            continue
+        if category == "RESTRICTED_NAME" and not cls.restricted_names:
+            continue
+        if category == "PATH_LENGTH" and not cls.max_length:
+            continue
+        supported.append(category)
+    return tuple(supported)
+
+
+def _sampler(spec, name: str):
+    """Turn an int, an inclusive (low, high) range or a callable(rng) into a callable(rng)."""
+    if callable(spec):
+        return spec
+    if isinstance(spec, int):
+        return lambda rng: spec
+    if isinstance(spec, (tuple, list)) and len(spec) == 2:
+        low, high = spec
+        return lambda rng: rng.randint(low, high)
+    raise ValueError(f"{name} must be an int, a (low, high) range or a callable.")
+
+
+class PathCorpus:
+    """
+    Seeded stream of relative paths for one service, each ending in a file part.
+
+    Args:
+        service: Service class or name.
+        seed: Any value accepted by random.Random; equal seeds give equal streams.
+        depth: Folders per path: an int, an inclusive (low, high) range or a callable(rng).
+        fanout: Children per folder in the virtual tree. Lower indexes are picked more often.
+        fanout_skew: Zipf exponent for that choice; 0 picks children uniformly.
+        unicode_rate: Share of folder names drawn from non-ASCII words.
+        long_part_rate: Share of folder names padded out to `long_part_length` characters.
+        long_part_length: Inclusive (low, high) length of long folder names.
+        violation_rate: Share of paths that get one injected violation.
+        categories: Categories to inject, as a list or a {category: weight} dict.
+            Defaults to every category the service supports, equally weighted.
+        fit_length: Keep paths without a PATH_LENGTH injection under the service's
+            max_length by shortening long folders, then dropping the deepest ones.
+    """
+
+    def __init__(self, service, seed=0, depth=(1, 8), fanout: int = 12, fanout_skew: float = 1.0,
+                 unicode_rate: float = 0.1, long_part_rate: float = 0.02, long_part_length=(100, 200),
+                 violation_rate: float = 0.0, categories=None, fit_length: bool = True):
+        self.cls = resolve_service(service)
+        self.sep = "\\" if issubclass(self.cls, FPV_Windows) else "/"
+        self.seed = seed
+        self._depth = _sampler(depth, "depth")
+        self.fanout = max(1, fanout)
+        self._child_weights = list(accumulate(1 / (k + 1) ** fanout_skew for k in range(self.fanout)))
+        self.unicode_rate = unicode_rate
+        self.long_part_rate = long_part_rate
+        self.long_part_length = long_part_length
+        self.violation_rate = violation_rate
+        self.fit_length = fit_length
+
+        supported = supported_categories(self.cls)
+        if categories is None:
+            categories = {category: 1 for category in supported}
+        elif not isinstance(categories, dict):
+            categories = {category: 1 for category in categories}
+        unsupported = [category for category in categories if category not in supported]
+        if unsupported:
+            raise ValueError(f"{self.cls.__name__} does not check {', '.join(unsupported)}.")
+        self.categories = tuple(categories)
+        self._category_weights = list(accumulate(categories.values()))
+        if violation_rate and not self.categories:
+            raise ValueError(f"{self.cls.__name__} has no categories to inject.")
+
+        rules = self.cls.rule_names()
+        self._folder_rules = set(rules["folder"])
+        self._file_rules = set(rules["file"])
+        self._checks_length = ("process_path_length" in (self._folder_rules | self._file_rules)) and self.cls.max_length > 0
+        self._part_limit = min(getattr(self.cls, "part_length", 200), 200)
+        self._temp_patterns = [re.compile(pattern) for pattern in getattr(self.cls, "temp_patterns", [])]
+
+    # -- streaming ----------------------------------------------------------
+
+    def __iter__(self) -> Iterator[CorpusPath]:
+        return self.generate()
+
+    def generate(self, count: int = None) -> Iterator[CorpusPath]:
+        """Yield `count` CorpusPath entries, or an endless stream when count is None."""
+        rng = random.Random(self.seed)
+        produced = 0
+        while count is None or produced < count:
+            yield self._make_path(rng)
+            produced += 1
+
+    def paths(self, count: int = None) -> Iterator[str]:
+        """Yield only the path strings."""
+        for item in self.generate(count):
+            yield item.path
+
+    # -- tree and names -----------------------------------------------------
+
+    def _node(self, parent: int, child: int) -> int:
+        return zlib.crc32(f"{self.seed}/{parent}/{child}".encode("utf-8"))
+
+    def _folder_name(self, key: int) -> str:
+        if (key >> 16) % 1000 < self.long_part_rate * 1000:
+            low, high = self.long_part_length
+            return self._long_name(random.Random(key), low + key % (high - low + 1))
+        words = UNICODE_WORDS if (key >> 6) % 1000 < self.unicode_rate * 1000 else FOLDER_WORDS
+        name = words[key % len(words)]
+        variant = (key >> 26) % 4
+        if variant == 1:
+            name = f"{name} {(key >> 12) % 100:02d}"
+        elif variant == 2:
+            name = f"{name}_{FOLDER_WORDS[(key >> 12) % len(FOLDER_WORDS)]}"
+        return name
+
+    def _long_name(self, rng: random.Random, length: int) -> str:
+        words = []
+        size = 0
+        while size < length:
+            word = rng.choice(FOLDER_WORDS + UNICODE_WORDS if self.unicode_rate else FOLDER_WORDS)
+            words.append(word)
+            size += len(word) + 1
+        return "_".join(words)[:length].rstrip(" ._") or "Long"
+
+    def _file_name(self, rng: random.Random) -> str:
+        stem = rng.choice(FILE_STEMS)
+        if rng.random() < 0.7:
+            stem = f"{stem}_{rng.randrange(10000)}"
+        return stem + rng.choice(EXTENSIONS)
+
+    def _make_path(self, rng: random.Random) -> CorpusPath:
+        parts = []
+        key = 0
+        for _ in range(max(0, self._depth(rng))):
+            child = bisect(self._child_weights, rng.random() * self._child_weights[-1])
+            key = self._node(key, min(child, self.fanout - 1))
+            parts.append(self._folder_name(key))
+        parts.append(self._file_name(rng))
+
+        category = index = None
+        if self.violation_rate and rng.random() < self.violation_rate:
+            category = self.categories[bisect(self._category_weights, rng.random() * self._category_weights[-1])]
+            if category != "PATH_LENGTH":
+                index = self._inject(rng, parts, category)
+
+        if self.fit_length and self._checks_length:
+            index = self._fit(parts, index)
+        if category == "PATH_LENGTH":
+            self._overflow(rng, parts)
+        return CorpusPath(self.sep.join(parts), category, index)
+
+    # -- violations ---------------------------------------------------------
+
+    def _inject(self, rng: random.Random, parts: list, category: str) -> int:
+        """Break one part so `category` is reported for it, and return its index."""
+        rule = CATEGORY_RULES[category]
+        candidates = []
+        if rule in self._folder_rules:
+            if len(parts) == 1:
+                parts.insert(0, rng.choice(FOLDER_WORDS))
+            candidates.extend(range(len(parts) - 1))
+        if rule in self._file_rules:
+            candidates.append(len(parts) - 1)
+        index = rng.choice(candidates)
+        part = parts[index]
+        is_file = index == len(parts) - 1
+        cls = self.cls
+
+        if category == "INVALID_CHAR":
+            # Dropbox allows "." in file names, so never rely on it for a file part.
+            characters = cls.invalid_characters.replace(".", "") if is_file else cls.invalid_characters
+            position = rng.randrange(len(part) + 1)
+            part = part[:position] + rng.choice(characters) + part[position:]
+        elif category == "RESTRICTED_NAME":
+            part = rng.choice(sorted(cls.restricted_names))
+        elif category == "TRAILING_PERIOD":
+            part += "."
+        elif category == "WHITESPACE":
+            part = f" {part}" if rng.random() < 0.5 else f"{part} "
+        elif category == "SUFFIX":
+            part += rng.choice(cls.endings)
+        elif category == "PREFIX":
+            part = rng.choice(cls.starts) + part
+        elif category == "TEMP_PATTERN":
+            part = self._temp_name(rng, part)
+        elif category == "RESTRICTED_PREFIX":
+            part = cls.restricted_prefix + part
+        elif category == "LEADING_PERIOD":
+            part = "." + part.replace(".", "")
+        parts[index] = part
+        return index
+
+    def _temp_name(self, rng: random.Random, part: str) -> str:
+        stem = part.split(".")[0] or "file"
+        letters = "abcdefghijklmnopqrstuvwxyz"
+        candidates = [
+            f"atmp{rng.randrange(10000):04d}",
+            f"{stem}.sas.b{rng.randrange(100):02d}",
+            f"aa{rng.choice(letters)}{rng.randrange(100000):05d}",
+            f"{stem}.$$$",
+        ]
+        matching = [name for name in candidates if any(p.match(name.lower()) for p in self._temp_patterns)]
+        return rng.choice(matching or candidates)
+
+    def _excess(self, parts: list) -> int:
+        # process_path_length flags a part when the full length plus that part and a separator exceeds the limit.
+        return len(self.sep.join(parts)) + max(len(part) for part in parts) + len(self.sep) - self.cls.max_length
+
+    def _fit(self, parts: list, keep: Optional[int]) -> Optional[int]:
+        """Shorten long folders, then drop the deepest ones, until no PATH_LENGTH issue would be reported."""
+        excess = self._excess(parts)
+        while excess > 0:
+            folders = [i for i in range(len(parts) - 1) if i != keep]
+            if not folders:
+                break
+            longest = max(folders, key=lambda i: len(parts[i]))
+            if len(parts[longest]) > _MIN_FITTED_PART:
+                length = max(_MIN_FITTED_PART, len(parts[longest]) - excess)
+                parts[longest] = parts[longest][:length].rstrip(" ._") or "Long"
+            else:
+                del parts[folders[-1]]
+                if keep is not None and keep > folders[-1]:
+                    keep -= 1
+            excess = self._excess(parts)
+        return keep
+
+    def _overflow(self, rng: random.Random, parts: list):
+        """Insert long folders before the file until the path is over the service's max_length."""
+        while len(self.sep.join(parts)) <= self.cls.max_length:
+            parts.insert(len(parts) - 1, self._long_name(rng, self._part_limit))
+
+    # -- disk ---------------------------------------------------------------
+
+    def materialize(self, root: str, count: int) -> dict:
+        """
+        Create the first `count` paths as empty files under `root` for walker benchmarks.
+
+        Paths the local filesystem cannot hold (NUL bytes, the local separator inside
+        a part, names clashing with an existing file or folder) are skipped.
+
+        Returns:
+            dict: {"files": created, "skipped": skipped}
+        """
+        created = skipped = 0
+        for item in self.generate(count):
+            parts = item.path.split(self.sep)
+            if any(not part or part in (".", "..") or "\0" in part or os.sep in part for part in parts):
+                skipped += 1
+                continue
+            target = os.path.join(root, *parts)
+            try:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(target, "a"):
+                    pass
+                created += 1
+            except (OSError, ValueError):
+                skipped += 1
+        return {"files": created, "skipped": skipped}
@@ -85,6 +85,7 @@ class FPV_Egnyte(FPV_Base):
                     },
                     priority=3
                 )
+        return part["part"]
 
     def process_restricted_prefixes(self, part: dict, action: str):
         """Process restricted Egnyte prefixes."""
@@ -114,6 +115,8 @@ class FPV_Egnyte(FPV_Base):
                     },
                     priority=3
                 )
+                return cleaned_part
+        return part["part"]
 
     def process_temp_patterns(self, part: dict, action: str):
         """Process restricted temporary file patterns."""
@@ -139,6 +142,7 @@ class FPV_Egnyte(FPV_Base):
                     },
                     priority=4
                 )
+        return part["part"]
 
     def process_part_length(self, part: dict, action: str):
         """Process part length based on Egnyte's restrictions."""
@@ -165,3 +169,5 @@ class FPV_Egnyte(FPV_Base):
                     },
                     priority=2
                 )
+                return truncated_part
+        return part["part"]
@@ -0,0 +1,134 @@
+"""
+Per-rule instrumentation for the FPV_Base processing loops.
+
+A hook is any object with a `record()` method matching `RuleHook.record`.
+Install one on a single validator (`FPV_X(path, rule_hook=hook)`), on a
+service class, or on every class with `profile_rules()`. When no hook is
+installed the loops take an untimed path and pay nothing for this.
+"""
+
+import sys
+from contextlib import contextmanager
+from typing import List
+
+from ._base import FPV_Base
+
+
+class RuleHook:
+    """Base class documenting the hook interface. Subclasses override `record`."""
+
+    def record(self, rule: str, service: str, part_type: str, action: str, elapsed_ns: int, produced: bool):
+        """
+        Called once per rule invocation.
+
+        Args:
+            rule: Name of the process_* method, e.g. "process_invalid_characters".
+            service: Class name of the validator, e.g. "FPV_Egnyte".
+            part_type: "root", "folder" or "file".
+            action: "validate" or "clean".
+            elapsed_ns: Wall time spent in the rule, in nanoseconds.
+            produced: True if the rule logged an issue (validate) or an action (clean).
+        """
+
+
+class CompositeHook(RuleHook):
+    """Forward every record to several hooks, e.g. metrics and a profiler at once."""
+
+    def __init__(self, *hooks: RuleHook):
+        self.hooks = hooks
+
+    def record(self, rule, service, part_type, action, elapsed_ns, produced):
+        for hook in self.hooks:
+            hook.record(rule, service, part_type, action, elapsed_ns, produced)
+
+
+class RuleStats:
+    """Aggregated timings for one (service, rule, part_type, action) combination."""
+
+    __slots__ = ("service", "rule", "part_type", "action", "calls", "produced", "total_ns", "max_ns")
+
+    def __init__(self, service: str, rule: str, part_type: str, action: str):
+        self.service = service
+        self.rule = rule
+        self.part_type = part_type
+        self.action = action
+        self.calls = 0
+        self.produced = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    @property
+    def mean_ns(self) -> float:
+        return self.total_ns / self.calls if self.calls else 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.produced / self.calls if self.calls else 0.0
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class RuleProfiler(RuleHook):
+    """Aggregates rule invocations and reports the hottest rules."""
+
+    def __init__(self):
+        self.stats = {}
+
+    def record(self, rule, service, part_type, action, elapsed_ns, produced):
+        key = (service, rule, part_type, action)
+        stats = self.stats.get(key)
+        if stats is None:
+            stats = self.stats[key] = RuleStats(service, rule, part_type, action)
+        stats.calls += 1
+        stats.total_ns += elapsed_ns
+        if elapsed_ns > stats.max_ns:
+            stats.max_ns = elapsed_ns
+        if produced:
+            stats.produced += 1
+
+    def reset(self):
+        self.stats.clear()
+
+    def top(self, n: int = 10, by: str = "total_ns") -> List[RuleStats]:
+        """Return the n entries with the highest value of `by` (total_ns, mean_ns, calls, produced or hit_rate)."""
+        return sorted(self.stats.values(), key=lambda stats: getattr(stats, by), reverse=True)[:n]
+
+    def report(self, n: int = 10, by: str = "total_ns") -> str:
+        """Format the top-n rules as a fixed-width table."""
+        total = sum(stats.total_ns for stats in self.stats.values()) or 1
+        lines = [f"{'service':<16} {'rule':<30} {'type':<6} {'action':<8} {'calls':>9} {'hits':>7} {'total ms':>10} {'mean ns':>9} {'share':>6}"]
+        for stats in self.top(n, by=by):
+            lines.append(
+                f"{stats.service:<16} {stats.rule:<30} {stats.part_type:<6} {stats.action:<8} "
+                f"{stats.calls:>9} {stats.hit_rate:>7.1%} {stats.total_ns / 1e6:>10.2f} "
+                f"{stats.mean_ns:>9.0f} {stats.total_ns / total:>6.1%}"
+            )
+        return "\n".join(lines)
+
+    def print_top(self, n: int = 10, by: str = "total_ns", file=None):
+        """Print the top-n rules (by total time, by default)."""
+        print(self.report(n, by=by), file=file or sys.stdout)
+
+
+@contextmanager
+def profile_rules(hook: RuleHook = None, target=FPV_Base):
+    """
+    Install a hook on `target` (every service class by default) for the duration of the block.
+
+    Usage:
+        with profile_rules() as profiler:
+            for path in paths:
+                FPV_Egnyte(path, auto_validate=False).validate(raise_error=False)
+        profiler.print_top(10)
+    """
+    hook = hook if hook is not None else RuleProfiler()
+    previous = target.__dict__.get("rule_hook")
+    target.rule_hook = hook
+    try:
+        yield hook
+    finally:
+        if previous is None and target is not FPV_Base:
+            del target.rule_hook
+        else:
+            target.rule_hook = previous
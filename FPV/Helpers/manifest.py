@@ -0,0 +1,383 @@
+"""
+Manifests and delta revalidation.
+
+A manifest is a text file with one path per record (newline or NUL delimited).
+A results file is a sorted manifest where every record is "path<TAB>mask", led
+by a header naming the service, ruleset fingerprint and flags it was made with.
+
+A verdict depends only on the path string and those settings, so an unchanged
+path keeps its verdict. Renaming a folder changes the path of everything under
+it, so those paths show up as new. `delta_validate` merge-joins yesterday's
+results with today's (sorted) manifest. It carries verdicts forward for paths
+present in both and runs the rules only for the rest. Both inputs are streamed,
+and `sort_manifest` sorts manifests larger than memory with an external merge
+sort.
+
+Nightly usage from the command line:
+    python -m FPV.Helpers.manifest egnyte today.txt today.results --previous yesterday.results
+"""
+
+import argparse
+import heapq
+import mmap
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+from .batch import validate_batch
+from .corpus import resolve_service
+from .os_classes import FPV_Windows
+
+RESULTS_MAGIC = "#fpv-results"
+
+# Bytes of the mapping split into records at a time.
+BLOCK_SIZE = 1 << 20
+
+
+class DeltaStats(NamedTuple):
+    carried: int
+    validated: int
+    removed: int
+    invalid: int
+    full_rescan: bool
+
+
+def sort_key(path: str, sep: str) -> List[str]:
+    """Tree order: a folder sorts directly before everything inside it."""
+    return path.split(sep)
+
+
+class MmapManifest:
+    """
+    Read-only, memory-mapped view of a manifest.
+
+    Record boundaries are found with `find()`/`rfind()` on the mapping and only the
+    requested range is decoded, a block at a time, so the file is never read into
+    Python objects as a whole. Several processes mapping the same file share one
+    page cache.
+
+    Usage:
+        with MmapManifest("today.txt") as manifest:
+            for start, end in manifest.byte_ranges(8):
+                ...  # hand (filename, start, end) to a worker
+            for path in manifest.records():
+                ...
+    """
+
+    def __init__(self, filename: str, delimiter: str = "\n", encoding: str = "utf-8"):
+        self.filename = filename
+        self.delimiter = delimiter.encode("ascii")
+        self.encoding = encoding
+        self._file = open(filename, "rb")
+        self.size = os.fstat(self._file.fileno()).st_size
+        # Zero-length files cannot be mapped.
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self.size:
+            self._map.close()
+        self._file.close()
+
+    def __iter__(self) -> Iterator[str]:
+        return self.records()
+
+    def _record_start(self, position: int) -> int:
+        """First record boundary at or after `position`."""
+        if position <= 0:
+            return 0
+        if position >= self.size:
+            return self.size
+        if self._map[position - 1:position] == self.delimiter:
+            return position
+        found = self._map.find(self.delimiter, position)
+        return self.size if found == -1 else found + 1
+
+    def _blocks(self, start: int, end: int) -> Iterator[bytes]:
+        """
+        Yield slices of the mapping, each ending on a record boundary, that together hold
+        exactly the records beginning in [start, end). Records are then split out of a
+        block in one call instead of one find() per record.
+        """
+        data, delimiter = self._map, self.delimiter
+        position = self._record_start(start)
+        stop = self._record_start(self.size if end is None else min(end, self.size))
+        while position < stop:
+            cut = min(position + BLOCK_SIZE, stop)
+            if cut < stop:
+                boundary = data.rfind(delimiter, position, cut)
+                cut = boundary + 1 if boundary >= position else self._record_start(cut)
+            yield data[position:cut]
+            position = cut
+
+    def raw_records(self, start: int = 0, end: int = None) -> Iterator[bytes]:
+        """
+        Yield the non-empty records that begin in the byte range [start, end).
+        A record that straddles `end` belongs to this range; one straddling `start` does not.
+        """
+        delimiter = self.delimiter
+        for block in self._blocks(start, end):
+            yield from filter(None, block.split(delimiter))
+
+    def records(self, start: int = 0, end: int = None) -> Iterator[str]:
+        """Decoded records beginning in [start, end); undecodable bytes survive as surrogates."""
+        # Neither delimiter can occur inside a multi-byte UTF-8 sequence, so whole blocks decode safely.
+        encoding, delimiter = self.encoding, self.delimiter.decode("ascii")
+        for block in self._blocks(start, end):
+            yield from filter(None, block.decode(encoding, "surrogateescape").split(delimiter))
+
+    def record_at(self, position: int) -> bytes:
+        """
+        The raw record holding byte `position`. A delimiter byte belongs to the record
+        it ends, so this is b"" only when `position` falls between two delimiters.
+        """
+        start = self._map.rfind(self.delimiter, 0, position) + 1
+        end = self._map.find(self.delimiter, position)
+        return self._map[start:self.size if end == -1 else end]
+
+    def byte_ranges(self, count: int) -> List[Tuple[int, int]]:
+        """Split the file into at most `count` contiguous ranges that start on record boundaries."""
+        bounds = sorted({self._record_start(self.size * i // max(count, 1)) for i in range(max(count, 1))} | {self.size})
+        return [(start, end) for start, end in zip(bounds, bounds[1:])]
+
+
+def read_records(filename: str, delimiter: str = "\n") -> Iterator[str]:
+    """
+    Stream the non-empty records of a manifest without loading it whole.
+    Only the delimiter ends a record: "\r" is a legal character in a path name.
+    """
+    with MmapManifest(filename, delimiter) as manifest:
+        yield from manifest.records()
+
+
+def _write_records(f, records, delimiter: str):
+    for record in records:
+        f.write(record)
+        f.write(delimiter)
+
+
+def sort_manifest(source: str, destination: str, sep: str = "/", delimiter: str = "\n",
+                  max_records: int = 1_000_000, tmpdir: str = None) -> int:
+    """
+    Sort a manifest into tree order and drop duplicate paths.
+
+    At most `max_records` paths are held in memory: larger inputs are split into
+    sorted runs on disk and merged with a k-way heap merge.
+
+    Returns:
+        int: Number of unique paths written.
+    """
+    records = read_records(source, delimiter)
+    runs = []
+    key = lambda path: sort_key(path, sep)
+    try:
+        while True:
+            chunk = list(islice(records, max_records))
+            if not chunk:
+                break
+            chunk.sort(key=key)
+            fd, run = tempfile.mkstemp(prefix="fpv-sort-", dir=tmpdir)
+            with os.fdopen(fd, "w", encoding="utf-8", errors="surrogateescape", newline="") as f:
+                _write_records(f, chunk, delimiter)
+            runs.append(run)
+
+        written = 0
+        previous = None
+        with open(destination, "w", encoding="utf-8", errors="surrogateescape", newline="") as out:
+            for path in heapq.merge(*(read_records(run, delimiter) for run in runs), key=key):
+                if path != previous:
+                    out.write(path)
+                    out.write(delimiter)
+                    written += 1
+                    previous = path
+        return written
+    finally:
+        for run in runs:
+            os.remove(run)
+
+
+def _header(cls, relative: bool, file_added: bool) -> str:
+    return "\t".join((RESULTS_MAGIC, cls.__name__, cls.ruleset_fingerprint(), str(int(relative)), str(int(file_added))))
+
+
+def read_results(filename: str, delimiter: str = "\n") -> Tuple[Optional[str], Iterator[Tuple[str, int]]]:
+    """Return the header of a results file and a stream of its (path, mask) records."""
+    records = read_records(filename, delimiter)
+    first = next(records, None)
+    header = first if first is not None and first.startswith(RESULTS_MAGIC) else None
+
+    def entries():
+        if first is not None and header is None:
+            yield _parse_result(first)
+        for record in records:
+            yield _parse_result(record)
+    return header, entries()
+
+
+def _parse_result(record: str) -> Tuple[str, int]:
+    path, _, mask = record.rpartition("\t")
+    return path, int(mask)
+
+
+def delta_validate(service, previous_results: Optional[str], current_manifest: str, output: str,
+                   relative: bool = True, file_added: bool = True, presorted: bool = False,
+                   delimiter: str = "\n", cache=None, chunk_size: int = 1000, tmpdir: str = None) -> DeltaStats:
+    """
+    Write results for today's manifest, revalidating only what changed since yesterday.
+
+    Args:
+        service: Service class or name.
+        previous_results: Results file from the last run, or None for a full scan. It is
+            ignored (full scan) when its service, fingerprint or flags differ from this run.
+        current_manifest: Today's manifest.
+        output: Results file to write, in tree order.
+        presorted: Set when the manifest is already in tree order without duplicates
+            (for example the output of `sort_manifest`); otherwise it is sorted first.
+        delimiter: Record delimiter of the manifest and of both results files ("\\n" or "\\0").
+        cache: Optional VerdictCache consulted for the paths that need validating.
+        chunk_size: Paths validated per batch.
+
+    Returns:
+        DeltaStats: carried, validated, removed and invalid counts, and whether the
+        previous results had to be discarded.
+    """
+    cls = resolve_service(service)
+    sep = "\\" if issubclass(cls, FPV_Windows) else "/"
+    header = _header(cls, relative, file_added)
+
+    sorted_manifest = current_manifest
+    if not presorted:
+        fd, sorted_manifest = tempfile.mkstemp(prefix="fpv-manifest-", dir=tmpdir)
+        os.close(fd)
+        sort_manifest(current_manifest, sorted_manifest, sep=sep, delimiter=delimiter, tmpdir=tmpdir)
+
+    previous_header, previous = (None, iter(())) if previous_results is None else read_results(previous_results, delimiter)
+    full_rescan = previous_header != header
+    if full_rescan:
+        previous = iter(())
+
+    carried = validated = removed = invalid = 0
+    try:
+        with open(output, "w", encoding="utf-8", errors="surrogateescape", newline="") as out:
+            out.write(header + delimiter)
+            window = []
+
+            def flush():
+                nonlocal validated, invalid
+                pending = [path for path, mask in window if mask is None]
+                verdicts = iter(validate_batch(cls, pending, cache=cache, relative=relative,
+                                               file_added=file_added, chunk_size=chunk_size))
+                for path, mask in window:
+                    if mask is None:
+                        mask = next(verdicts).issue_mask
+                        validated += 1
+                    if mask:
+                        invalid += 1
+                    out.write(f"{path}\t{mask}{delimiter}")
+                window.clear()
+
+            old = next(previous, None)
+            for path in read_records(sorted_manifest, delimiter):
+                key = sort_key(path, sep)
+                while old is not None and sort_key(old[0], sep) < key:
+                    removed += 1
+                    old = next(previous, None)
+                if old is not None and old[0] == path:
+                    window.append(old)
+                    carried += 1
+                    old = next(previous, None)
+                else:
+                    window.append((path, None))
+                if len(window) >= chunk_size:
+                    flush()
+            flush()
+            while old is not None:
+                removed += 1
+                old = next(previous, None)
+    finally:
+        if not presorted:
+            os.remove(sorted_manifest)
+
+    return DeltaStats(carried, validated, removed, invalid, full_rescan)
+
+
+def _scan_range(job) -> Tuple[int, List[Tuple[str, int]]]:
+    service, filename, start, end, delimiter, relative, file_added = job
+    invalid = []
+    total = 0
+    with MmapManifest(filename, delimiter) as manifest:
+        for result in validate_batch(service, manifest.records(start, end), relative=relative, file_added=file_added):
+            total += 1
+            if not result.is_valid:
+                invalid.append((result.path, result.issue_mask))
+    return total, invalid
+
+
+def scan_manifest(service, filename: str, workers: int = None, delimiter: str = "\n",
+                  relative: bool = True, file_added: bool = True) -> Tuple[int, List[Tuple[str, int]]]:
+    """
+    Validate every record of a manifest, splitting the mapping into byte ranges across processes.
+
+    Args:
+        service: Service name (or a class importable by the worker processes).
+        filename: Manifest to scan.
+        workers: Worker processes; defaults to os.cpu_count(). 1 scans in this process.
+        delimiter: "\\n" or "\\0".
+
+    Returns:
+        (total, invalid): the number of records scanned and (path, mask) for each invalid
+        one, in file order.
+    """
+    workers = workers or os.cpu_count() or 1
+    with MmapManifest(filename, delimiter) as manifest:
+        ranges = manifest.byte_ranges(workers)
+    jobs = [(service, filename, start, end, delimiter, relative, file_added) for start, end in ranges]
+    if workers == 1 or len(jobs) <= 1:
+        parts = [_scan_range(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_scan_range, jobs))
+    total = sum(count for count, _ in parts)
+    invalid = [entry for _, entries in parts for entry in entries]
+    return total, invalid
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Validate a manifest, reusing the verdicts of a previous run.")
+    parser.add_argument("service")
+    parser.add_argument("manifest")
+    parser.add_argument("output")
+    parser.add_argument("--previous", help="Results file of the previous run")
+    parser.add_argument("--null", action="store_true", help="Records are NUL delimited")
+    parser.add_argument("--presorted", action="store_true")
+    parser.add_argument("--folders-only", action="store_true", help="The last part of each path is a folder")
+    parser.add_argument("--cache", help="VerdictCache database for the paths that need validating")
+    parser.add_argument("--tmpdir")
+    args = parser.parse_args(argv)
+
+    cache = None
+    if args.cache:
+        from .verdict_cache import VerdictCache
+        cache = VerdictCache(args.cache)
+    try:
+        stats = delta_validate(args.service, args.previous, args.manifest, args.output,
+                               file_added=not args.folders_only, presorted=args.presorted,
+                               delimiter="\0" if args.null else "\n", cache=cache, tmpdir=args.tmpdir)
+    finally:
+        if cache is not None:
+            cache.close()
+    print(f"carried {stats.carried}, validated {stats.validated}, removed {stats.removed}, "
+          f"invalid {stats.invalid}{' (full rescan)' if stats.full_rescan else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,249 @@
+"""
+Rename plans for migrating a local directory tree to a target service.
+
+`plan_renames` walks the tree once with `os.scandir` and gives every file and
+folder a cleaned name that is unique among its siblings on the target (see
+`collisions.CollisionDetector`). Names that are already clean are kept first, so
+only the offending entries move. The plan lists the renames deepest-first:
+children are renamed while their parent still has its original name, so every
+rename can use the paths recorded at planning time.
+
+`apply_plan` runs the renames. Each top-level folder is an independent subtree,
+so subtrees are processed in parallel and the top-level entries go last. Every
+batch of renames is written to the journal before it runs, so `rollback` can
+undo an interrupted or unwanted run.
+
+Usage:
+    plan = plan_renames("sharepoint", "/mnt/share")
+    apply_plan(plan, dry_run=True)
+    apply_plan(plan, journal="share.journal")
+    rollback("share.journal")  # if needed
+
+From the command line:
+    python -m FPV.Helpers.migrate sharepoint /mnt/share                  # dry run
+    python -m FPV.Helpers.migrate sharepoint /mnt/share --apply --journal share.journal
+    python -m FPV.Helpers.migrate --rollback share.journal
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple, Optional
+
+from .collisions import CollisionDetector, _Siblings
+
+
+class Rename(NamedTuple):
+    """Rename `name` to `new_name` inside `directory` (relative to the plan root, original names)."""
+    directory: str
+    name: str
+    new_name: str
+    depth: int
+
+    @property
+    def source(self) -> str:
+        return os.path.join(self.directory, self.name)
+
+    @property
+    def target(self) -> str:
+        return os.path.join(self.directory, self.new_name)
+
+
+class RenamePlan(NamedTuple):
+    """
+    Renames in execution order (deepest first), plus the relative paths of entries
+    that `clean()` would remove or that cannot fit the target's length limits.
+    Those are left alone and need a decision by hand.
+    """
+    root: str
+    service: str
+    renames: List[Rename]
+    skipped: List[str]
+
+
+def plan_renames(service, root: str, case_insensitive: Optional[bool] = None, sep: str = "/") -> RenamePlan:
+    """
+    Build the rename plan for the tree under `root` in a single `os.scandir` pass.
+
+    Args:
+        service: Service class or name.
+        root: Local directory to migrate. `root` itself is never renamed.
+        case_insensitive: Overrides the service's `case_insensitive` flag.
+        sep: Separator of target paths, used to measure them against `max_length`.
+    """
+    detector = CollisionDetector(service, case_insensitive=case_insensitive)
+    renames, skipped = [], []
+    pending = [("", "", 0)]  # (relative directory, its target path, depth)
+    while pending:
+        directory, target_parent, depth = pending.pop()
+        with os.scandir(os.path.join(root, directory)) as scan:
+            entries = sorted((entry.name, entry.is_dir(follow_symlinks=False)) for entry in scan)
+
+        available = detector.available(len(target_parent) + len(sep) if target_parent else 0)
+        siblings = _Siblings()
+        # Names that are already clean claim their slot first, so only offending entries move.
+        ordered = sorted(entries, key=lambda entry: detector.cleaned_name(entry[0], not entry[1]) != entry[0])
+        for name, is_dir in ordered:
+            new_name = detector.assign(siblings, name, not is_dir, available) if available is not None else None
+            if new_name is None:
+                skipped.append(os.path.join(directory, name))
+                continue
+            if new_name != name:
+                renames.append(Rename(directory, name, new_name, depth))
+            if is_dir:
+                target = target_parent + sep + new_name if target_parent else new_name
+                pending.append((os.path.join(directory, name), target, depth + 1))
+
+    renames.sort(key=lambda rename: -rename.depth)
+    return RenamePlan(root, detector.cls.__name__, renames, sorted(skipped))
+
+
+class _Journal:
+    """Append-only JSON-lines log of renames, written before each batch runs."""
+
+    def __init__(self, filename: Optional[str]):
+        self._file = open(filename, "a", encoding="utf-8") if filename else None
+        self._lock = threading.Lock()
+
+    def record(self, pairs):
+        if self._file is None:
+            return
+        with self._lock:
+            for source, target in pairs:
+                self._file.write(json.dumps({"from": source, "to": target}) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+def _rename_batch(pairs, journal: _Journal, dry_run: bool) -> List[tuple]:
+    """Check and run one batch of (source, target) renames; returns the failures."""
+    failures, ready = [], []
+    for source, target in pairs:
+        if not os.path.lexists(source):
+            failures.append((source, target, "source no longer exists"))
+        elif os.path.lexists(target) and not os.path.samefile(source, target):
+            failures.append((source, target, "target already exists"))
+        else:
+            ready.append((source, target))
+    if dry_run:
+        return failures
+    journal.record(ready)
+    for source, target in ready:
+        try:
+            os.rename(source, target)
+        except OSError as e:
+            failures.append((source, target, str(e)))
+    return failures
+
+
+def _run_renames(renames: List[Rename], root: str, journal: _Journal, dry_run: bool, batch_size: int) -> List[tuple]:
+    failures = []
+    pairs = [(os.path.join(root, rename.source), os.path.join(root, rename.target)) for rename in renames]
+    for start in range(0, len(pairs), batch_size):
+        failures.extend(_rename_batch(pairs[start:start + batch_size], journal, dry_run))
+    return failures
+
+
+def apply_plan(plan: RenamePlan, dry_run: bool = False, journal: str = None, workers: int = None,
+               batch_size: int = 500) -> dict:
+    """
+    Run a rename plan.
+
+    Renames never overwrite: an entry whose target already exists is reported as a
+    failure and left in place. A failed folder rename leaves its already renamed
+    contents as they are.
+
+    Args:
+        plan: Result of `plan_renames`.
+        dry_run: Only check the renames (sources exist, targets are free).
+        journal: JSON-lines file that records every rename before it runs, for `rollback`.
+        workers: Threads renaming top-level subtrees in parallel. Defaults to
+            `os.cpu_count()`; 1 runs everything in order.
+        batch_size: Renames per journal write.
+
+    Returns:
+        dict: {"renamed": count, "failed": [(source, target, reason), ...]}
+    """
+    subtrees, top_level = {}, []
+    for rename in plan.renames:
+        if rename.directory:
+            subtrees.setdefault(rename.directory.split(os.sep, 1)[0], []).append(rename)
+        else:
+            top_level.append(rename)
+
+    log = _Journal(None if dry_run else journal)
+    try:
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+            results = pool.map(lambda renames: _run_renames(renames, plan.root, log, dry_run, batch_size),
+                               subtrees.values())
+            failures = [failure for result in results for failure in result]
+        # Top-level entries go last: their subtrees are addressed by their original names.
+        failures.extend(_run_renames(top_level, plan.root, log, dry_run, batch_size))
+    finally:
+        log.close()
+    return {"renamed": len(plan.renames) - len(failures), "failed": failures}
+
+
+def rollback(journal: str) -> dict:
+    """
+    Undo the renames recorded in `journal`, newest first. Entries that were journaled
+    but never ran, or were already undone, are skipped.
+
+    Returns:
+        dict: {"restored": count, "failed": [(target, source, reason), ...]}
+    """
+    with open(journal, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+    restored, failures = 0, []
+    for entry in reversed(entries):
+        source, target = entry["from"], entry["to"]
+        if not os.path.lexists(target) or os.path.lexists(source):
+            continue
+        try:
+            os.rename(target, source)
+            restored += 1
+        except OSError as e:
+            failures.append((target, source, str(e)))
+    return {"restored": restored, "failed": failures}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rename a local tree so it can be migrated to a target service.")
+    parser.add_argument("service", nargs="?")
+    parser.add_argument("root", nargs="?")
+    parser.add_argument("--apply", action="store_true", help="Rename for real (the default is a dry run)")
+    parser.add_argument("--journal", help="Record renames here so they can be rolled back")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--rollback", metavar="JOURNAL", help="Undo the renames recorded in JOURNAL")
+    args = parser.parse_args(argv)
+
+    if args.rollback:
+        result = rollback(args.rollback)
+        print(f"restored {result['restored']}, failed {len(result['failed'])}")
+        return 1 if result["failed"] else 0
+    if not args.service or not args.root:
+        parser.error("service and root are required unless --rollback is given")
+
+    plan = plan_renames(args.service, args.root)
+    if not args.apply:
+        for rename in plan.renames:
+            print(f"{rename.source}\t{rename.target}")
+    for path in plan.skipped:
+        print(f"skipped: {path}", file=sys.stderr)
+    result = apply_plan(plan, dry_run=not args.apply, journal=args.journal, workers=args.workers)
+    for source, target, reason in result["failed"]:
+        print(f"failed: {source} -> {target}: {reason}", file=sys.stderr)
+    verb = "renamed" if args.apply else "would rename"
+    print(f"{verb} {result['renamed']}, failed {len(result['failed'])}, skipped {len(plan.skipped)}")
+    return 1 if result["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
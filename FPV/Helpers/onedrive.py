@@ -5,6 +5,7 @@ class FPV_OneDrive(FPV_Base):
     # OneDrive-specific rules
     invalid_characters = "#%&*:{}<>?|\""
     max_length = 400
+    case_insensitive = True
     restricted_names = {
         ".lock", "CON", "PRN", "AUX", "NUL",
         "COM1", "COM2", "COM3", "COM4", "COM5",
@@ -1,10 +1,11 @@
 import re
-from FPV.Helpers._base import FPV_Base
+from FPV.Helpers._base import FPV_Base, _text
 
 
 class FPV_Windows(FPV_Base):
     invalid_characters = '<>:"|?*'
     max_length = 255
+    case_insensitive = True  # NTFS: "Report.docx" and "report.docx" are the same file
     restricted_names = {
         "CON", "PRN", "AUX", "NUL",
         "COM1", "COM2", "COM3", "COM4", "COM5", 
@@ -51,6 +52,8 @@ class FPV_MacOS(FPV_Base):
     # Regex for leading periods in folder names
     unacceptable_leading_patterns = [r"^\.+[^/.]+$"]  # e.g., ".hidden_folder" is invalid
 
+    accepts_bytes = True
+
     # Acceptable root patterns
     acceptable_root_patterns = []
 
@@ -68,18 +71,21 @@ class FPV_MacOS(FPV_Base):
             return part_str
 
         # Check if the folder starts with a leading period
-        if any(re.match(pattern, part_str) for pattern in self.unacceptable_leading_patterns):
+        patterns = self.unacceptable_leading_patterns
+        if isinstance(part_str, bytes):
+            patterns = [pattern.encode("utf-8") for pattern in patterns]
+        if any(re.match(pattern, part_str) for pattern in patterns):
             if action == "validate":
                 self._path_helper.add_issue(
                     {
                         "type": "issue",
                         "category": "LEADING_PERIOD",
                         "details": {"part": part_str, "index": index},
-                        "reason": f"Folder name '{part_str}' starts with a leading period, which is not allowed.",
+                        "reason": f"Folder name '{_text(part_str)}' starts with a leading period, which is not allowed.",
                     }
                 )
             elif action == "clean":
-                cleaned_part = part_str.lstrip(".")  # Remove leading periods
+                cleaned_part = part_str.lstrip(b"." if isinstance(part_str, bytes) else ".")  # Remove leading periods
                 self._path_helper.add_action(
                     {
                         "type": "action",
@@ -87,7 +93,7 @@ class FPV_MacOS(FPV_Base):
                         "subtype": "MODIFY",
                         "priority": 2,  # Set appropriate priority
                         "details": {"original": part_str, "new_value": cleaned_part, "index": index},
-                        "reason": f"Removed leading periods from '{part_str}'.",
+                        "reason": f"Removed leading periods from '{_text(part_str)}'.",
                     }, 
                     priority=2
                 )
@@ -119,6 +125,9 @@ class FPV_Linux(FPV_Base):
     # Only null character is invalid in Linux paths
     invalid_characters = '\0'
 
+    # Paths straight from os.fsencode() / os.scandir(bytes) are validated without decoding.
+    accepts_bytes = True
+
     # Acceptable root patterns
     acceptable_root_patterns = []
 
@@ -0,0 +1,172 @@
+"""
+Vectorized pre-screen for PATH_LENGTH and INVALID_CHAR over a chunk of paths.
+
+Most bulk rejections come from the path length and the invalid characters, and
+both can be decided for a whole chunk at once. With NumPy installed, the chunk is
+encoded as one flat UCS-4 array. Path lengths, the longest part of each path
+and a "contains an invalid character" flag then come from a few array
+operations. Without NumPy the same checks run per path with `str` methods, so
+results never depend on whether NumPy is installed.
+
+A screened mask is exact for the two categories it covers: a bit is set if and
+only if the full rules would log that category. A mask of 0 only means neither
+category applies, since other rules may still fail the path. Bytes paths are
+not screened and get None.
+
+Usage:
+    masks = screen("sharepoint", paths)
+    flagged = [path for path, mask in zip(paths, masks) if mask]
+"""
+
+from functools import lru_cache
+from typing import List, Optional, Sequence, Tuple
+
+from ._categories import IssueCategory
+from .corpus import resolve_service
+from .os_classes import FPV_Windows
+
+INVALID_CHAR_BIT = int(IssueCategory.INVALID_CHAR)
+PATH_LENGTH_BIT = int(IssueCategory.PATH_LENGTH)
+
+_numpy = None
+
+
+def numpy_available() -> bool:
+    """Whether NumPy can be imported. It is only imported on first use."""
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy is not False
+
+
+@lru_cache(maxsize=None)
+def _screened_characters(cls, sep: str) -> tuple:
+    """
+    (folder characters, file characters): the invalid characters that fail a folder
+    and a file part. Probing the rules instead of reading `invalid_characters` keeps
+    service overrides (Dropbox allows "." in file names) exact.
+    """
+    rules = cls.rule_names()
+    screened = (set(), set())
+    for char in set(cls.invalid_characters) - set(sep):
+        probe = f"a{char}b{sep}a{char}b"
+        issues = cls(probe, auto_validate=False, relative=True, file_added=True).validate(raise_error=False)
+        flagged = {issue["details"].get("index") for issue in issues if issue["category"] == "INVALID_CHAR"}
+        for index, part_type in enumerate(("folder", "file")):
+            if index in flagged and "process_invalid_characters" in rules.get(part_type, ()):
+                screened[index].add(char)
+    return frozenset(screened[0]), frozenset(screened[1])
+
+
+def screened_characters(service) -> Tuple[frozenset, frozenset]:
+    """
+    (folder characters, file characters): the characters that make `service` log
+    INVALID_CHAR in a folder and in a file part. The path separator is not included.
+    """
+    cls = resolve_service(service)
+    return _screened_characters(cls, "\\" if issubclass(cls, FPV_Windows) else "/")
+
+
+def _checks_length(cls) -> bool:
+    rules = cls.rule_names()
+    return bool(cls.max_length) and all(
+        "process_path_length" in rules.get(part_type, ()) for part_type in ("folder", "file"))
+
+
+def _screen_python(paths: Sequence[str], sep: str, characters: tuple, max_length: int, file_added: bool) -> List[int]:
+    folder_chars, file_chars = characters
+    masks = []
+    for path in paths:
+        mask = 0
+        folders, _, name = path.rpartition(sep) if file_added else (path, sep, "")
+        if not folder_chars.isdisjoint(folders) or not file_chars.isdisjoint(name):
+            mask |= INVALID_CHAR_BIT
+        if max_length and len(path) + max(map(len, path.split(sep))) + len(sep) > max_length:
+            mask |= PATH_LENGTH_BIT
+        masks.append(mask)
+    return masks
+
+
+def _lookup(np, chars: frozenset, codes):
+    """Boolean array: which codes are in `chars`, by indexing a table instead of comparing per character."""
+    if not chars:
+        return np.zeros(len(codes), dtype=bool)
+    table = np.zeros(max(map(ord, chars)) + 2, dtype=bool)
+    table[[ord(char) for char in chars]] = True
+    return table[np.minimum(codes, len(table) - 1)]  # codes past the table hit its last, False, entry
+
+
+def _screen_numpy(paths: Sequence[str], sep: str, characters: tuple, max_length: int, file_added: bool) -> List[int]:
+    np = _numpy
+    # The whole chunk as one flat UCS-4 array, each path followed by a separator, so no row is padded.
+    codes = np.frombuffer((sep.join(paths) + sep).encode("utf-32-le", "surrogatepass"), dtype=np.uint32)
+    lengths = np.fromiter(map(len, paths), dtype=np.int64, count=len(paths))
+    ends = np.cumsum(lengths + 1) - 1  # the separator closing each path
+    starts = ends - lengths
+    positions = np.arange(len(codes))
+    is_sep = codes == ord(sep)
+
+    folder_chars, file_chars = characters
+    if file_added and folder_chars != file_chars:
+        # A character is in the file name when the next separator is the one closing its path.
+        next_sep = np.minimum.accumulate(np.where(is_sep, positions, len(codes))[::-1])[::-1]
+        closing = np.zeros(len(codes), dtype=bool)
+        closing[ends] = True
+        in_file = closing[next_sep]
+        invalid = (_lookup(np, folder_chars, codes) & ~in_file) | (_lookup(np, file_chars, codes) & in_file)
+    else:
+        invalid = _lookup(np, folder_chars, codes)
+
+    masks = np.where(np.logical_or.reduceat(invalid, starts), INVALID_CHAR_BIT, 0)
+    if max_length:
+        # The distance back to the last separator is the length of the part so far.
+        last_sep = np.maximum.accumulate(np.where(is_sep, positions, -1))
+        longest = np.maximum.reduceat(positions - last_sep, starts)
+        masks |= np.where(lengths + longest + len(sep) > max_length, PATH_LENGTH_BIT, 0)
+    return masks.tolist()
+
+
+def screen(service, paths: Sequence[str], relative: bool = True, file_added: bool = False,
+           use_numpy: Optional[bool] = None) -> List[Optional[int]]:
+    """
+    Screen paths for PATH_LENGTH and INVALID_CHAR without running the rules.
+
+    Args:
+        service: Service class or name.
+        paths: Paths in the service's separator, as passed to its constructor.
+        relative: As in the service constructor. Absolute paths start with a root part
+            the screen can't judge, so nothing is screened for them.
+        file_added: As in the service constructor (the last part is a file).
+        use_numpy: Force (True) or skip (False) the NumPy screen. By default it is
+            used when NumPy is installed.
+
+    Returns:
+        list: One category mask per path (see `_categories`), or None where the path was not screened.
+    """
+    cls = resolve_service(service)
+    if not relative:
+        return [None] * len(paths)
+    sep = "\\" if issubclass(cls, FPV_Windows) else "/"
+    characters = _screened_characters(cls, sep)
+    max_length = cls.max_length if _checks_length(cls) else 0
+
+    if use_numpy is None:
+        use_numpy = numpy_available()
+    elif use_numpy and not numpy_available():
+        raise ImportError("The NumPy pre-screen needs numpy installed.")
+
+    rows, stripped = [], []
+    for row, path in enumerate(paths):
+        if isinstance(path, str):
+            rows.append(row)
+            stripped.append(path.strip(sep))
+    masks = [None] * len(paths)
+    if stripped:
+        screened = (_screen_numpy if use_numpy else _screen_python)(stripped, sep, characters, max_length, file_added)
+        for row, mask in zip(rows, screened):
+            masks[row] = mask
+    return masks
@@ -0,0 +1,182 @@
+"""
+Reference implementation of the validate/clean pipeline and a differential harness.
+
+`reference_validate` and `reference_clean` are the original per-part loops of
+`FPV_Base.validate()` and `FPV_Base.clean()`: every rule for the part's type, in
+`processing_methods()` order, with no hooks, caches or fast paths. Any optimized
+engine has to produce the same issues and cleaned paths, and `run_differential`
+checks exactly that against paths from the synthetic corpus.
+
+Fast paths that only return part of a result are checked on what they return:
+`is_valid_engine` (short-circuit and adaptive `is_valid()`), `prescreen_engine`
+(the PATH_LENGTH / INVALID_CHAR screen) and `bytes_engine` (bytes paths).
+
+Usage:
+    def batch_engine(cls, path, **kwargs):
+        ...  # return {"issues": [...], "cleaned_path": "...", "cleaned_issues": [...]}
+
+    mismatches = run_differential(batch_engine, count=1000, seed=42)
+    assert not mismatches, mismatches[0]
+"""
+
+import json
+from typing import Callable, List
+
+from ._categories import categories_to_mask
+from .batch import validate_batch
+from .corpus import SERVICES, PathCorpus, resolve_service
+from .prescreen import INVALID_CHAR_BIT, PATH_LENGTH_BIT, screen
+
+
+def reference_validate(validator) -> List[dict]:
+    """Run every rule over each unchecked part of `validator` and return its issues."""
+    helper = validator._path_helper
+    for part in helper.get_parts_to_check():
+        part_type = helper.get_part_type(part)
+        for process_method in validator.processing_methods().get(part_type, []):
+            process_method(part, action="validate")
+        status = "invalid" if helper.get_issues_for_part(part["index"]) else "complete"
+        helper.mark_part(part["index"], state="checked_status", status=status)
+    return helper.get_logs().get("issues", [])
+
+
+def reference_clean(validator, validate_after_clean: bool = True) -> str:
+    """Clean each uncleaned part of `validator`, revalidate, and return the cleaned path."""
+    helper = validator._path_helper
+    parts_to_clean = helper.get_parts_to_clean()
+    helper.logs["issues"] = helper.get_issues(clean_mode=True)
+
+    for part in parts_to_clean:
+        part_type = helper.get_part_type(part)
+        stored_part = helper.parts[part["index"]]
+        for process_method in validator.processing_methods().get(part_type, []):
+            stored_part["part"] = process_method(part, action="clean")
+
+        status = "pending" if helper.get_pending_actions_for_part(part["index"]) else "complete"
+        helper.mark_part(part["index"], state="cleaned_status", status=status)
+        helper.mark_part(part["index"], state="checked_status", status="unseen")
+
+    if validate_after_clean:
+        reference_validate(validator)
+    return helper.get_full_path()
+
+
+def reference_engine(cls, path: str, **kwargs) -> dict:
+    """Result of the reference pipeline in the shape every engine returns."""
+    validator = cls(path, auto_validate=False, **kwargs)
+    issues = [dict(issue) for issue in reference_validate(validator)]
+    cleaner = cls(path, auto_validate=False, **kwargs)
+    cleaned_path = reference_clean(cleaner)
+    return {"issues": issues, "cleaned_path": cleaned_path, "cleaned_issues": cleaner.get_logs()["issues"]}
+
+
+def default_engine(cls, path: str, **kwargs) -> dict:
+    """Result of the production `validate()` / `clean()` methods."""
+    validator = cls(path, auto_validate=False, **kwargs)
+    issues = [dict(issue) for issue in validator.validate(raise_error=False)]
+    cleaner = cls(path, auto_validate=False, **kwargs)
+    cleaned_path = cleaner.clean(raise_error=False)
+    return {"issues": issues, "cleaned_path": cleaned_path, "cleaned_issues": cleaner.get_logs()["issues"]}
+
+
+def is_valid_engine(order=None) -> Callable:
+    """Engine for the short-circuit `is_valid(order=...)`; only the verdict is compared."""
+    def engine(cls, path: str, **kwargs) -> dict:
+        return {"is_valid": cls(path, auto_validate=False, **kwargs).is_valid(order=order)}
+    return engine
+
+
+def prescreen_engine(use_numpy=None) -> Callable:
+    """
+    Engine for the pre-screen: its mask must match the reference on the two screened
+    categories, and `validate_batch(prescreen=True)` must still give the reference verdict.
+    """
+    def engine(cls, path: str, relative: bool = True, file_added: bool = False) -> dict:
+        mask, = screen(cls, [path], relative=relative, file_added=file_added, use_numpy=use_numpy)
+        result, = validate_batch(cls, [path], relative=relative, file_added=file_added, prescreen=True)
+        return {"is_valid": result.is_valid, "issue_mask": mask or 0,
+                "mask_scope": INVALID_CHAR_BIT | PATH_LENGTH_BIT}
+    return engine
+
+
+def _decoded(value):
+    if isinstance(value, bytes):
+        return value.decode("utf-8", "surrogateescape")
+    if isinstance(value, list):
+        return [_decoded(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _decoded(item) for key, item in value.items()}
+    return value
+
+
+def bytes_engine(cls, path: str, **kwargs) -> dict:
+    """`default_engine` on the UTF-8 (surrogateescape) bytes of `path`, decoded back for comparison."""
+    return _decoded(default_engine(cls, path.encode("utf-8", "surrogateescape"), **kwargs))
+
+
+def _issue_keys(issues: List[dict]) -> list:
+    return sorted(json.dumps(issue, sort_keys=True, default=str) for issue in issues)
+
+
+def diff_results(expected: dict, actual: dict) -> List[str]:
+    """
+    Describe how an engine result differs from the reference one.
+    Issues are compared as multisets, so engines may report them in a different order.
+
+    Returns:
+        List[str]: One line per difference, empty if the results match.
+    """
+    differences = []
+    for key in ("issues", "cleaned_issues"):
+        if key not in actual:
+            continue
+        expected_keys, actual_keys = _issue_keys(expected[key]), _issue_keys(actual[key])
+        if expected_keys != actual_keys:
+            missing = [k for k in expected_keys if k not in actual_keys]
+            extra = [k for k in actual_keys if k not in expected_keys]
+            differences.append(f"{key}: missing {missing}, unexpected {extra}")
+    if "cleaned_path" in actual and actual["cleaned_path"] != expected["cleaned_path"]:
+        differences.append(f"cleaned_path: expected {expected['cleaned_path']!r}, got {actual['cleaned_path']!r}")
+    if "is_valid" in actual and actual["is_valid"] != (not expected["issues"]):
+        differences.append(f"is_valid: expected {not expected['issues']}, got {actual['is_valid']}")
+    if "issue_mask" in actual:
+        scope = actual.get("mask_scope", -1)
+        expected_mask = categories_to_mask(issue["category"] for issue in expected["issues"]) & scope
+        if actual["issue_mask"] & scope != expected_mask:
+            differences.append(f"issue_mask: expected {expected_mask:#x}, got {actual['issue_mask'] & scope:#x}")
+    return differences
+
+
+def diff_engines(service, path: str, engine: Callable, **kwargs) -> List[str]:
+    """Run one path through the reference pipeline and `engine` and diff the results."""
+    cls = resolve_service(service)
+    return diff_results(reference_engine(cls, path, **kwargs), engine(cls, path, **kwargs))
+
+
+def run_differential(engine: Callable = default_engine, services=None, count: int = 200, seed=0,
+                     violation_rate: float = 0.3, **corpus_kwargs) -> List[dict]:
+    """
+    Feed `count` corpus paths per service through the reference pipeline and `engine`.
+
+    Args:
+        engine: callable(cls, path, **kwargs) returning a dict with any of
+            "issues", "cleaned_path", "cleaned_issues", "is_valid" and "issue_mask"
+            (compared on the bits of "mask_scope", all by default).
+        services: Service names or classes. Defaults to every service.
+        count: Paths per service.
+        seed: Corpus seed; failures report it so they can be replayed.
+        violation_rate: Share of generated paths with an injected violation.
+        **corpus_kwargs: Passed on to PathCorpus (depth, long_part_rate, ...).
+
+    Returns:
+        List[dict]: One {"service", "path", "seed", "differences"} entry per mismatch.
+    """
+    mismatches = []
+    for service in services or list(SERVICES):
+        cls = resolve_service(service)
+        corpus = PathCorpus(cls, seed=seed, violation_rate=violation_rate, **corpus_kwargs)
+        for path in corpus.paths(count):
+            differences = diff_engines(cls, path, engine, file_added=True)
+            if differences:
+                mismatches.append({"service": cls.__name__, "path": path, "seed": seed, "differences": differences})
+    return mismatches
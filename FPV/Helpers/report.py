@@ -0,0 +1,253 @@
+"""
+Aggregate reports: counters and histograms instead of per-path results.
+
+An audit usually needs totals, such as how many paths fail and why, where they
+are and how long they get, rather than a log entry per path. `AggregateReport`
+folds each batch result into fixed-size counters and drops the result. Its
+memory does not grow with the number of paths. Reports built in different
+processes `merge()` into one, and `to_dict()` gives a JSON-ready form to ship
+between them.
+
+Usage:
+    report = report_batch("egnyte", read_records("inventory.txt"), file_added=True)
+    report.merge(report_batch("egnyte", more_paths))
+    print(json.dumps(report.to_dict(), indent=2))
+
+From the command line (one process per CPU):
+    python -m FPV.Helpers.report egnyte inventory.txt
+"""
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable, List, Optional, Tuple
+
+from ._categories import mask_to_categories
+from .batch import BatchResult, validate_batch
+from .corpus import resolve_service
+from .manifest import MmapManifest
+from .os_classes import FPV_Windows
+from .prescreen import screened_characters
+
+# Path length histogram: LENGTH_BINS buckets of LENGTH_BIN_WIDTH characters, the last one open-ended.
+LENGTH_BIN_WIDTH = 32
+LENGTH_BINS = 128
+
+
+class _TopCounter:
+    """
+    Misra-Gries counter for the heaviest keys, in at most 2 * capacity slots. It is
+    exact until more than 2 * capacity keys are seen. Then the (capacity + 1)-th
+    largest count is taken off every key and keys at zero are dropped, so any count
+    is low by at most `error`. Counters merge by adding, with the same bound.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts = {}
+        self.error = 0
+
+    def add(self, key, count: int = 1):
+        self.counts[key] = self.counts.get(key, 0) + count
+        if len(self.counts) > 2 * self.capacity:
+            self._prune()
+
+    def _prune(self):
+        cut = sorted(self.counts.values(), reverse=True)[self.capacity]
+        self.counts = {key: count - cut for key, count in self.counts.items() if count > cut}
+        self.error += cut
+
+    def merge(self, other: "_TopCounter"):
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+        self.error += other.error
+        if len(self.counts) > 2 * self.capacity:
+            self._prune()
+
+    def top(self, count: Optional[int] = None) -> List[Tuple[str, int]]:
+        ranked = sorted(self.counts.items(), key=lambda item: (-item[1], item[0]))
+        return ranked if count is None else ranked[:count]
+
+
+class _ServiceTotals:
+    __slots__ = ("paths", "invalid", "categories", "lengths", "max_length")
+
+    def __init__(self):
+        self.paths = self.invalid = self.max_length = 0
+        self.categories = {}  # category name -> invalid paths with it
+        self.lengths = [0] * LENGTH_BINS
+
+    def to_dict(self) -> dict:
+        return {"paths": self.paths, "invalid": self.invalid, "categories": dict(sorted(self.categories.items())),
+                "lengths": list(self.lengths), "max_length": self.max_length}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "_ServiceTotals":
+        totals = cls()
+        totals.paths, totals.invalid, totals.max_length = data["paths"], data["invalid"], data["max_length"]
+        totals.categories = dict(data["categories"])
+        totals.lengths = list(data["lengths"])
+        return totals
+
+
+class AggregateReport:
+    """
+    Counters over validation results: paths, invalid paths and categories per
+    service, a path length histogram per service, invalid paths per top-level
+    folder and invalid paths per offending character.
+
+    Args:
+        max_folders: Top-level folders that are always kept. Past twice as many, only
+            the heaviest are kept and counts become lower bounds (see `folder_error`).
+        max_characters: Same for offending characters.
+    """
+
+    def __init__(self, max_folders: int = 1000, max_characters: int = 256):
+        self.services = {}  # service name -> _ServiceTotals
+        self.folders = _TopCounter(max_folders)
+        self.characters = _TopCounter(max_characters)
+        self._mask_names = {}  # issue mask -> category names; few distinct masks occur
+
+    def add(self, service, result: BatchResult, file_added: bool = False):
+        """Count one batch result for `service`; the result itself is not kept."""
+        cls = resolve_service(service)
+        totals = self.services.get(cls.__name__)
+        if totals is None:
+            totals = self.services[cls.__name__] = _ServiceTotals()
+        sep = "\\" if issubclass(cls, FPV_Windows) else "/"
+        path = result.path.strip(sep)
+        length = len(path)
+        totals.paths += 1
+        totals.lengths[min(length // LENGTH_BIN_WIDTH, LENGTH_BINS - 1)] += 1
+        totals.max_length = max(totals.max_length, length)
+        if result.is_valid:
+            return
+
+        totals.invalid += 1
+        names = self._mask_names.get(result.issue_mask)
+        if names is None:
+            names = self._mask_names[result.issue_mask] = mask_to_categories(result.issue_mask)
+        for name in names:
+            totals.categories[name] = totals.categories.get(name, 0) + 1
+        self.folders.add(path.split(sep, 1)[0] if sep in path else "")
+        if "INVALID_CHAR" in names:
+            folder_chars, file_chars = screened_characters(cls)
+            folders, _, name = path.rpartition(sep) if file_added else (path, sep, "")
+            for char in sorted(folder_chars.intersection(folders) | file_chars.intersection(name)):
+                self.characters.add(char)
+
+    def merge(self, other: "AggregateReport") -> "AggregateReport":
+        """Add another report's counts to this one (for example, one per worker process)."""
+        for service, theirs in other.services.items():
+            totals = self.services.get(service)
+            if totals is None:
+                totals = self.services[service] = _ServiceTotals()
+            totals.paths += theirs.paths
+            totals.invalid += theirs.invalid
+            totals.max_length = max(totals.max_length, theirs.max_length)
+            for name, count in theirs.categories.items():
+                totals.categories[name] = totals.categories.get(name, 0) + count
+            totals.lengths = [mine + their for mine, their in zip(totals.lengths, theirs.lengths)]
+        self.folders.merge(other.folders)
+        self.characters.merge(other.characters)
+        return self
+
+    @property
+    def folder_error(self) -> int:
+        """How much any top-level folder's count can be low (0 while the counts are exact)."""
+        return self.folders.error
+
+    def top_folders(self, count: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(top-level folder, invalid paths), most first."""
+        return self.folders.top(count)
+
+    def top_characters(self, count: Optional[int] = None) -> List[Tuple[str, int]]:
+        """(character, invalid paths containing it), most first."""
+        return self.characters.top(count)
+
+    def to_dict(self) -> dict:
+        return {
+            "services": {service: totals.to_dict() for service, totals in sorted(self.services.items())},
+            "folders": {"capacity": self.folders.capacity, "error": self.folders.error, "counts": self.top_folders()},
+            "characters": {"capacity": self.characters.capacity, "error": self.characters.error,
+                           "counts": self.top_characters()},
+            "length_bin_width": LENGTH_BIN_WIDTH,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "AggregateReport":
+        report = cls(data["folders"]["capacity"], data["characters"]["capacity"])
+        report.services = {service: _ServiceTotals.from_dict(totals) for service, totals in data["services"].items()}
+        for counter, entry in ((report.folders, data["folders"]), (report.characters, data["characters"])):
+            counter.counts = {key: count for key, count in entry["counts"]}
+            counter.error = entry["error"]
+        return report
+
+
+def report_batch(service, paths: Iterable[str], report: Optional[AggregateReport] = None,
+                 file_added: bool = False, **batch_kwargs) -> AggregateReport:
+    """
+    Validate `paths` with `validate_batch` and count the results into `report`
+    (a new one by default). Other keyword arguments go to `validate_batch`, except
+    `prescreen`, which is always off: screened results only carry PATH_LENGTH and
+    INVALID_CHAR, and a report counts every category.
+    """
+    report = report if report is not None else AggregateReport()
+    batch_kwargs["prescreen"] = False
+    for result in validate_batch(service, paths, file_added=file_added, **batch_kwargs):
+        report.add(service, result, file_added)
+    return report
+
+
+def _report_range(job) -> dict:
+    service, filename, start, end, delimiter, capacities, batch_kwargs = job
+    with MmapManifest(filename, delimiter) as manifest:
+        report = AggregateReport(*capacities)
+        return report_batch(service, manifest.records(start, end), report, **batch_kwargs).to_dict()
+
+
+def report_manifest(service, filename: str, workers: int = None, delimiter: str = "\n",
+                    max_folders: int = 1000, max_characters: int = 256, **batch_kwargs) -> AggregateReport:
+    """
+    Build a report for every record of a manifest, splitting it into byte ranges
+    across processes (see `manifest.scan_manifest`) and merging their reports.
+    `max_folders` and `max_characters` are as in `AggregateReport`; other keyword
+    arguments go to `report_batch`.
+    """
+    workers = workers or os.cpu_count() or 1
+    batch_kwargs.setdefault("file_added", True)
+    with MmapManifest(filename, delimiter) as manifest:
+        ranges = manifest.byte_ranges(workers)
+    capacities = (max_folders, max_characters)
+    jobs = [(service, filename, start, end, delimiter, capacities, batch_kwargs) for start, end in ranges]
+    if workers == 1 or len(jobs) <= 1:
+        parts = [_report_range(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_report_range, jobs))
+    report = AggregateReport(*capacities)
+    for part in parts:
+        report.merge(AggregateReport.from_dict(part))
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize the validation results of a manifest.")
+    parser.add_argument("service")
+    parser.add_argument("manifest")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--null", action="store_true", help="Records are NUL delimited")
+    parser.add_argument("--folders-only", action="store_true", help="The last part of each path is a folder")
+    args = parser.parse_args(argv)
+
+    report = report_manifest(args.service, args.manifest, workers=args.workers,
+                             delimiter="\0" if args.null else "\n", file_added=not args.folders_only)
+    json.dump(report.to_dict(), sys.stdout, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+"""
+Violation rate estimates from a sample of a manifest.
+
+Validating k paths drawn at random estimates how many paths of the whole
+manifest would fail, and why, long before a full scan would finish. The
+estimate comes with Wilson confidence intervals.
+
+Two ways to draw the sample:
+
+- `sample_file` seeks to k random byte offsets of a memory-mapped manifest and
+  takes the record under each offset. The cost depends on k, not on the file
+  size. A record is hit in proportion to its size in bytes, so each draw is
+  weighted by 1 / (bytes + 1) to undo that bias.
+- `reservoir_sample` draws k records uniformly from a stream that can only be
+  read once (stdin, a pipe, a generator). It still reads the whole stream, but
+  skips between picks without touching the random generator per record
+  (Li's Algorithm L).
+
+Usage:
+    estimate = estimate_manifest("egnyte", "inventory.txt", k=2000, seed=1)
+    print(estimate.invalid, estimate.categories["PATH_LENGTH"])
+
+From the command line ("-" samples stdin with a reservoir):
+    python -m FPV.Helpers.sampling egnyte inventory.txt -k 2000
+"""
+
+import argparse
+import random
+import sys
+from itertools import count, islice
+from math import exp, floor, log, sqrt
+from operator import itemgetter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .batch import validate_batch
+from .corpus import resolve_service
+from .manifest import MmapManifest
+
+# Draws of an empty record (between two delimiters) are redrawn; give up after this many in a row.
+_MAX_REDRAWS = 1000
+
+
+class Rate(NamedTuple):
+    """Estimated fraction of paths, with a Wilson confidence interval [low, high]."""
+    rate: float
+    low: float
+    high: float
+
+
+class SampleEstimate(NamedTuple):
+    """
+    Estimated rates over the whole manifest. `sampled` is the number of paths
+    validated. `effective_size` is the sample size that the weighting leaves the
+    intervals with, and equals `sampled` for uniform samples. `population` is the
+    record count, exact for streams and estimated for `sample_file`.
+    """
+    service: str
+    sampled: int
+    effective_size: float
+    population: float
+    invalid: Rate
+    categories: Dict[str, Rate]
+
+
+def _open_uniform(rng: random.Random) -> float:
+    """Uniform on (0, 1), so its logarithm is finite and negative."""
+    value = rng.random()
+    while value == 0.0:
+        value = rng.random()
+    return value
+
+
+def reservoir_sample(records: Iterable[str], k: int, seed=None) -> Tuple[List[str], int]:
+    """
+    Draw k records uniformly without replacement from a stream read once.
+
+    Returns:
+        (sample, total): the sample (all records if there are at most k) and the
+        number of records in the stream.
+    """
+    if k <= 0:
+        return [], sum(1 for _ in records)
+    rng = random.Random(seed)
+    counter = count()  # zip advances it once per record pulled, so it ends at the stream length
+    stream = map(itemgetter(0), zip(records, counter))
+    sample = list(islice(stream, k))
+    if len(sample) < k:
+        return sample, len(sample)
+
+    weight = exp(log(_open_uniform(rng)) / k)
+    while True:
+        skip = floor(log(_open_uniform(rng)) / log(1.0 - weight))
+        picked = next(islice(stream, skip, skip + 1), None)
+        if picked is None:
+            return sample, next(counter)
+        sample[rng.randrange(k)] = picked
+        weight *= exp(log(_open_uniform(rng)) / k)
+
+
+def sample_file(filename: str, k: int, seed=None, delimiter: str = "\n",
+                encoding: str = "utf-8") -> Tuple[List[str], List[float], float]:
+    """
+    Draw k records (with replacement) from random byte offsets of a manifest.
+
+    Returns:
+        (sample, weights, population): the records, the weight of each draw
+        (1 / (record bytes + 1), which undoes the size bias) and the estimated
+        number of records in the file.
+    """
+    rng = random.Random(seed)
+    sample, weights = [], []
+    with MmapManifest(filename, delimiter, encoding) as manifest:
+        if not manifest.size:
+            return [], [], 0.0
+        for _ in range(k):
+            for _ in range(_MAX_REDRAWS):
+                record = manifest.record_at(rng.randrange(manifest.size))
+                if record:
+                    break
+            else:
+                raise ValueError(f"{filename} holds almost no records; validate it in full instead.")
+            sample.append(record.decode(encoding, "surrogateescape"))
+            weights.append(1.0 / (len(record) + 1))
+        # Every record covers its bytes plus a delimiter, so size * E[1 / (bytes + 1)] counts them.
+        population = manifest.size * sum(weights) / len(weights)
+    return sample, weights, population
+
+
+def wilson_interval(rate: float, size: float, z: float = 1.96) -> Rate:
+    """Wilson score interval for a proportion observed over `size` (possibly effective) draws."""
+    if size <= 0:
+        return Rate(rate, 0.0, 1.0)
+    denominator = 1 + z * z / size
+    center = (rate + z * z / (2 * size)) / denominator
+    half = z * sqrt(rate * (1 - rate) / size + z * z / (4 * size * size)) / denominator
+    return Rate(rate, max(0.0, center - half), min(1.0, center + half))
+
+
+def estimate(service, sample: List[str], weights: Optional[List[float]] = None, population: float = None,
+             file_added: bool = True, z: float = 1.96, **batch_kwargs) -> SampleEstimate:
+    """
+    Validate a sample and estimate the invalid rate and the rate of every category.
+
+    Args:
+        service: Service class or name.
+        sample: Sampled paths.
+        weights: Weight of each path, for samples that are not uniform (see `sample_file`).
+            Rates are then weighted means, and the intervals use Kish's effective sample size.
+        population: Record count to report; defaults to the sample size.
+        file_added: Passed to `validate_batch`, as are other keyword arguments.
+        z: Normal quantile of the intervals (1.96 for 95%, 2.576 for 99%).
+    """
+    weights = weights if weights is not None else [1.0] * len(sample)
+    total = sum(weights)
+    effective = total * total / sum(w * w for w in weights) if total else 0.0
+    invalid, categories = 0.0, {}
+    results = validate_batch(service, sample, file_added=file_added, **batch_kwargs)
+    for weight, result in zip(weights, results):
+        if result.is_valid:
+            continue
+        invalid += weight
+        for name in result.categories:
+            categories[name] = categories.get(name, 0.0) + weight
+
+    def rate(value):
+        return wilson_interval(value / total if total else 0.0, effective, z)
+
+    return SampleEstimate(
+        service=resolve_service(service).__name__,
+        sampled=len(sample),
+        effective_size=effective,
+        population=len(sample) if population is None else population,
+        invalid=rate(invalid),
+        categories={name: rate(value) for name, value in sorted(categories.items())},
+    )
+
+
+def estimate_manifest(service, filename: str, k: int = 1000, seed=None, delimiter: str = "\n",
+                      z: float = 1.96, **kwargs) -> SampleEstimate:
+    """Estimate from k random seeks into a manifest file (see `sample_file` and `estimate`)."""
+    sample, weights, population = sample_file(filename, k, seed, delimiter)
+    return estimate(service, sample, weights, population, z=z, **kwargs)
+
+
+def estimate_stream(service, records: Iterable[str], k: int = 1000, seed=None, z: float = 1.96,
+                    **kwargs) -> SampleEstimate:
+    """Estimate from a reservoir sample of a stream read once (see `reservoir_sample` and `estimate`)."""
+    sample, population = reservoir_sample(records, k, seed)
+    return estimate(service, sample, population=population, z=z, **kwargs)
+
+
+def _read_records(stream, delimiter: bytes, block_size: int = 1 << 20) -> Iterable[str]:
+    """Split a binary stream into decoded records, a block at a time."""
+    pending = b""
+    for block in iter(lambda: stream.read(block_size), b""):
+        records = (pending + block).split(delimiter)
+        pending = records.pop()
+        for record in records:
+            yield record.decode("utf-8", "surrogateescape")
+    yield pending.decode("utf-8", "surrogateescape")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estimate violation rates of a manifest from a random sample.")
+    parser.add_argument("service")
+    parser.add_argument("manifest", help='Manifest file, or "-" to sample stdin')
+    parser.add_argument("-k", type=int, default=1000, help="Paths to validate")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--null", action="store_true", help="Records are NUL delimited")
+    parser.add_argument("--folders-only", action="store_true", help="The last part of each path is a folder")
+    args = parser.parse_args(argv)
+
+    delimiter = "\0" if args.null else "\n"
+    kwargs = {"seed": args.seed, "file_added": not args.folders_only}
+    if args.manifest == "-":
+        records = filter(None, _read_records(sys.stdin.buffer, delimiter.encode("ascii")))
+        result = estimate_stream(args.service, records, args.k, **kwargs)
+    else:
+        result = estimate_manifest(args.service, args.manifest, args.k, delimiter=delimiter, **kwargs)
+
+    print(f"{result.service}: {result.sampled} sampled of ~{result.population:.0f} records")
+    rows = [("invalid", result.invalid)] + list(result.categories.items())
+    for name, value in rows:
+        print(f"{name:<20} {value.rate:8.3%}  [{value.low:.3%}, {value.high:.3%}]")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
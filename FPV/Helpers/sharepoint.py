@@ -5,6 +5,7 @@ class FPV_SharePoint(FPV_Base):
     # SharePoint-specific rules
     invalid_characters = "#%&*:{}<>?|\""
     max_length = 400
+    case_insensitive = True
     restricted_names = {
         ".lock", "CON", "PRN", "AUX", "NUL",
         "COM1", "COM2", "COM3", "COM4", "COM5",
@@ -70,7 +71,8 @@ class FPV_SharePoint(FPV_Base):
                         "priority": 2,
                         "details": {"original": part_str, "new_value": cleaned_part, "index": index},
                         "reason": f'Removed restricted prefix "{self.restricted_prefix}" from path part.',
-                    }
+                    },
+                    priority=2
                 )
                 return cleaned_part
         return part_str
@@ -0,0 +1,141 @@
+"""
+Path length checks for moving or copying a whole subtree.
+
+Moving a folder changes the full path of everything inside it, so each
+descendant could hit PATH_LENGTH at its new location. The other rules look at
+one part at a time and are not affected by a move. `process_path_length` flags a
+path when its length plus its longest non-root part plus one separator exceeds
+`max_length`. For a descendant with relative length r and longest part m, moved
+under a prefix of length p whose longest part is q, that is
+
+    p + sep + r + max(q, m) + sep > max_length
+
+`SubtreeIndex` keeps the two maxima this needs over all descendants,
+max(r) and max(r + m). After one pass over the subtree, checking a prefix is O(1).
+Listing the offenders costs one sorted scan that stops at the first descendant
+that fits.
+
+Usage:
+    index = SubtreeIndex.from_tree("sharepoint", "/mnt/share/Projects/Alpha")
+    check = index.check_move("Archive/2024/Closed projects")
+    if not check.valid:
+        print(check.excess, index.offenders("Archive/2024/Closed projects")[:10])
+"""
+
+import os
+from bisect import bisect_right
+from typing import Iterable, List, NamedTuple, Optional
+
+from .corpus import resolve_service
+from .os_classes import FPV_Windows
+
+
+class MoveCheck(NamedTuple):
+    """Outcome of one move query. `excess` is how many characters the worst descendant is over (<= 0 if valid)."""
+    valid: bool
+    excess: int
+    max_length: int
+
+
+class SubtreeIndex:
+    """
+    Relative lengths of every entry of one subtree, for one service.
+
+    Args:
+        service: Service class or name.
+        name: Name of the subtree's top folder. It moves with the subtree and counts
+            towards every descendant's length.
+        entries: Paths of the descendants relative to the top folder, using the
+            service's separator ("\\\\" for Windows, "/" otherwise).
+    """
+
+    def __init__(self, service, name: str, entries: Iterable[str] = ()):
+        self.cls = resolve_service(service)
+        self.sep = "\\" if issubclass(self.cls, FPV_Windows) else "/"
+        self.name = name
+        self.checks_length = bool(self.cls.max_length) and any(
+            "process_path_length" in rules for rules in self.cls.rule_names().values())
+        self._entries = []  # (relative length, longest part, depth, relative path)
+        self._max_length = self._max_with_part = 0
+        self._sorted = None
+        self.add("")
+        for entry in entries:
+            self.add(entry)
+
+    @classmethod
+    def from_tree(cls, service, directory: str) -> "SubtreeIndex":
+        """Index a local directory tree with one `os.scandir` pass."""
+        index = cls(service, os.path.basename(os.path.normpath(directory)))
+        pending = [(directory, "")]
+        while pending:
+            path, relative = pending.pop()
+            with os.scandir(path) as scan:
+                for entry in scan:
+                    child = relative + index.sep + entry.name if relative else entry.name
+                    index.add(child)
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append((entry.path, child))
+        return index
+
+    def add(self, relative_path: str):
+        """Record one descendant, given relative to the top folder ("" is the top folder itself)."""
+        parts = [self.name] + (relative_path.split(self.sep) if relative_path else [])
+        length = len(self.sep.join(parts))
+        longest = max(len(part) for part in parts)
+        self._entries.append((length, longest, len(parts) - 1, relative_path))
+        self._max_length = max(self._max_length, length)
+        self._max_with_part = max(self._max_with_part, length + longest)
+        self._sorted = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def max_depth(self) -> int:
+        return max(depth for _, _, depth, _ in self._entries)
+
+    def _budget(self, prefix: str, relative: bool):
+        """Return (characters left for r + max(q, m), q) under `prefix`."""
+        parts = [part for part in prefix.split(self.sep) if part] if prefix else []
+        checked = parts if relative else parts[1:]  # the root part has no length rule
+        prefix_length = len(self.sep.join(parts)) + len(self.sep) if parts else 0
+        longest = max((len(part) for part in checked), default=0)
+        return self.cls.max_length - prefix_length - len(self.sep), longest
+
+    def check_move(self, prefix: str, relative: bool = True) -> MoveCheck:
+        """
+        Would every entry stay within the service's path length if the subtree moved under `prefix`?
+
+        Args:
+            prefix: New parent folder, in the service's separator ("" for the top level).
+            relative: Whether `prefix` is relative, as in the service constructor. An
+                absolute prefix starts with a root part such as "C:".
+        """
+        if not self.checks_length:
+            return MoveCheck(True, 0, self.cls.max_length)
+        budget, prefix_part = self._budget(prefix, relative)
+        worst = max(self._max_length + prefix_part, self._max_with_part)
+        excess = worst - budget
+        return MoveCheck(excess <= 0, excess, self.cls.max_length)
+
+    def offenders(self, prefix: str, relative: bool = True, limit: Optional[int] = None) -> List[str]:
+        """
+        Entries that would fail PATH_LENGTH under `prefix`, longest first, relative to
+        the top folder ("" is the top folder). Scans only past the offenders themselves.
+        """
+        if not self.checks_length:
+            return []
+        if self._sorted is None:
+            self._sorted = []
+            for key in (lambda entry: entry[0], lambda entry: entry[0] + entry[1]):
+                entries = sorted(self._entries, key=key)
+                self._sorted.append(([key(entry) for entry in entries], entries))
+        budget, prefix_part = self._budget(prefix, relative)
+
+        # An entry fails if r + q > budget or r + m > budget; each set is a suffix of one sorted list.
+        found = {}
+        for (keys, entries), limit_key in zip(self._sorted, (budget - prefix_part, budget)):
+            for entry in entries[bisect_right(keys, limit_key):]:
+                found[entry[3]] = entry[0]
+        ordered = sorted(found, key=lambda path: (-found[path], path))
+        return ordered if limit is None else ordered[:limit]
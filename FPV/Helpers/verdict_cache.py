@@ -0,0 +1,219 @@
+"""
+Persistent verdict cache backed by SQLite (standard library only).
+
+A verdict is the category bitmask a path produced under one ruleset, plus the
+cleaned path when cleaning was requested. Entries are keyed by
+(service, ruleset fingerprint, relative, file_added, path hash), so a change
+to a service's rules never serves a stale verdict: it just misses.
+
+Usage:
+    with VerdictCache("verdicts.db") as cache:
+        for result in validate_batch("egnyte", paths, cache=cache):
+            ...
+        cache.evict(max_entries=60_000_000)
+
+Maintenance from the command line:
+    python -m FPV.Helpers.verdict_cache stats verdicts.db
+    python -m FPV.Helpers.verdict_cache evict verdicts.db --max-entries 60000000
+"""
+
+import argparse
+import hashlib
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, Tuple
+
+from ..API import metrics
+
+# SQLite builds before 3.32 allow at most 999 bound parameters per statement.
+_MAX_PARAMS = 900
+
+
+def path_hash(path: str) -> bytes:
+    """16-byte digest used as the cache key for a path."""
+    return hashlib.blake2b(path.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class VerdictCache:
+    """
+    SQLite-backed map from (ruleset, path) to (category mask, cleaned path).
+
+    Args:
+        filename: Database file, or ":memory:".
+        touch_on_hit: Refresh the last-seen time of entries that are read (one batched
+            UPDATE per chunk), so `evict(max_entries=...)` drops the least recently
+            seen ones first. Off by default: a hot cache would otherwise write every
+            row it serves. Without it, eviction drops the least recently written.
+    """
+
+    def __init__(self, filename: str = ":memory:", touch_on_hit: bool = False):
+        self.filename = filename
+        self.touch_on_hit = touch_on_hit
+        self.hits = 0
+        self.misses = 0
+        self._rulesets = {}
+        self.conn = sqlite3.connect(filename)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS rulesets (
+                id INTEGER PRIMARY KEY,
+                service TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                relative INTEGER NOT NULL,
+                file_added INTEGER NOT NULL,
+                UNIQUE (service, fingerprint, relative, file_added)
+            );
+            CREATE TABLE IF NOT EXISTS verdicts (
+                ruleset_id INTEGER NOT NULL,
+                path_hash BLOB NOT NULL,
+                mask INTEGER NOT NULL,
+                cleaned TEXT,
+                last_seen INTEGER NOT NULL,
+                PRIMARY KEY (ruleset_id, path_hash)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS verdicts_last_seen ON verdicts (last_seen);
+        """)
+        self.conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.conn.close()
+
+    def ruleset_id(self, cls, relative: bool, file_added: bool) -> int:
+        """Return (creating if needed) the compact id of one service/fingerprint/flags combination."""
+        key = (cls.__name__, cls.ruleset_fingerprint(), int(bool(relative)), int(bool(file_added)))
+        ruleset = self._rulesets.get(key)
+        if ruleset is None:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO rulesets (service, fingerprint, relative, file_added) VALUES (?, ?, ?, ?)", key)
+            ruleset = self.conn.execute(
+                "SELECT id FROM rulesets WHERE service = ? AND fingerprint = ? AND relative = ? AND file_added = ?",
+                key).fetchone()[0]
+            self.conn.commit()
+            self._rulesets[key] = ruleset
+        return ruleset
+
+    def get_many(self, ruleset: int, paths: Iterable[str]) -> Dict[str, Tuple[int, str]]:
+        """Look up many paths in one transaction; returns {path: (mask, cleaned)} for the hits."""
+        by_hash = {path_hash(path): path for path in paths}
+        hashes = list(by_hash)
+        found = {}
+        with self.conn:
+            for start in range(0, len(hashes), _MAX_PARAMS):
+                chunk = hashes[start:start + _MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT path_hash, mask, cleaned FROM verdicts WHERE ruleset_id = ? AND path_hash IN ({placeholders})",
+                    [ruleset, *chunk]).fetchall()
+                for digest, mask, cleaned in rows:
+                    found[by_hash[digest]] = (mask, cleaned)
+                if self.touch_on_hit and rows:
+                    now = int(time.time())
+                    self.conn.executemany(
+                        "UPDATE verdicts SET last_seen = ? WHERE ruleset_id = ? AND path_hash = ?",
+                        [(now, ruleset, digest) for digest, _, _ in rows])
+        self.hits += len(found)
+        self.misses += len(by_hash) - len(found)
+        metrics.record_cache_lookup("verdict", True, len(found))
+        metrics.record_cache_lookup("verdict", False, len(by_hash) - len(found))
+        return found
+
+    def put_many(self, ruleset: int, entries: Iterable[Tuple[str, int, str]]):
+        """Store (path, mask, cleaned) verdicts in one transaction. `cleaned` may be None."""
+        now = int(time.time())
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO verdicts (ruleset_id, path_hash, mask, cleaned, last_seen) VALUES (?, ?, ?, ?, ?)",
+                [(ruleset, path_hash(path), mask, cleaned, now) for path, mask, cleaned in entries])
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM verdicts").fetchone()[0]
+
+    def evict(self, max_entries: int = None, older_than: float = None, services=None) -> int:
+        """
+        Drop entries that can no longer be served, then trim the cache.
+
+        Args:
+            max_entries: Keep at most this many entries, dropping the least recently seen.
+            older_than: Also drop entries not seen for this many seconds.
+            services: Service classes whose current fingerprint is kept. Entries for other
+                fingerprints of these services are dropped. Defaults to every built-in service.
+
+        Returns:
+            int: Number of entries removed.
+        """
+        if services is None:
+            from .corpus import SERVICES
+            services = SERVICES.values()
+        removed = 0
+        with self.conn:
+            for cls in services:
+                stale = [row[0] for row in self.conn.execute(
+                    "SELECT id FROM rulesets WHERE service = ? AND fingerprint != ?",
+                    (cls.__name__, cls.ruleset_fingerprint()))]
+                for ruleset in stale:
+                    removed += self.conn.execute("DELETE FROM verdicts WHERE ruleset_id = ?", (ruleset,)).rowcount
+                    self.conn.execute("DELETE FROM rulesets WHERE id = ?", (ruleset,))
+            if older_than is not None:
+                removed += self.conn.execute(
+                    "DELETE FROM verdicts WHERE last_seen < ?", (int(time.time() - older_than),)).rowcount
+            if max_entries is not None:
+                excess = len(self) - max_entries
+                if excess > 0:
+                    removed += self.conn.execute(
+                        "DELETE FROM verdicts WHERE (ruleset_id, path_hash) IN "
+                        "(SELECT ruleset_id, path_hash FROM verdicts ORDER BY last_seen LIMIT ?)", (excess,)).rowcount
+        self._rulesets.clear()
+        return removed
+
+    def compact(self):
+        """Rebuild the database file so space freed by `evict` is returned to the filesystem."""
+        self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.conn.execute("VACUUM")
+
+    def stats(self) -> dict:
+        rows = self.conn.execute(
+            "SELECT r.service, r.fingerprint, r.relative, r.file_added, COUNT(v.path_hash) "
+            "FROM rulesets r LEFT JOIN verdicts v ON v.ruleset_id = r.id GROUP BY r.id ORDER BY r.service").fetchall()
+        return {
+            "entries": len(self),
+            "rulesets": [
+                {"service": service, "fingerprint": fingerprint, "relative": bool(relative),
+                 "file_added": bool(file_added), "entries": entries}
+                for service, fingerprint, relative, file_added, entries in rows
+            ],
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect or shrink an FPV verdict cache.")
+    parser.add_argument("command", choices=["stats", "evict", "compact"])
+    parser.add_argument("filename")
+    parser.add_argument("--max-entries", type=int)
+    parser.add_argument("--older-than-days", type=float)
+    args = parser.parse_args(argv)
+
+    with VerdictCache(args.filename) as cache:
+        if args.command == "evict":
+            older_than = args.older_than_days * 86400 if args.older_than_days is not None else None
+            print(f"removed {cache.evict(max_entries=args.max_entries, older_than=older_than)} entries")
+            cache.compact()
+        elif args.command == "compact":
+            cache.compact()
+        stats = cache.stats()
+        print(f"{stats['entries']} entries")
+        for ruleset in stats["rulesets"]:
+            print(f"  {ruleset['service']:<16} {ruleset['fingerprint']} relative={ruleset['relative']} "
+                  f"file_added={ruleset['file_added']} entries={ruleset['entries']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
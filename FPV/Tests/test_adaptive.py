@@ -0,0 +1,36 @@
+import pytest
+
+from FPV import FPV_Egnyte
+from FPV.Helpers.adaptive import AdaptiveRuleOrder
+from FPV.Helpers.corpus import SERVICES, PathCorpus
+
+
+def test_short_circuit_verdicts_match_full_validation():
+    order = AdaptiveRuleOrder(reorder_every=50)
+    for cls in SERVICES.values():
+        for path in PathCorpus(cls, seed=6, violation_rate=0.5).paths(300):
+            expected = not cls(path, auto_validate=False, file_added=True).validate(raise_error=False)
+            assert cls(path, auto_validate=False, file_added=True).is_valid() == expected
+            assert cls(path, auto_validate=False, file_added=True).is_valid(order=order) == expected, path
+
+
+def test_frequent_rejections_move_first_and_freeze(tmp_path):
+    order = AdaptiveRuleOrder(reorder_every=20)
+    for i in range(2000):
+        FPV_Egnyte(f"docs/report{i}?.txt", auto_validate=False, file_added=True).is_valid(order=order)
+    frozen = order.freeze()
+    assert frozen["FPV_Egnyte"]["fingerprint"] == FPV_Egnyte.ruleset_fingerprint()
+    assert frozen["FPV_Egnyte"]["order"]["file"][0] == "process_invalid_characters"
+
+    order.save(str(tmp_path / "order.json"))
+    replay = AdaptiveRuleOrder.load(str(tmp_path / "order.json"))
+    for path in ("docs/ok.txt", "docs/a*.txt", "docs/desktop.ini"):
+        expected = not FPV_Egnyte(path, auto_validate=False, file_added=True).validate(raise_error=False)
+        assert FPV_Egnyte(path, auto_validate=False, file_added=True).is_valid(order=replay) == expected
+    assert replay.freeze() == frozen  # frozen orders never change
+
+
+def test_frozen_order_rejects_a_changed_ruleset(monkeypatch):
+    frozen = {"FPV_Egnyte": {"fingerprint": "0" * 16, "order": {"file": ["process_path_length"]}}}
+    with pytest.raises(ValueError):
+        FPV_Egnyte("docs/a.txt", auto_validate=False, file_added=True).is_valid(order=AdaptiveRuleOrder(frozen=frozen))
@@ -0,0 +1,127 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("quart")
+
+from FPV.API.api import create_app
+from FPV.Helpers.os_classes import FPV_Windows
+
+
+@pytest.fixture(autouse=True)
+def state_secret(monkeypatch):
+    monkeypatch.setenv("FPV_STATE_SECRET", "test-secret")
+
+
+def _run(coroutine):
+    return asyncio.run(coroutine)
+
+
+async def _ws_session(messages):
+    """Send `messages` over one /path/ws connection and return the replies."""
+    replies = []
+    async with create_app().test_client().websocket("/api/v1/path/ws") as socket:
+        for message in messages:
+            await socket.send(json.dumps(message))
+            replies.append(json.loads(await socket.receive()))
+    return replies
+
+
+def _init(path, file_added=True):
+    errors = FPV_Windows(path, auto_validate=False, file_added=file_added).validate(raise_error=False)
+    return {"op": "init", "id": 0, "service": "windows", "base_path": path, "errors": errors, "file_added": file_added}
+
+
+def test_ws_add_reports_only_the_new_part_issues():
+    _, reply = _run(_ws_session([_init("docs\\CON", file_added=False), {"op": "add", "id": 1, "part": "a<b.txt", "is_file": True}]))
+    assert reply["success"] and reply["updated_path"].endswith("docs\\CON\\a<b.txt")
+    assert [issue["category"] for issue in reply["new_errors"]] == ["INVALID_CHAR"]
+    assert reply["removed_errors"] == []
+
+
+def test_ws_remove_does_not_report_issues_that_only_moved():
+    init, reply = _run(_ws_session([_init("ok\\a<b\\CON\\c|d.txt"), {"op": "remove", "id": 1, "index": 0}]))
+    assert len(init["all_errors"]) == 3
+    assert reply["success"] and reply["removed_part"] == "ok"
+    assert reply["new_errors"] == [] and reply["removed_errors"] == []
+
+    _, reply = _run(_ws_session([_init("ok\\a<b\\CON\\c|d.txt"), {"op": "remove", "id": 1, "index": 1}]))
+    assert reply["new_errors"] == []
+    assert [(issue["category"], issue["details"]["index"]) for issue in reply["removed_errors"]] == [("INVALID_CHAR", 1)]
+
+
+def test_ws_insert_does_not_report_issues_that_only_moved():
+    _, reply = _run(_ws_session([_init("a<b\\CON\\c|d.txt"), {"op": "insert", "id": 1, "index": 0, "part": "x?y"}]))
+    assert reply["success"] and reply["updated_path"].endswith("x?y\\a<b\\CON\\c|d.txt")
+    assert [(issue["category"], issue["details"]["index"]) for issue in reply["new_errors"]] == [("INVALID_CHAR", 0)]
+    assert reply["removed_errors"] == []
+
+
+def test_ws_rejects_out_of_range_indexes():
+    replies = _run(_ws_session([_init("a\\b.txt"), {"op": "remove", "id": 1, "index": -1},
+                                {"op": "insert", "id": 2, "index": 9, "part": "x"}]))
+    assert [reply["success"] for reply in replies] == [True, False, False]
+    assert replies[1]["error"] == "Invalid index for path parts."
+
+
+def test_state_tokens_verify_on_another_worker():
+    async def post(app, route, body):
+        response = await app.test_client().post(route, json=body)
+        return await response.get_json()
+
+    async def run():
+        first = await post(create_app(), "/api/v1/path/add",
+                           {"service": "windows", "base_path": "docs", "parts": ["CON"], "relative": True})
+        return await post(create_app(), "/api/v1/path/add",
+                          {"service": "windows", "state": first["state"], "parts": ["a<b.txt"], "file_added": True})
+
+    reply = _run(run())
+    assert reply["success"], reply
+    assert reply["updated_path"].endswith("docs\\CON\\a<b.txt")
+    assert {error["category"] for error in reply["all_errors"]} == {"RESTRICTED_NAME", "INVALID_CHAR"}
+
+
+async def _post(client, route, body):
+    response = await client.post(route, json=body)
+    return response.status_code, await response.get_json()
+
+
+def test_rename_and_insert_routes_round_trip_state_tokens():
+    async def run():
+        client = create_app().test_client()
+        _, built = await _post(client, "/api/v1/path/add", {"service": "windows", "base_path": "docs",
+                                                            "parts": ["CON", "a<b"]})
+        _, inserted = await _post(client, "/api/v1/path/insert", {"service": "windows", "state": built["state"],
+                                                                  "part_index": 1, "part": "x?y"})
+        _, renamed = await _post(client, "/api/v1/path/rename", {"service": "windows", "state": inserted["state"],
+                                                                 "part_index": 2, "part": "ok"})
+        return inserted, renamed
+
+    inserted, renamed = _run(run())
+    assert inserted["success"] and inserted["path_parts"] == ["docs", "x?y", "CON", "a<b"]
+    assert [(error["category"], error["details"]["index"]) for error in inserted["new_errors"]] == [("INVALID_CHAR", 1)]
+    assert renamed["success"] and renamed["path_parts"] == ["docs", "x?y", "ok", "a<b"]
+    assert renamed["new_errors"] == []
+    fresh = FPV_Windows("docs\\x?y\\ok\\a<b", auto_validate=False).validate(raise_error=False)
+    assert sorted((e["category"], e["details"]["index"]) for e in renamed["all_errors"]) == \
+        sorted((e["category"], e["details"]["index"]) for e in fresh)
+
+
+def test_rename_and_insert_routes_reject_bad_indexes():
+    async def run():
+        client = create_app().test_client()
+        body = {"service": "windows", "base_path": "a\\b.txt", "file_added": True, "part": "x"}
+        return [await _post(client, route, dict(body, part_index=index))
+                for route, index in (("/api/v1/path/rename", 2), ("/api/v1/path/rename", -1),
+                                     ("/api/v1/path/insert", 3), ("/api/v1/path/insert", 2))]
+
+    for status, reply in _run(run()):
+        assert status == 400 and not reply["success"] and reply["error"]
+        assert reply["updated_path"] == "a\\b.txt"
+
+
+def test_app_requires_a_state_secret(monkeypatch):
+    monkeypatch.delenv("FPV_STATE_SECRET")
+    with pytest.raises(RuntimeError, match="FPV_STATE_SECRET"):
+        create_app()
@@ -0,0 +1,60 @@
+import io
+import tarfile
+import zipfile
+
+import pytest
+
+from FPV.Helpers.archive import archive_members, validate_archive
+
+MEMBERS = ["docs/", "docs/report.docx", "docs/q1?.xlsx", "./notes /todo.txt", "CON"]
+
+
+def _zip(path):
+    with zipfile.ZipFile(path, "w") as archive:
+        for name in MEMBERS:
+            archive.writestr(name, b"" if name.endswith("/") else b"content")
+    return str(path)
+
+
+def _tar(path, mode="w:gz"):
+    with tarfile.open(path, mode) as archive:
+        for name in MEMBERS:
+            info = tarfile.TarInfo(name.rstrip("/"))
+            if name.endswith("/"):
+                info.type = tarfile.DIRTYPE
+                archive.addfile(info)
+            else:
+                info.size = 7
+                archive.addfile(info, io.BytesIO(b"content"))
+    return str(path)
+
+
+@pytest.mark.parametrize("make", [_zip, _tar, lambda path: _tar(path, "w")])
+def test_validate_archive_members(tmp_path, make):
+    archive = make(tmp_path / "upload")
+    results = {result.path.rstrip("/"): result for result in validate_archive("windows", archive)}
+    assert sorted(results) == sorted(name.rstrip("/") for name in MEMBERS)
+    invalid = {path: result.categories for path, result in results.items() if not result.is_valid}
+    assert invalid == {
+        "docs/q1?.xlsx": ["INVALID_CHAR"],
+        "./notes /todo.txt": ["WHITESPACE"],
+        "CON": ["RESTRICTED_NAME"],
+    }
+
+
+def test_member_data_is_never_read(tmp_path, monkeypatch):
+    def refuse(*args, **kwargs):
+        raise AssertionError("member data was read")
+
+    archives = (_zip(tmp_path / "a.zip"), _tar(tmp_path / "a.tar"))
+    monkeypatch.setattr(zipfile.ZipFile, "open", refuse)
+    monkeypatch.setattr(tarfile.TarFile, "extractfile", refuse)
+    for archive in archives:
+        assert len(list(archive_members(archive))) == len(MEMBERS)
+        assert len(list(validate_archive("sharepoint", archive))) == len(MEMBERS)
+
+
+def test_rejects_other_files(tmp_path):
+    (tmp_path / "plain.txt").write_text("not an archive")
+    with pytest.raises(ValueError):
+        list(archive_members(str(tmp_path / "plain.txt")))
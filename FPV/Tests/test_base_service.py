@@ -144,3 +144,122 @@ def test_clean_with_processing_methods(mock_fpv):
     cleaned_path = mock_fpv.clean(validate_after_clean=False)
     assert "invalid" not in cleaned_path
     assert "valid_file.txt" in cleaned_path
+
+
+def test_ruleset_fingerprint_is_stable_and_rule_sensitive(monkeypatch):
+    import subprocess
+    import sys
+    from FPV.Helpers import FPV_Egnyte, FPV_OneDrive, FPV_SharePoint
+
+    fingerprint = FPV_Egnyte.ruleset_fingerprint()
+    assert len(fingerprint) == 16 and fingerprint == FPV_Egnyte.ruleset_fingerprint()
+    other_process = subprocess.run(
+        [sys.executable, "-c", "from FPV import FPV_Egnyte; print(FPV_Egnyte.ruleset_fingerprint())"],
+        capture_output=True, text=True, check=True).stdout.strip()
+    assert other_process == fingerprint
+    # Same rules under another name still count as a different service.
+    assert FPV_OneDrive.ruleset_fingerprint() != FPV_SharePoint.ruleset_fingerprint()
+
+    monkeypatch.setattr(FPV_Egnyte, "endings", FPV_Egnyte.endings + [".bak"])
+    assert FPV_Egnyte.ruleset_fingerprint() == fingerprint  # cached until refreshed
+    assert FPV_Egnyte.ruleset_fingerprint(refresh=True) != fingerprint
+
+    monkeypatch.undo()
+    assert FPV_Egnyte.ruleset_fingerprint(refresh=True) == fingerprint
+
+    class Reordered(FPV_Egnyte):
+        def processing_methods(self):
+            methods = super().processing_methods()
+            return {part_type: list(reversed(rules)) for part_type, rules in methods.items()}
+
+    class Bumped(FPV_Egnyte):
+        ruleset_version = 2
+
+    assert Reordered.rule_names()["file"][0] == "process_path_length"
+    Renamed = type("FPV_Egnyte", (FPV_Egnyte,), {})
+    assert Renamed.ruleset_fingerprint() == fingerprint
+    assert type("FPV_Egnyte", (Reordered,), {}).ruleset_fingerprint() != fingerprint
+    assert type("FPV_Egnyte", (Bumped,), {}).ruleset_fingerprint() != fingerprint
+
+
+def test_rename_and_insert_match_full_validation():
+    import json
+    import random
+    from FPV.Helpers.corpus import SERVICES, PathCorpus
+
+    def keys(issues):
+        return sorted(json.dumps(issue, sort_keys=True) for issue in issues)
+
+    rng = random.Random(1)
+    for cls in SERVICES.values():
+        corpus = PathCorpus(cls, seed=2, violation_rate=0.5, long_part_rate=0.2, fit_length=False)
+        for path in corpus.paths(40):
+            validator = cls(path, auto_validate=False, file_added=True)
+            validator.validate(raise_error=False)
+            parts = [part["part"] for part in validator._path_helper.parts]
+            if len(parts) < 2:
+                continue
+            index = rng.randrange(len(parts) - 1)
+            donor = next(corpus.paths(1)).split(corpus.sep)[0]
+            if rng.random() < 0.5:
+                validator.rename_part(index, donor)
+                parts[index] = donor
+            else:
+                validator.insert_part(index, donor)
+                parts.insert(index, donor)
+
+            fresh = cls(corpus.sep.join(parts), auto_validate=False, file_added=True)
+            assert keys(validator.get_logs()["issues"]) == keys(fresh.validate(raise_error=False)), parts
+            assert validator._path_helper.path_length == fresh._path_helper.path_length
+            assert [part["index"] for part in validator._path_helper.parts] == list(range(len(parts)))
+
+
+def test_rename_reads_the_rules_once(monkeypatch):
+    from FPV import FPV_Egnyte
+
+    validator = FPV_Egnyte("/".join(f"p{i}" for i in range(300)), relative=True)
+    calls = []
+    original = FPV_Egnyte.rule_names.__func__
+    monkeypatch.setattr(FPV_Egnyte, "rule_names", classmethod(lambda cls: calls.append(1) or original(cls)))
+    validator.rename_part(5, "x5")
+    assert len(calls) == 1
+
+
+def test_insert_part_bounds():
+    from FPV import FPV_Windows
+
+    validator = FPV_Windows("C:\\Users\\file.txt", relative=False, file_added=True, auto_validate=False)
+    with pytest.raises(ValueError):
+        validator.insert_part(0, "x")
+    with pytest.raises(ValueError):
+        validator.insert_part(3, "x")
+    with pytest.raises(IndexError):
+        validator.rename_part(5, "x")
+
+
+def test_issue_category_bits_follow_the_category_codes():
+    from FPV import IssueCategory
+    from FPV.Helpers._categories import CATEGORIES, CUSTOM_CATEGORY_BIT, categories_to_mask
+
+    assert [member.name for member in IssueCategory][:len(CATEGORIES)] == list(CATEGORIES)
+    for name in CATEGORIES:
+        assert IssueCategory[name] == categories_to_mask([name])
+    assert IssueCategory.CUSTOM == CUSTOM_CATEGORY_BIT
+
+
+def test_issue_mask_per_path_and_part():
+    from FPV import FPV_Windows, IssueCategory
+
+    validator = FPV_Windows("a<b\\CON\\" + "x" * 250 + " .txt", auto_validate=False, file_added=True)
+    mask, part_masks = validator.issue_mask(per_part=True)
+    assert mask == IssueCategory.from_issues(validator.get_logs()["issues"])
+    assert part_masks == [IssueCategory.INVALID_CHAR, IssueCategory.RESTRICTED_NAME, IssueCategory.WHITESPACE]
+    assert mask == IssueCategory.PATH_LENGTH | part_masks[0] | part_masks[1] | part_masks[2]
+    assert FPV_Windows("a\\b.txt", auto_validate=False).issue_mask() == 0
+
+
+def test_issue_mask_puts_root_issues_on_the_first_part():
+    from FPV import FPV_Windows, IssueCategory
+
+    validator = FPV_Windows("bad\\x", relative=False, auto_validate=False)
+    assert validator.issue_mask(per_part=True) == (IssueCategory.ROOT_FORMAT, [IssueCategory.ROOT_FORMAT, 0])
@@ -0,0 +1,113 @@
+import pytest
+
+from FPV.Helpers import FPV_Windows
+from FPV.Helpers.batch import validate_batch
+from FPV.Helpers.corpus import PathCorpus
+from FPV.Helpers.verdict_cache import VerdictCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    with VerdictCache(str(tmp_path / "verdicts.db")) as cache:
+        yield cache
+
+
+def _paths(count=200, service="windows"):
+    return list(PathCorpus(service, seed=11, violation_rate=0.3).paths(count))
+
+
+def test_batch_matches_direct_validation():
+    paths = _paths()
+    for result in validate_batch("windows", paths, file_added=True, clean=True):
+        issues = FPV_Windows(result.path, auto_validate=False, file_added=True).validate(raise_error=False)
+        assert result.is_valid == (not issues)
+        assert set(result.categories) == {issue["category"] for issue in issues}
+        assert result.cleaned_path == FPV_Windows(result.path, auto_validate=False, file_added=True).clean(raise_error=False)
+        assert not result.cached
+
+
+def test_second_pass_is_served_from_cache(cache):
+    paths = _paths()
+    first = list(validate_batch("windows", paths, cache=cache, file_added=True, chunk_size=64))
+    second = list(validate_batch("windows", paths, cache=cache, file_added=True, chunk_size=64))
+    assert [r.path for r in second] == paths
+    assert all(r.cached for r in second)
+    assert [(r.is_valid, r.issue_mask) for r in first] == [(r.is_valid, r.issue_mask) for r in second]
+    assert cache.hits == len(paths)
+    assert len(cache) == len(set(paths))
+
+
+def test_cached_invalid_paths_can_be_revalidated_for_details(cache):
+    paths = ["Proj<ects\\notes.txt", "Projects\\notes.txt"]
+    list(validate_batch("windows", paths, cache=cache))
+    invalid, valid = validate_batch("windows", paths, cache=cache, with_issues=True)
+    assert invalid.cached and invalid.issues[0]["category"] == "INVALID_CHAR"
+    assert valid.cached and valid.issues == []
+
+
+def test_cleaning_needs_a_cleaned_entry(cache):
+    paths = ["Proj<ects\\notes.txt"]
+    list(validate_batch("windows", paths, cache=cache))
+    result, = validate_batch("windows", paths, cache=cache, clean=True)
+    assert not result.cached and result.cleaned_path == "\\Projects\\notes.txt"
+    result, = validate_batch("windows", paths, cache=cache, clean=True)
+    assert result.cached and result.cleaned_path == "\\Projects\\notes.txt"
+
+
+def test_flags_and_rule_changes_use_separate_entries(cache, monkeypatch):
+    paths = ["Projects\\notes.txt"]
+    list(validate_batch("windows", paths, cache=cache, file_added=True))
+    assert not next(validate_batch("windows", paths, cache=cache, file_added=False)).cached
+
+    fingerprint = FPV_Windows.ruleset_fingerprint()
+    monkeypatch.setattr(FPV_Windows, "max_length", 10)
+    assert FPV_Windows.ruleset_fingerprint(refresh=True) != fingerprint
+    result = next(validate_batch("windows", paths, cache=cache, file_added=True))
+    assert not result.cached and "PATH_LENGTH" in result.categories
+    monkeypatch.undo()
+    FPV_Windows.ruleset_fingerprint(refresh=True)
+
+
+def test_evict_bounds_size_and_drops_stale_rulesets(cache, monkeypatch):
+    list(validate_batch("windows", _paths(300), cache=cache))
+    monkeypatch.setattr(FPV_Windows, "invalid_characters", "<>")
+    FPV_Windows.ruleset_fingerprint(refresh=True)
+    list(validate_batch("windows", _paths(50), cache=cache))
+    monkeypatch.undo()
+    FPV_Windows.ruleset_fingerprint(refresh=True)
+
+    total = len(cache)
+    removed = cache.evict()
+    assert removed == 50 and len(cache) == total - 50
+
+    cache.evict(max_entries=100)
+    assert len(cache) == 100
+    cache.compact()
+    assert cache.stats()["entries"] == 100
+
+
+def test_reads_only_refresh_last_seen_when_asked(tmp_path, monkeypatch):
+    import time
+
+    monkeypatch.setattr(time, "time", lambda: 1000.0)
+    for touch, expected in ((False, 1000), (True, 2000)):
+        with VerdictCache(str(tmp_path / f"touch{touch}.db"), touch_on_hit=touch) as cache:
+            ruleset = cache.ruleset_id(FPV_Windows, True, False)
+            cache.put_many(ruleset, [("a\\b", 0, None)])
+            monkeypatch.setattr(time, "time", lambda: 2000.0)
+            assert cache.get_many(ruleset, ["a\\b"]) == {"a\\b": (0, None)}
+            assert cache.conn.execute("SELECT last_seen FROM verdicts").fetchone()[0] == expected
+            plan = cache.conn.execute("EXPLAIN QUERY PLAN SELECT path_hash FROM verdicts ORDER BY last_seen").fetchall()
+            assert any("verdicts_last_seen" in row[-1] for row in plan)
+            monkeypatch.setattr(time, "time", lambda: 1000.0)
+
+
+def test_batch_engine_matches_reference(cache):
+    from FPV.Helpers.reference import run_differential
+
+    def batch_engine(cls, path, **kwargs):
+        list(validate_batch(cls, [path], cache=cache, clean=True, **kwargs))
+        result, = validate_batch(cls, [path], cache=cache, clean=True, with_issues=True, **kwargs)
+        return {"issues": result.issues, "cleaned_path": result.cleaned_path}
+
+    assert run_differential(batch_engine, count=40, seed=3) == []
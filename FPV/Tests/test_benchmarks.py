@@ -0,0 +1,28 @@
+from FPV.Helpers._base import FPV_Base
+from benchmarks.suite import SERVICES, compare, make_paths, run_suite
+
+
+def test_make_paths_is_deterministic_and_respects_invalid_ratio():
+    assert make_paths("egnyte", "deep", 0.1, 50, seed=3) == make_paths("egnyte", "deep", 0.1, 50, seed=3)
+
+    for service, cls in SERVICES.items():
+        valid_paths = make_paths(service, "short", 0.0, 20)
+        invalid_paths = make_paths(service, "short", 1.0, 20)
+        assert not any(cls(p, auto_validate=False, file_added=True).validate(raise_error=False) for p in valid_paths)
+        assert all(cls(p, auto_validate=False, file_added=True).validate(raise_error=False) for p in invalid_paths)
+
+
+def test_suite_runs_every_operation_and_reports_machine_readable_results():
+    results = run_suite(count=3, repeat=1, services=["windows", "egnyte"], shapes=["short"], ratios=[0.1])
+    operations = {case["operation"] for case in results}
+    assert operations == {"validate", "clean", "incremental", "from_state", "routes"}
+    for case in results:
+        assert "skipped" in case or (case["paths_per_sec"] > 0 and case["bytes_per_path"] > 0)
+    assert FPV_Base.rule_hook is None  # the route cases must not leave a hook on the other cases
+
+
+def test_compare_flags_throughput_drops():
+    baseline = [{"operation": "validate", "service": "box", "shape": "short", "invalid_ratio": 0.0, "paths_per_sec": 1000.0}]
+    current = [dict(baseline[0], paths_per_sec=700.0)]
+    assert compare(baseline, current, threshold=0.2)[0][3] < -0.2
+    assert compare(baseline, current, threshold=0.5) == []
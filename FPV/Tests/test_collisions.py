@@ -0,0 +1,119 @@
+import random
+
+from FPV.Helpers.collisions import (
+    CollisionDetector, clean_unique, find_collisions, manifest_collisions, tree_clean_unique, tree_collisions,
+)
+from FPV.Helpers.corpus import PathCorpus
+from FPV.Helpers.manifest import sort_key
+
+
+def _groups(groups):
+    return sorted((group.parent, group.key, tuple(sorted(group.names))) for group in groups)
+
+
+def _brute_force(service, paths):
+    """Every (parent, name) pair in memory at once, with the leaf of each path as a file."""
+    detector = CollisionDetector(service)
+    folders, files = set(), set()
+    for path in paths:
+        parts = path.strip("/").split("/")
+        folders.update(("/".join(parts[:depth]), parts[depth]) for depth in range(len(parts) - 1))
+        files.add(("/".join(parts[:-1]), parts[-1]))
+    entries = {}
+    for parent, name in folders | files:
+        entries.setdefault(parent, []).append((name, (parent, name) not in folders))
+    return _groups(group for parent, children in entries.items() for group in detector.group(parent, children))
+
+
+def test_case_and_cleaning_collisions():
+    paths = sorted(["/Docs/Report.docx", "/Docs/report.docx", "/docs/a.txt", "/Docs/a?b.txt", "/Docs/ab.txt",
+                    "/Other/Report.docx", "/Docs/sub", "/Docs/sub/x.txt"], key=lambda p: sort_key(p, "/"))
+    assert _groups(find_collisions("sharepoint", paths)) == [
+        ("", "docs", ("Docs", "docs")),
+        ("Docs", "ab.txt", ("a?b.txt", "ab.txt")),
+        ("Docs", "report.docx", ("Report.docx", "report.docx")),
+    ]
+    # Linux is case-sensitive and keeps "?", so nothing collides there.
+    assert list(find_collisions("linux", paths)) == []
+
+
+def test_streaming_matches_brute_force():
+    rng = random.Random(5)
+    paths = list(dict.fromkeys(PathCorpus("windows", seed=5, depth=(1, 4), fanout=4, violation_rate=0.3).paths(300)))
+    # Re-case some paths so case-only collisions show up at every depth.
+    paths += ["/".join(part.upper() if rng.random() < 0.3 else part for part in path.split("/")) for path in paths[:100]]
+    ordered = sorted(set(paths), key=lambda p: sort_key(p, "/"))
+
+    expected = _brute_force("windows", ordered)
+    assert expected
+    assert _groups(find_collisions("windows", ordered)) == expected
+
+
+def test_manifest_is_sorted_before_scanning(tmp_path):
+    paths = ["b/File.txt", "a/x.txt", "b/file.txt", "a/X.TXT", "a/x.txt"]
+    (tmp_path / "m.txt").write_text("\n".join(paths) + "\n", encoding="utf-8")
+    assert _groups(manifest_collisions("box", str(tmp_path / "m.txt"))) == [
+        ("a", "x.txt", ("X.TXT", "x.txt")),
+        ("b", "file.txt", ("File.txt", "file.txt")),
+    ]
+
+
+def test_tree_collisions(tmp_path):
+    (tmp_path / "Reports").mkdir()
+    (tmp_path / "reports").mkdir()
+    (tmp_path / "Reports" / "q1 .txt").write_text("")
+    (tmp_path / "Reports" / "q1.txt").write_text("")
+    assert _groups(tree_collisions("windows", str(tmp_path))) == [
+        ("", "reports", ("Reports", "reports")),
+        ("Reports", "q1.txt", ("q1 .txt", "q1.txt")),
+    ]
+    assert list(tree_collisions("windows", str(tmp_path), case_insensitive=False, clean=False)) == []
+
+
+def test_clean_unique_suffixes_and_renamed_folders():
+    paths = sorted(["Docs/Report.docx", "Docs/report.docx", "Docs/report (1).docx", "Docs/a?b.txt", "Docs/ab.txt",
+                    "docs/a.txt"], key=lambda p: sort_key(p, "/"))
+    assert dict(clean_unique("windows", paths)) == {
+        "Docs/Report.docx": "Docs/Report.docx",
+        "Docs/report (1).docx": "Docs/report (1).docx",
+        "Docs/report.docx": "Docs/report (2).docx",
+        "Docs/a?b.txt": "Docs/ab.txt",
+        "Docs/ab.txt": "Docs/ab (1).txt",
+        "docs/a.txt": "docs (1)/a.txt",
+    }
+
+
+def test_clean_unique_respects_length_limits():
+    long_names = ["Docs/" + "L" * 300 + ".txt", "Docs/" + "L" * 300 + "x.txt"]
+    windows = [cleaned for _, cleaned in clean_unique("windows", long_names)]
+    assert len(set(windows)) == 2 and all(len(path) <= 255 for path in windows)
+    assert windows[1].endswith(" (1)")
+
+    egnyte = [cleaned for _, cleaned in clean_unique("egnyte", long_names)]
+    assert len(set(egnyte)) == 2 and all(len(path.split("/")[-1]) <= 245 for path in egnyte)
+
+
+def test_clean_unique_gives_unique_valid_siblings():
+    rng = random.Random(9)
+    paths = list(PathCorpus("sharepoint", seed=9, depth=(1, 4), fanout=3, violation_rate=0.4).paths(300))
+    paths += ["/".join(part.upper() if rng.random() < 0.5 else part for part in path.split("/")) for path in paths]
+    ordered = sorted(set(paths), key=lambda p: sort_key(p, "/"))
+
+    mapping = dict(clean_unique("sharepoint", ordered))
+    placed = [cleaned for cleaned in mapping.values() if cleaned is not None]
+    assert len({cleaned.casefold() for cleaned in placed}) == len(placed)
+    assert list(find_collisions("sharepoint", sorted(placed, key=lambda p: sort_key(p, "/")))) == []
+    assert dict(clean_unique("sharepoint", ordered)) == mapping
+
+
+def test_tree_and_manifest_get_the_same_names(tmp_path):
+    names = ["Reports/q1 .txt", "Reports/q1.txt", "reports/Q1.TXT", "reports/sub/a?.txt", "reports/sub/a.txt"]
+    for name in names:
+        (tmp_path / name).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / name).write_text("")
+    ordered = sorted(names, key=lambda p: sort_key(p, "/"))
+    from_manifest = dict(clean_unique("windows", ordered))
+    from_tree = dict(tree_clean_unique("windows", str(tmp_path)))
+    assert {path: from_tree[path] for path in names} == from_manifest
+    assert from_tree["reports"] == "reports (1)"
+    assert from_manifest["reports/sub/a?.txt"] == "reports (1)/sub/a (1).txt"
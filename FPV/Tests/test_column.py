@@ -0,0 +1,60 @@
+import pytest
+
+from FPV.Helpers.batch import validate_batch
+from FPV.Helpers.column import validate_column
+from FPV.Helpers.corpus import PathCorpus
+
+
+def _paths(count=200):
+    return list(PathCorpus("box", seed=4, violation_rate=0.4).paths(count))
+
+
+def test_columns_match_the_batch_engine():
+    paths = _paths()
+    result = validate_column("box", paths, clean=True, file_added=True)
+    expected = list(validate_batch("box", paths, clean=True, file_added=True))
+    assert list(result.is_valid) == [r.is_valid for r in expected]
+    assert list(result.issue_mask) == [r.issue_mask for r in expected]
+    assert list(result.cleaned_path) == [r.cleaned_path for r in expected]
+    assert validate_column("box", paths).cleaned_path is None
+
+
+def test_empty_column():
+    result = validate_column("box", [])
+    assert len(result.is_valid) == len(result.issue_mask) == 0
+
+
+def test_missing_values_are_rejected():
+    with pytest.raises(ValueError, match="Row 1"):
+        validate_column("box", ["a/b.txt", None])
+
+
+def test_bytes_rows_are_not_cached():
+    from FPV.Helpers.verdict_cache import VerdictCache
+
+    rows = [b"/srv/a.txt", b"/srv/b|c.txt"]
+    assert list(validate_column("linux", rows, file_added=True).is_valid) == [True, True]
+    with VerdictCache() as cache, pytest.raises(ValueError, match="bytes"):
+        validate_column("linux", rows, file_added=True, cache=cache)
+
+
+def test_numpy_columns():
+    np = pytest.importorskip("numpy")
+    paths = _paths()
+    for column in (np.array(paths), np.array(paths, dtype=object)):
+        result = validate_column("box", column, clean=True)
+        assert result.is_valid.dtype == np.bool_ and result.issue_mask.dtype == np.int64
+        assert (result.is_valid == (result.issue_mask == 0)).all()
+        assert list(result.issue_mask) == [r.issue_mask for r in validate_batch("box", paths)]
+        assert result.cleaned_path.dtype == object
+        result.is_valid[0] = not result.is_valid[0]
+        result.issue_mask[0] = 0
+
+
+def test_pandas_series_keep_their_index():
+    pd = pytest.importorskip("pandas")
+    paths = _paths(20)
+    column = pd.Series(paths, index=range(100, 120))
+    result = validate_column("box", column, clean=True)
+    assert list(result.is_valid.index) == list(column.index)
+    assert (column[~result.is_valid] == [r.path for r in validate_batch("box", paths) if not r.is_valid]).all()
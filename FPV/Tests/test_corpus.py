@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+from FPV.Helpers.corpus import SERVICES, PathCorpus, supported_categories
+
+
+def _categories(cls, path):
+    issues = cls(path, auto_validate=False, file_added=True).validate(raise_error=False)
+    return {issue["category"] for issue in issues}
+
+
+def test_same_seed_gives_the_same_stream():
+    first = list(PathCorpus("egnyte", seed=5, violation_rate=0.2).generate(200))
+    second = list(PathCorpus("egnyte", seed=5, violation_rate=0.2).generate(200))
+    assert first == second
+    assert first != list(PathCorpus("egnyte", seed=6, violation_rate=0.2).generate(200))
+
+
+@pytest.mark.parametrize("service", list(SERVICES))
+def test_paths_without_violations_are_valid(service):
+    cls = SERVICES[service]
+    corpus = PathCorpus(service, seed=1, depth=(0, 30), unicode_rate=0.3, long_part_rate=0.2)
+    for path in corpus.paths(300):
+        assert _categories(cls, path) == set(), path
+
+
+@pytest.mark.parametrize("service", list(SERVICES))
+def test_every_supported_category_is_reported_where_injected(service):
+    cls = SERVICES[service]
+    for category in supported_categories(cls):
+        corpus = PathCorpus(service, seed=2, depth=(0, 10), violation_rate=1.0, categories=[category])
+        for item in corpus.generate(50):
+            assert item.category == category
+            assert category in _categories(cls, item.path), item.path
+
+
+def test_supported_categories_follow_the_service_rules():
+    assert set(supported_categories(SERVICES["egnyte"])) >= {"SUFFIX", "PREFIX", "TEMP_PATTERN"}
+    assert "LEADING_PERIOD" in supported_categories(SERVICES["macos"])
+    assert "RESTRICTED_PREFIX" in supported_categories(SERVICES["sharepoint"])
+    with pytest.raises(ValueError):
+        PathCorpus("windows", categories=["SUFFIX"])
+
+
+def test_folder_names_repeat_across_paths():
+    paths = list(PathCorpus("linux", seed=3, depth=3, fanout=4).paths(200))
+    first_folders = {path.split("/")[0] for path in paths}
+    assert len(first_folders) <= 4
+
+
+def test_violation_rate_and_depth_are_honoured():
+    items = list(PathCorpus("windows", seed=4, depth=(3, 3), long_part_rate=0.0, violation_rate=0.25, categories=["WHITESPACE"]).generate(2000))
+    share = sum(item.category is not None for item in items) / len(items)
+    assert 0.2 < share < 0.3
+    assert all(item.path.count("\\") == 3 for item in items)
+
+
+def test_materialize_writes_the_tree(tmp_path):
+    result = PathCorpus("linux", seed=8, depth=(1, 4)).materialize(str(tmp_path), 50)
+    assert result["skipped"] == 0
+    files = [os.path.join(root, name) for root, _, names in os.walk(tmp_path) for name in names]
+    assert 0 < len(files) <= 50
+    assert result["files"] == 50
@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from FPV.Helpers.corpus import SERVICES
+from FPV.Helpers.adaptive import AdaptiveRuleOrder
+from FPV.Helpers.prescreen import numpy_available
+from FPV.Helpers.reference import (bytes_engine, default_engine, diff_engines, is_valid_engine, prescreen_engine,
+                                   reference_engine, run_differential)
+
+# Set FPV_DIFF_SEED / FPV_DIFF_COUNT to explore further, e.g. in a nightly job.
+SEED = int(os.environ.get("FPV_DIFF_SEED", "0"))
+COUNT = int(os.environ.get("FPV_DIFF_COUNT", "150"))
+
+
+@pytest.mark.parametrize("service", list(SERVICES))
+def test_default_engine_matches_reference(service):
+    mismatches = run_differential(default_engine, services=[service], count=COUNT, seed=SEED,
+                                  depth=(0, 12), long_part_rate=0.05, violation_rate=0.5)
+    assert not mismatches, mismatches[0]
+
+
+FAST_ENGINES = {
+    "is_valid": lambda: is_valid_engine(),
+    "is_valid_adaptive": lambda: is_valid_engine(AdaptiveRuleOrder(reorder_every=25)),
+    "prescreen": lambda: prescreen_engine(use_numpy=False),
+    "prescreen_numpy": lambda: prescreen_engine(use_numpy=True),
+}
+
+
+@pytest.mark.parametrize("name", list(FAST_ENGINES))
+def test_fast_paths_match_reference(name):
+    if name.endswith("numpy") and not numpy_available():
+        pytest.skip("numpy is not installed")
+    mismatches = run_differential(FAST_ENGINES[name](), count=COUNT, seed=SEED,
+                                  depth=(0, 12), long_part_rate=0.05, violation_rate=0.5)
+    assert not mismatches, mismatches[0]
+
+
+def test_bytes_paths_match_reference():
+    mismatches = run_differential(bytes_engine, services=["linux", "macos"], count=COUNT, seed=SEED,
+                                  depth=(0, 12), unicode_rate=0.3, violation_rate=0.5)
+    assert not mismatches, mismatches[0]
+
+
+def test_harness_reports_a_diverging_engine():
+    def lossy_engine(cls, path, **kwargs):
+        result = default_engine(cls, path, **kwargs)
+        result["issues"] = result["issues"][1:]
+        result["cleaned_path"] = result["cleaned_path"].upper()
+        return result
+
+    differences = diff_engines("windows", "Proj<ects\\CON\\notes.txt", lossy_engine, file_added=True)
+    assert any(line.startswith("issues:") for line in differences)
+    assert any(line.startswith("cleaned_path:") for line in differences)
+
+    assert diff_engines("windows", "a<b.txt", lambda cls, path, **kwargs: {"is_valid": True})
+    assert diff_engines("windows", "a<b.txt", lambda cls, path, **kwargs: {"issue_mask": 0, "mask_scope": 1 << 0})
+
+
+def test_reference_engine_result_shape():
+    result = reference_engine(SERVICES["egnyte"], "Clients/.~lock/report.tmp", file_added=True)
+    assert {issue["category"] for issue in result["issues"]} == {"PREFIX", "SUFFIX"}
+    assert result["cleaned_path"] == "/Clients/lock"
+    assert result["cleaned_issues"] == []
+
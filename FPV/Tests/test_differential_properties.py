@@ -0,0 +1,20 @@
+import pytest
+
+pytest.importorskip("hypothesis")
+
+from hypothesis import given, settings, strategies as st
+
+from FPV.Helpers.corpus import SERVICES
+from FPV.Helpers.reference import default_engine, diff_engines
+
+PART_CHARS = st.characters(blacklist_categories=("Cs",), blacklist_characters="/\\")
+
+
+@settings(max_examples=200, deadline=None)
+@given(
+    service=st.sampled_from(list(SERVICES)),
+    parts=st.lists(st.text(PART_CHARS, max_size=12), min_size=1, max_size=6),
+)
+def test_property_default_engine_matches_reference(service, parts):
+    sep = "\\" if service == "windows" else "/"
+    assert diff_engines(service, sep.join(parts), default_engine, file_added=True) == []
@@ -74,3 +74,13 @@ def test_process_part_length_clean():
     pending_actions = egnyte._path_helper.get_pending_actions_for_part(part["index"])
     action_categories = [action["category"] for action in pending_actions]
     assert "PART_LENGTH" in action_categories
+
+
+def test_clean_returns_the_path_and_keeps_accepted_parts():
+    egnyte = FPV_Egnyte("Clients/notes.txt", file_added=True, auto_validate=False)
+    assert egnyte.clean(raise_error=False) == "/Clients/notes.txt"
+
+    egnyte = FPV_Egnyte("Clients/.~lock/" + "a" * 300 + ".txt", file_added=True, auto_validate=False)
+    cleaned = egnyte.clean(raise_error=False)
+    assert cleaned == egnyte.get_full_path() and cleaned.startswith("/Clients/lock/aaa")
+    assert len(cleaned.rsplit("/", 1)[1]) <= egnyte.part_length
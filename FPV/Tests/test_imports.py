@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from benchmarks.imports import IMPORT_BUDGETS_MS, check_budgets, loaded_modules
+
+# Wall-clock budgets are flaky on busy machines, so they only run with FPV_IMPORT_BUDGETS=1
+# (or through `python -m benchmarks --imports`). Slow machines can scale them, e.g. FPV_IMPORT_BUDGET_SCALE=3.
+CHECK_BUDGETS = os.environ.get("FPV_IMPORT_BUDGETS") == "1"
+BUDGET_SCALE = float(os.environ.get("FPV_IMPORT_BUDGET_SCALE", "1"))
+
+
+def test_importing_the_package_loads_no_service_module():
+    assert loaded_modules("import FPV") == {"FPV", "FPV.Helpers"}
+
+
+def test_only_the_requested_service_module_is_loaded():
+    modules = loaded_modules("from FPV import FPV_Egnyte")
+    assert "FPV.Helpers.egnyte" in modules
+    assert not modules & {"FPV.Helpers.os_classes", "FPV.Helpers.dropbox", "FPV.Helpers.box", "FPV.Helpers._state_token"}
+
+
+def test_api_module_does_not_import_quart():
+    modules = loaded_modules("import FPV.API.api")
+    assert not any(name.startswith("quart") for name in modules)
+    assert "FPV.API.routes.path.dynamic" not in modules
+
+
+def test_lazy_attributes_resolve():
+    import FPV
+    from FPV.Helpers import FPV_Box, Path
+    assert FPV.FPV_Box is FPV_Box
+    assert "FPV_SharePoint" in dir(FPV)
+    assert Path.__name__ == "Path"
+
+
+@pytest.mark.skipif(not CHECK_BUDGETS, reason="set FPV_IMPORT_BUDGETS=1 to check import-time budgets")
+def test_import_time_budgets():
+    budgets = {statement: budget * BUDGET_SCALE for statement, budget in IMPORT_BUDGETS_MS.items()}
+    assert check_budgets(budgets, repeat=3) == []
@@ -0,0 +1,57 @@
+import io
+from FPV.Helpers._base import FPV_Base
+from FPV.Helpers.egnyte import FPV_Egnyte
+from FPV.Helpers.os_classes import FPV_Windows
+from FPV.Helpers.instrumentation import RuleProfiler, CompositeHook, profile_rules
+
+
+def test_profiler_records_every_rule_with_part_type_and_hits():
+    profiler = RuleProfiler()
+    FPV_Windows("C:\\Users\\bad|name\\file.txt", relative=False, file_added=True, auto_validate=False, rule_hook=profiler).validate(raise_error=False)
+
+    stats = {(s.rule, s.part_type): s for s in profiler.stats.values()}
+    assert stats[("process_root_folder_format", "root")].calls == 1
+    assert stats[("process_invalid_characters", "folder")].calls == 2
+    assert stats[("process_invalid_characters", "folder")].produced == 1
+    assert stats[("process_invalid_characters", "file")].produced == 0
+    assert all(s.service == "FPV_Windows" and s.action == "validate" for s in profiler.stats.values())
+
+
+def test_clean_loop_records_actions_as_produced():
+    profiler = RuleProfiler()
+    validator = FPV_Windows("a<b\\c", auto_validate=False, rule_hook=profiler)
+    validator.clean(validate_after_clean=False)
+
+    produced = {s.rule for s in profiler.stats.values() if s.action == "clean" and s.produced}
+    assert produced == {"process_invalid_characters"}
+
+
+def test_single_part_paths_are_instrumented():
+    profiler = RuleProfiler()
+    validator = FPV_Egnyte("folder", auto_validate=False, rule_hook=profiler)
+    validator.add_part("atmp1234")
+    assert profiler.top(1, by="produced")[0].rule == "process_temp_patterns"
+
+    validator = FPV_Windows("folder", auto_validate=False, rule_hook=profiler)
+    validator.add_part("notes.txt", is_file=True, mode="clean")
+    assert {s.action for s in profiler.stats.values()} == {"validate", "clean"}
+
+
+def test_profile_rules_installs_and_restores_global_hook():
+    assert FPV_Base.rule_hook is None
+    with profile_rules() as profiler:
+        FPV_Egnyte("folder/file.tmp", auto_validate=False).validate(raise_error=False)
+    assert FPV_Base.rule_hook is None
+    assert profiler.stats
+
+    out = io.StringIO()
+    profiler.print_top(3, file=out)
+    lines = out.getvalue().splitlines()
+    assert lines[0].startswith("service")
+    assert len(lines) == 4
+
+
+def test_composite_hook_forwards_to_all_hooks():
+    first, second = RuleProfiler(), RuleProfiler()
+    FPV_Egnyte("folder", rule_hook=CompositeHook(first, second))
+    assert first.stats.keys() == second.stats.keys() != set()
@@ -0,0 +1,122 @@
+import pytest
+
+from FPV.Helpers import FPV_Egnyte
+from FPV.Helpers.corpus import PathCorpus
+from FPV.Helpers import manifest as manifest_module
+from FPV.Helpers.manifest import (
+    MmapManifest, delta_validate, read_records, read_results, scan_manifest, sort_key, sort_manifest,
+)
+
+
+def _write(filename, paths, delimiter="\n"):
+    with open(filename, "w", encoding="utf-8", newline="") as f:
+        f.write("".join(path + delimiter for path in paths))
+
+
+def _results(filename, delimiter="\n"):
+    return dict(read_results(str(filename), delimiter)[1])
+
+
+@pytest.fixture
+def paths():
+    return list(dict.fromkeys(PathCorpus("egnyte", seed=21, depth=(1, 5), violation_rate=0.2).paths(400)))
+
+
+def test_external_sort_matches_in_memory_sort(tmp_path, paths):
+    _write(tmp_path / "in.txt", paths + paths[:50])
+    count = sort_manifest(str(tmp_path / "in.txt"), str(tmp_path / "out.txt"), max_records=37)
+    assert count == len(paths)
+    assert list(read_records(str(tmp_path / "out.txt"))) == sorted(paths, key=lambda p: sort_key(p, "/"))
+
+
+def test_tree_order_puts_folders_before_their_contents():
+    ordered = sorted(["a b/x", "a/b/c", "a/b", "a-b"], key=lambda p: sort_key(p, "/"))
+    assert ordered == ["a/b", "a/b/c", "a b/x", "a-b"]
+
+
+def test_delta_carries_unchanged_verdicts_and_validates_the_rest(tmp_path, paths):
+    _write(tmp_path / "day1.txt", paths)
+    first = delta_validate("egnyte", None, str(tmp_path / "day1.txt"), str(tmp_path / "day1.results"))
+    assert first.full_rescan and first.validated == len(paths) and first.carried == 0
+
+    renamed = [p.replace(paths[0].split("/")[0] + "/", "Renamed/", 1) for p in paths[:100]]
+    added = ["Clients/new<file.txt", "Clients/plan.docx"]
+    today = renamed + paths[100:350] + added
+    _write(tmp_path / "day2.txt", today)
+    second = delta_validate("egnyte", str(tmp_path / "day1.results"), str(tmp_path / "day2.txt"), str(tmp_path / "day2.results"))
+
+    unchanged = len(set(today) & set(paths))
+    assert not second.full_rescan
+    assert second.carried == unchanged
+    assert second.validated == len(set(today)) - unchanged
+    assert second.removed == len(set(paths) - set(today))
+
+    results = _results(tmp_path / "day2.results")
+    assert set(results) == set(today)
+    for path, mask in results.items():
+        assert bool(mask) == bool(FPV_Egnyte(path, auto_validate=False, file_added=True).validate(raise_error=False))
+    assert results["Clients/new<file.txt"] != 0 and results["Clients/plan.docx"] == 0
+    assert second.invalid == sum(1 for mask in results.values() if mask)
+
+
+def test_changed_ruleset_or_flags_force_a_full_rescan(tmp_path, paths, monkeypatch):
+    _write(tmp_path / "m.txt", paths)
+    delta_validate("egnyte", None, str(tmp_path / "m.txt"), str(tmp_path / "r1"))
+    assert delta_validate("egnyte", str(tmp_path / "r1"), str(tmp_path / "m.txt"), str(tmp_path / "r2")).carried == len(paths)
+    assert delta_validate("egnyte", str(tmp_path / "r1"), str(tmp_path / "m.txt"), str(tmp_path / "r3"), file_added=False).full_rescan
+
+    monkeypatch.setattr(FPV_Egnyte, "part_length", 100)
+    FPV_Egnyte.ruleset_fingerprint(refresh=True)
+    try:
+        stats = delta_validate("egnyte", str(tmp_path / "r1"), str(tmp_path / "m.txt"), str(tmp_path / "r4"))
+        assert stats.full_rescan and stats.validated == len(paths)
+    finally:
+        monkeypatch.undo()
+        FPV_Egnyte.ruleset_fingerprint(refresh=True)
+
+
+def test_nul_delimited_manifests(tmp_path):
+    paths = ["Team/line\nbreak.txt", "Team/notes.txt", "Team/bad|name.txt"]
+    _write(tmp_path / "m.bin", paths, delimiter="\0")
+    stats = delta_validate("egnyte", None, str(tmp_path / "m.bin"), str(tmp_path / "r.bin"), delimiter="\0")
+    assert stats.validated == 3
+    results = _results(tmp_path / "r.bin", delimiter="\0")
+    assert results["Team/notes.txt"] == 0 and results["Team/bad|name.txt"] != 0
+
+
+@pytest.mark.parametrize("delimiter", ["\n", "\0"])
+def test_mmap_ranges_cover_every_record_exactly_once(tmp_path, paths, monkeypatch, delimiter):
+    monkeypatch.setattr(manifest_module, "BLOCK_SIZE", 97)
+    _write(tmp_path / "m", paths, delimiter=delimiter)
+    with MmapManifest(str(tmp_path / "m"), delimiter) as manifest:
+        assert list(manifest) == paths
+        for count in (1, 2, 7, 64):
+            ranges = manifest.byte_ranges(count)
+            assert ranges[0][0] == 0 and ranges[-1][1] == manifest.size
+            assert [path for start, end in ranges for path in manifest.records(start, end)] == paths
+        # Arbitrary offsets: a record belongs to the range its first byte falls in.
+        offsets = [0, 13, 500, 501, 2048, manifest.size]
+        pieces = [path for start, end in zip(offsets, offsets[1:]) for path in manifest.records(start, end)]
+        assert pieces == paths
+
+
+def test_mmap_keeps_undecodable_bytes_and_handles_empty_files(tmp_path):
+    (tmp_path / "empty").write_bytes(b"")
+    with MmapManifest(str(tmp_path / "empty")) as manifest:
+        assert list(manifest) == [] and manifest.byte_ranges(4) == []
+
+    (tmp_path / "latin1").write_bytes(b"caf\xe9/menu.txt\n\nplain.txt")
+    with MmapManifest(str(tmp_path / "latin1")) as manifest:
+        assert list(manifest.raw_records()) == [b"caf\xe9/menu.txt", b"plain.txt"]
+        assert list(manifest)[0].encode("utf-8", "surrogateescape") == b"caf\xe9/menu.txt"
+        records = [manifest.record_at(position) for position in range(manifest.size)]
+        assert records == [b"caf\xe9/menu.txt"] * 14 + [b""] + [b"plain.txt"] * 9
+
+
+def test_scan_manifest_in_parallel_matches_a_single_process(tmp_path, paths):
+    _write(tmp_path / "m.txt", paths)
+    total, invalid = scan_manifest("egnyte", str(tmp_path / "m.txt"), workers=1)
+    assert total == len(paths)
+    expected = [p for p in paths if FPV_Egnyte(p, auto_validate=False, file_added=True).validate(raise_error=False)]
+    assert [path for path, _ in invalid] == expected
+    assert scan_manifest("egnyte", str(tmp_path / "m.txt"), workers=3) == (total, invalid)
@@ -0,0 +1,54 @@
+from FPV.API.metrics import MetricsRegistry, RuleMetricsHook
+from FPV.Helpers.egnyte import FPV_Egnyte
+
+
+def test_counter_and_histogram_render_text_format():
+    registry = MetricsRegistry()
+    requests = registry.counter("requests_total", "Requests.", ("route",))
+    latency = registry.histogram("latency_seconds", "Latency.", ("route",), buckets=(0.1, 1.0))
+
+    requests.inc(route="/api/v1/isValid")
+    requests.inc(route="/api/v1/isValid")
+    latency.observe(0.1, route="/api/v1/isValid")
+    latency.observe(5, route="/api/v1/isValid")
+
+    text = registry.render()
+    assert "# TYPE requests_total counter" in text
+    assert 'requests_total{route="/api/v1/isValid"} 2' in text
+    assert 'latency_seconds_bucket{route="/api/v1/isValid",le="0.1"} 1' in text
+    assert 'latency_seconds_bucket{route="/api/v1/isValid",le="+Inf"} 2' in text
+    assert 'latency_seconds_count{route="/api/v1/isValid"} 2' in text
+
+
+def test_label_values_are_escaped():
+    registry = MetricsRegistry()
+    counter = registry.counter("things_total", "Things.", ("name",))
+    counter.inc(name='a"b\\c')
+    assert 'things_total{name="a\\"b\\\\c"} 1' in registry.render()
+
+
+def test_rule_hook_attributes_time_to_process_methods():
+    registry = MetricsRegistry()
+    seconds = registry.counter("rule_seconds_total", "Rule time.", ("service", "rule", "action"))
+    calls = registry.counter("rule_calls_total", "Rule calls.", ("service", "rule", "action", "produced"))
+
+    validator = FPV_Egnyte("folder/atmp1234", auto_validate=False)
+    validator.rule_hook = RuleMetricsHook(seconds, calls)
+    validator.validate(raise_error=False)
+
+    assert calls.value(service="FPV_Egnyte", rule="process_temp_patterns", action="validate", produced="true") == 1
+    assert calls.value(service="FPV_Egnyte", rule="process_temp_patterns", action="validate", produced="false") == 1
+    assert seconds.value(service="FPV_Egnyte", rule="process_invalid_characters", action="validate") > 0
+
+
+def test_verdict_cache_lookups_are_counted():
+    from FPV.API import metrics
+    from FPV.Helpers.verdict_cache import VerdictCache
+
+    hits, misses = (metrics.cache_lookups.value(cache="verdict", result=result) for result in ("hit", "miss"))
+    with VerdictCache() as cache:
+        ruleset = cache.ruleset_id(FPV_Egnyte, True, False)
+        cache.put_many(ruleset, [("a/b", 0, None)])
+        cache.get_many(ruleset, ["a/b", "a/c", "a/d"])
+    assert metrics.cache_lookups.value(cache="verdict", result="hit") == hits + 1
+    assert metrics.cache_lookups.value(cache="verdict", result="miss") == misses + 2
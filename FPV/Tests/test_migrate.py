@@ -0,0 +1,61 @@
+import os
+
+from FPV.Helpers.migrate import apply_plan, plan_renames, rollback
+
+
+def _tree(root):
+    return sorted(os.path.relpath(os.path.join(dirpath, name), root)
+                  for dirpath, dirnames, filenames in os.walk(root) for name in dirnames + filenames)
+
+
+def _make(root, names):
+    for name in names:
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(name)
+
+
+NAMES = ["Reports/q1?.txt", "Reports/q1.txt", "Reports/sub /a|b.txt", "reports/Q1.TXT", "clean/ok.txt", "top*.txt"]
+
+
+def test_plan_is_deepest_first_and_keeps_clean_names(tmp_path):
+    _make(tmp_path, NAMES)
+    plan = plan_renames("windows", str(tmp_path))
+    renames = {rename.source: rename.target for rename in plan.renames}
+    assert renames == {
+        os.path.join("Reports", "q1?.txt"): os.path.join("Reports", "q1 (1).txt"),
+        os.path.join("Reports", "sub "): os.path.join("Reports", "sub"),
+        os.path.join("Reports", "sub ", "a|b.txt"): os.path.join("Reports", "sub ", "ab.txt"),
+        "reports": "reports (1)",
+        "top*.txt": "top.txt",
+    }
+    depths = [rename.depth for rename in plan.renames]
+    assert depths == sorted(depths, reverse=True)
+
+
+def test_apply_and_rollback(tmp_path):
+    root = tmp_path / "share"
+    _make(root, NAMES)
+    before = _tree(root)
+    plan = plan_renames("windows", str(root))
+
+    dry = apply_plan(plan, dry_run=True)
+    assert dry == {"renamed": len(plan.renames), "failed": []} and _tree(root) == before
+
+    journal = str(tmp_path / "journal")
+    result = apply_plan(plan, journal=journal, workers=2, batch_size=2)
+    assert result == {"renamed": len(plan.renames), "failed": []}
+    assert (root / "Reports" / "sub" / "ab.txt").read_text() == "Reports/sub /a|b.txt"
+    assert plan_renames("windows", str(root)).renames == []
+
+    assert rollback(journal) == {"restored": len(plan.renames), "failed": []}
+    assert _tree(root) == before
+
+
+def test_apply_never_overwrites(tmp_path):
+    _make(tmp_path, ["a?.txt"])
+    plan = plan_renames("windows", str(tmp_path))
+    (tmp_path / "a.txt").write_text("created after planning")
+    result = apply_plan(plan)
+    assert result["renamed"] == 0 and result["failed"][0][2] == "target already exists"
+    assert (tmp_path / "a.txt").read_text() == "created after planning"
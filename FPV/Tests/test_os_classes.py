@@ -29,3 +29,45 @@ def test_process_leading_periods():
 
     # Ensure no issues remain after cleaning
     assert len(issues_after_clean) == 0
+
+
+def _categories(cls, path):
+    return sorted(issue["category"] for issue in cls(path, auto_validate=False, file_added=True).validate(raise_error=False))
+
+
+def _reasons(cls, path):
+    validator = cls(path, auto_validate=False, file_added=True)
+    issues = validator.validate(raise_error=False)
+    validator.clean(raise_error=False)
+    return sorted(entry["reason"] for entry in issues + validator.get_logs()["actions"])
+
+
+def test_bytes_paths_match_str_paths():
+    import os
+    from FPV import FPV_Linux
+    from FPV.Helpers.corpus import PathCorpus
+
+    for cls in (FPV_Linux, FPV_MacOS):
+        for path in PathCorpus(cls, seed=3, violation_rate=0.5, unicode_rate=0.3).paths(200):
+            encoded = os.fsencode(path)
+            assert _categories(cls, encoded) == _categories(cls, path), path
+            assert _reasons(cls, encoded) == _reasons(cls, path), path
+            cleaned = cls(encoded, auto_validate=False, file_added=True).clean(raise_error=False)
+            assert os.fsdecode(cleaned) == cls(path, auto_validate=False, file_added=True).clean(raise_error=False)
+
+
+def test_bytes_paths_keep_undecodable_names():
+    from FPV import FPV_Linux
+
+    path = b"/srv/caf\xe9/ re\x00port .txt"
+    assert _categories(FPV_Linux, path) == ["INVALID_CHAR", "WHITESPACE"]
+    cleaned = FPV_Linux(path, auto_validate=False, file_added=True).clean(raise_error=False)
+    assert cleaned == b"/srv/caf\xe9/report.txt"
+
+
+def test_bytes_paths_rejected_by_other_services():
+    import pytest
+    from FPV import FPV_Windows
+
+    with pytest.raises(ValueError):
+        FPV_Windows(b"folder\\file.txt")
@@ -23,6 +23,13 @@ def test_remove_part():
     assert path.parts[1]["part"] == "file.txt"
 
 
+def test_remove_file_part_allows_new_parts():
+    path = Path(initial_path="folder1/file.txt", sep="/", relative=True, file_added=True)
+    path.remove_part(1)
+    path.add_part("folder2")
+    assert path.get_full_path() == "/folder1/folder2"
+
+
 def test_mark_part():
     path = Path(initial_path="folder1/folder2", sep="/", relative=True)
     path.mark_part(0, state="cleaned_status", status="complete")
@@ -58,6 +65,22 @@ def test_apply_actions():
     assert len(path.actions_queue) == 0
 
 
+def test_apply_actions_removes_parts_last_and_once():
+    path = Path(initial_path="a/b/c/d", sep="/", relative=True)
+
+    def action(subtype, index, priority, **details):
+        path.add_action({"type": "action", "category": "TEST", "subtype": subtype,
+                         "details": dict(details, index=index), "reason": "test"}, priority=priority)
+
+    action("REMOVE", 1, 0)
+    action("MODIFY", 3, 1, new_value="D")
+    action("REMOVE", 1, 2, part="b")  # the same part flagged by a second rule
+    action("REMOVE", 2, 3)
+    path.apply_actions()
+    assert [part["part"] for part in path.parts] == ["a", "D"]
+    assert path.actions_queue == []
+
+
 def test_add_issue():
     path = Path(initial_path="folder1", sep="/", relative=True)
     issue = {
@@ -0,0 +1,55 @@
+import pytest
+
+from FPV.Helpers.batch import validate_batch
+from FPV.Helpers.corpus import SERVICES, PathCorpus
+from FPV.Helpers.prescreen import INVALID_CHAR_BIT, PATH_LENGTH_BIT, numpy_available, screen, screened_characters
+
+SCREENED = INVALID_CHAR_BIT | PATH_LENGTH_BIT
+ENGINES = [False] + ([True] if numpy_available() else [])
+
+
+def _paths(service, count=300):
+    corpus = PathCorpus(service, seed=3, depth=(0, 8), violation_rate=0.4, long_part_rate=0.1)
+    return list(corpus.paths(count))
+
+
+@pytest.mark.parametrize("use_numpy", ENGINES)
+@pytest.mark.parametrize("file_added", [True, False])
+@pytest.mark.parametrize("service", list(SERVICES))
+def test_screen_matches_the_rules(service, file_added, use_numpy):
+    paths = _paths(service)
+    masks = screen(service, paths, file_added=file_added, use_numpy=use_numpy)
+    for path, mask, result in zip(paths, masks, validate_batch(service, paths, file_added=file_added)):
+        assert mask == result.issue_mask & SCREENED, path
+
+
+def test_dropbox_file_names_may_contain_periods():
+    paths = ["a/notes.txt", "a.b/notes.txt"]
+    assert screen("dropbox", paths, file_added=True) == [0, INVALID_CHAR_BIT]
+    assert screen("dropbox", paths) == [INVALID_CHAR_BIT, INVALID_CHAR_BIT]
+    folder_chars, file_chars = screened_characters("dropbox")
+    assert "." in folder_chars and "." not in file_chars and "/" not in folder_chars
+
+
+def test_unscreened_paths():
+    assert screen("windows", ["C:\\Projects"], relative=False) == [None]
+    assert screen("linux", [b"bytes/path", "text/path"]) == [None, 0]
+
+
+def test_numpy_and_python_screens_agree():
+    pytest.importorskip("numpy")
+    paths = _paths("egnyte", 500) + ["", "x\0", "x\0/y", "/lead/and/trail/", "", "\udcff<"]
+    for service in ("egnyte", "linux", "dropbox"):
+        for file_added in (True, False):
+            assert (screen(service, paths, file_added=file_added, use_numpy=True)
+                    == screen(service, paths, file_added=file_added, use_numpy=False))
+
+
+def test_batch_skips_the_rules_for_flagged_paths(monkeypatch):
+    paths = _paths("sharepoint")
+    full = list(validate_batch("sharepoint", paths, file_added=True))
+    fast = list(validate_batch("sharepoint", paths, file_added=True, prescreen=True))
+    assert [r.is_valid for r in fast] == [r.is_valid for r in full]
+    skipped = [r for r in fast if r.issues is None]
+    assert skipped and all(r.issue_mask and not r.issue_mask & ~SCREENED for r in skipped)
+    assert all(a == b for a, b in zip(fast, full) if a.issues is not None)
@@ -0,0 +1,68 @@
+import json
+import random
+from collections import Counter
+
+from FPV.Helpers.batch import validate_batch
+from FPV.Helpers.corpus import PathCorpus
+from FPV.Helpers.report import AggregateReport, _TopCounter, report_batch, report_manifest
+
+
+def _paths(service="windows", count=600):
+    return list(PathCorpus(service, seed=8, violation_rate=0.4).paths(count))
+
+
+def test_counts_match_the_batch_results():
+    paths = _paths()
+    report = report_batch("windows", paths, file_added=True)
+    results = list(validate_batch("windows", paths, file_added=True))
+    totals = report.to_dict()["services"]["FPV_Windows"]
+    assert totals["paths"] == len(paths) and sum(totals["lengths"]) == len(paths)
+    assert totals["invalid"] == sum(not r.is_valid for r in results)
+    assert totals["categories"] == dict(Counter(name for r in results for name in r.categories))
+    folders = Counter(r.path.strip("\\").split("\\")[0] if "\\" in r.path.strip("\\") else "" for r in results if not r.is_valid)
+    assert dict(report.top_folders()) == dict(folders)
+    assert report.top_characters() and all(char in '<>:"|?*' for char, _ in report.top_characters())
+
+
+def test_reports_count_every_category_even_with_prescreen():
+    paths = _paths("sharepoint")
+    full = report_batch("sharepoint", paths, file_added=True).to_dict()
+    assert set(full["services"]["FPV_SharePoint"]["categories"]) - {"PATH_LENGTH", "INVALID_CHAR"}
+    assert report_batch("sharepoint", paths, file_added=True, prescreen=True).to_dict() == full
+
+
+def test_merged_reports_equal_one_report():
+    paths = _paths()
+    whole = report_batch("windows", paths, file_added=True)
+    whole = report_batch("egnyte", _paths("egnyte", 200), report=whole)
+    merged = report_batch("windows", paths[:250], file_added=True)
+    merged.merge(report_batch("windows", paths[250:], file_added=True))
+    merged.merge(AggregateReport.from_dict(json.loads(json.dumps(report_batch("egnyte", _paths("egnyte", 200)).to_dict()))))
+    assert merged.to_dict() == whole.to_dict()
+
+
+def test_top_counter_stays_bounded():
+    rng = random.Random(1)
+    keys = [f"heavy{i}" for i in range(5)] * 400 + [f"light{rng.randrange(10 ** 6)}" for _ in range(3000)]
+    rng.shuffle(keys)
+    counter = _TopCounter(capacity=20)
+    for key in keys:
+        counter.add(key)
+        assert len(counter.counts) <= 40
+    truth = Counter(keys)
+    for key, count in counter.counts.items():
+        assert truth[key] - counter.error <= count <= truth[key]
+    assert {key for key, _ in counter.top(5)} == {f"heavy{i}" for i in range(5)}
+
+
+def test_report_manifest_across_processes(tmp_path):
+    paths = _paths()
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("\n".join(paths) + "\n", encoding="utf-8")
+    expected = report_batch("windows", paths, file_added=True).to_dict()
+    assert report_manifest("windows", str(manifest), workers=1).to_dict() == expected
+    assert report_manifest("windows", str(manifest), workers=3).to_dict() == expected
+
+    small = report_manifest("windows", str(manifest), workers=3, max_folders=2, max_characters=3)
+    assert small.folders.capacity == 2 and small.characters.capacity == 3
+    assert len(small.top_folders()) <= 4 and small.folder_error > 0
@@ -0,0 +1,56 @@
+from collections import Counter
+
+import pytest
+
+from FPV.Helpers.batch import validate_batch
+from FPV.Helpers.corpus import PathCorpus
+from FPV.Helpers.sampling import (
+    estimate_manifest, estimate_stream, reservoir_sample, sample_file, wilson_interval,
+)
+
+
+def test_reservoir_is_uniform_and_counts_the_stream():
+    counts = Counter()
+    for seed in range(3000):
+        sample, total = reservoir_sample(iter(range(40)), 4, seed=seed)
+        assert total == 40 and len(set(sample)) == 4
+        counts.update(sample)
+    assert len(counts) == 40
+    assert all(abs(count - 300) < 75 for count in counts.values())  # 3000 * 4 / 40 each
+
+    assert reservoir_sample(iter("abc"), 5) == (list("abc"), 3)
+    assert reservoir_sample(iter("abc"), 0) == ([], 3)
+    assert reservoir_sample(range(10 ** 5), 10, seed=1) == reservoir_sample(range(10 ** 5), 10, seed=1)
+
+
+def test_wilson_interval():
+    rate, low, high = wilson_interval(0.5, 100)
+    assert rate == 0.5 and low == pytest.approx(0.4038, abs=1e-4) and high == pytest.approx(0.5962, abs=1e-4)
+    assert wilson_interval(0.0, 50).low == 0.0 and 0 < wilson_interval(0.0, 50).high < 0.08
+
+
+def test_full_reservoir_gives_the_exact_rates():
+    paths = list(PathCorpus("sharepoint", seed=6, violation_rate=0.3).paths(300))
+    result = estimate_stream("sharepoint", iter(paths), k=1000)
+    results = list(validate_batch("sharepoint", paths, file_added=True))
+    assert result.sampled == result.population == len(paths)
+    assert result.invalid.rate == pytest.approx(sum(not r.is_valid for r in results) / len(paths))
+    for name, count in Counter(name for r in results for name in r.categories).items():
+        assert result.categories[name].rate == pytest.approx(count / len(paths))
+
+
+def test_random_seeks_undo_the_length_bias(tmp_path):
+    # 10% of the records are long and invalid, but they hold most of the bytes.
+    records = ["Docs\\notes.txt"] * 900 + ["Docs\\" + "x" * 300 + ".txt"] * 100
+    manifest = tmp_path / "m.txt"
+    manifest.write_text("\n".join(records) + "\n", encoding="utf-8")
+
+    sample, weights, population = sample_file(str(manifest), 4000, seed=2)
+    assert sum(len(record) > 100 for record in sample) > len(sample) / 2
+    assert population == pytest.approx(1000, rel=0.1)
+
+    result = estimate_manifest("windows", str(manifest), k=4000, seed=2)
+    assert result.invalid.low <= 0.1 <= result.invalid.high
+    assert result.categories["PATH_LENGTH"].rate == result.invalid.rate
+    assert result.effective_size < result.sampled
+    assert estimate_manifest("windows", str(manifest), k=50, seed=3) == estimate_manifest("windows", str(manifest), k=50, seed=3)
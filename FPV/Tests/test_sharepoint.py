@@ -0,0 +1,8 @@
+from FPV.Helpers.sharepoint import FPV_SharePoint
+
+
+def test_clean_removes_the_restricted_prefix():
+    sharepoint = FPV_SharePoint("~$doc/report.txt", sep="/", auto_validate=False, file_added=True)
+    issues = sharepoint.validate(raise_error=False)
+    assert [issue["category"] for issue in issues] == ["RESTRICTED_PREFIX"]
+    assert sharepoint.clean(raise_error=False) == "/doc/report.txt"
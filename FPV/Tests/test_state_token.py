@@ -0,0 +1,81 @@
+import json
+import pytest
+from FPV.Helpers.os_classes import FPV_Windows
+from FPV.Helpers.egnyte import FPV_Egnyte
+
+
+def build_windows_validator():
+    validator = FPV_Windows("C:\\Users", relative=False, auto_validate=False)
+    for i in range(20):
+        validator.add_part(f"folder{i}|")
+    validator.add_part("report?.txt", is_file=True)
+    return validator
+
+
+def test_round_trip_restores_parts_statuses_and_issues():
+    validator = build_windows_validator()
+    token = validator.to_state_token(secret="test-secret")
+
+    restored = FPV_Windows.from_state("", state_token=token, secret="test-secret", relative=False)
+
+    assert restored.get_path_parts() == validator.get_path_parts()
+    assert restored._path_helper.path_length == validator._path_helper.path_length
+    assert [p["checked_status"] for p in restored._path_helper.parts] == [p["checked_status"] for p in validator._path_helper.parts]
+    original = [(i["category"], i["details"].get("index")) for i in validator.get_logs()["issues"]]
+    loaded = [(i["category"], i["details"].get("index")) for i in restored.get_logs()["issues"]]
+    assert loaded == original
+
+
+def test_token_is_much_smaller_than_path_and_errors():
+    validator = build_windows_validator()
+    token = validator.to_state_token(secret="test-secret")
+    payload = {"base_path": validator.get_full_path(), "errors": validator.get_current_state()["errors"]}
+    assert len(token) * 5 < len(json.dumps(payload))
+
+
+def test_restored_validator_keeps_building_incrementally():
+    validator = FPV_Egnyte("folder", auto_validate=False)
+    validator.add_part("._hidden")
+    token = validator.to_state_token(secret="test-secret")
+
+    restored = FPV_Egnyte.from_state("", state_token=token, secret="test-secret")
+    restored.add_part("file.txt", is_file=True)
+
+    assert restored.get_full_path() == "/folder/._hidden/file.txt"
+    assert restored.get_issues_for_part(1)[0]["category"] == "PREFIX"
+    assert restored.get_issues_for_part(2) == []
+
+
+def test_tampered_or_foreign_tokens_are_rejected():
+    token = build_windows_validator().to_state_token(secret="test-secret")
+
+    with pytest.raises(ValueError, match="signature"):
+        FPV_Windows.from_state("", state_token=token, secret="other-secret", relative=False)
+
+    tampered = token[:10] + ("A" if token[10] != "A" else "B") + token[11:]
+    with pytest.raises(ValueError):
+        FPV_Windows.from_state("", state_token=tampered, secret="test-secret", relative=False)
+
+
+def test_other_token_versions_are_rejected():
+    import base64
+    from FPV.Helpers._state_token import SIGNATURE_SIZE, _sign
+
+    token = build_windows_validator().to_state_token(secret="test-secret")
+    raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+    payload = bytes((1,)) + raw[1:-SIGNATURE_SIZE]
+    old = base64.urlsafe_b64encode(payload + _sign(payload, "test-secret")).rstrip(b"=").decode("ascii")
+    with pytest.raises(ValueError, match="version 1"):
+        FPV_Windows.from_state("", state_token=old, secret="test-secret", relative=False)
+
+
+def test_tokens_from_another_ruleset_are_rejected(monkeypatch):
+    token = build_windows_validator().to_state_token(secret="test-secret")
+    monkeypatch.setattr(FPV_Windows, "invalid_characters", "<>")
+    FPV_Windows.ruleset_fingerprint(refresh=True)
+    try:
+        with pytest.raises(ValueError, match="ruleset"):
+            FPV_Windows.from_state("", state_token=token, secret="test-secret", relative=False)
+    finally:
+        monkeypatch.undo()
+        FPV_Windows.ruleset_fingerprint(refresh=True)
@@ -0,0 +1,47 @@
+import random
+
+from FPV.Helpers.corpus import PathCorpus
+from FPV.Helpers.subtree import SubtreeIndex
+
+
+def _path_length_failures(cls, sep, prefix, name, entries):
+    failing = []
+    for entry in entries:
+        path = sep.join(part for part in (prefix, name, entry) if part)
+        issues = cls(path, auto_validate=False, file_added=True).validate(raise_error=False)
+        if any(issue["category"] == "PATH_LENGTH" for issue in issues):
+            failing.append(entry)
+    return failing
+
+
+def test_queries_match_the_validator():
+    rng = random.Random(4)
+    for service in ("windows", "sharepoint", "egnyte"):
+        corpus = PathCorpus(service, seed=4, depth=(1, 6), long_part_rate=0.2, fit_length=False)
+        sep = corpus.sep
+        entries = sorted(set(corpus.paths(150)))
+        index = SubtreeIndex(service, "Project files", entries)
+        longest = corpus.cls.max_length // 4
+        prefixes = [""] + [sep.join("x" * rng.randint(1, longest) for _ in range(rng.randint(1, 6))) for _ in range(15)]
+        for prefix in prefixes:
+            expected = _path_length_failures(corpus.cls, sep, prefix, "Project files", [""] + entries)
+            check = index.check_move(prefix)
+            assert check.valid == (not expected), (service, prefix)
+            assert sorted(index.offenders(prefix)) == sorted(expected)
+
+
+def test_services_without_a_length_limit():
+    index = SubtreeIndex("linux", "top", ["a" * 4000])
+    assert index.check_move("b" * 4000).valid and index.offenders("b" * 4000) == []
+
+
+def test_from_tree(tmp_path):
+    top = tmp_path / "Alpha"
+    (top / "docs" / "deep").mkdir(parents=True)
+    (top / "docs" / "deep" / ("n" * 100 + ".txt")).write_text("")
+    index = SubtreeIndex.from_tree("sharefile", str(top))
+    assert len(index) == 4 and index.max_depth == 3
+    assert index.check_move("short").valid
+    check = index.check_move("long" * 30)
+    assert not check.valid and check.excess > 0
+    assert index.offenders("long" * 30, limit=1) == ["docs/deep/" + "n" * 100 + ".txt"]
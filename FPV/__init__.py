@@ -1 +1,16 @@
-from FPV.Helpers import *
\ No newline at end of file
+# Re-export the service classes lazily; see FPV/Helpers/__init__.py.
+
+from FPV.Helpers import __all__
+
+
+def __getattr__(name):
+    if name in __all__:
+        from FPV import Helpers
+        value = getattr(Helpers, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
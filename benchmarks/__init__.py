@@ -0,0 +1 @@
+"""Offline throughput and memory benchmarks for FPV. Run with `python -m benchmarks`."""
@@ -0,0 +1,96 @@
+"""
+Command line entry point:
+
+    python -m benchmarks --output bench.json
+    python -m benchmarks --quick --compare bench.json
+    python -m benchmarks --imports
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+from benchmarks.imports import IMPORT_BUDGETS_MS, check_budgets, import_time_ms
+from benchmarks.suite import INVALID_RATIOS, OPERATIONS, SERVICES, SHAPES, compare, run_suite
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the FPV benchmark suite.")
+    parser.add_argument("--count", type=int, default=200, help="Paths per case")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repeats per case (best is kept)")
+    parser.add_argument("--quick", action="store_true", help="Small run for smoke testing (count=20, repeat=1)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--services", nargs="+", choices=list(SERVICES))
+    parser.add_argument("--shapes", nargs="+", choices=list(SHAPES))
+    parser.add_argument("--ratios", nargs="+", type=float, choices=list(INVALID_RATIOS))
+    parser.add_argument("--operations", nargs="+", choices=list(OPERATIONS))
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Throughput drop that counts as a regression")
+    parser.add_argument("--imports", action="store_true", help="Only check import-time budgets")
+    args = parser.parse_args(argv)
+
+    if args.imports:
+        for statement, budget in IMPORT_BUDGETS_MS.items():
+            print(f"{statement:<40} {import_time_ms(statement):>7.1f} ms (budget {budget:.0f} ms)")
+        over = check_budgets()
+        for statement, measured, budget in over:
+            print(f"OVER BUDGET {statement}: {measured:.1f} ms > {budget:.0f} ms")
+        return 1 if over else 0
+
+    count, repeat = (20, 1) if args.quick else (args.count, args.repeat)
+    results = run_suite(
+        count=count, repeat=repeat, services=args.services, shapes=args.shapes,
+        ratios=args.ratios, operations=args.operations, seed=args.seed, memory=not args.no_memory,
+    )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "count": count,
+            "repeat": repeat,
+            "seed": args.seed,
+            "fingerprints": {name: cls.ruleset_fingerprint() for name, cls in SERVICES.items()},
+        },
+        "results": results,
+    }
+
+    for case in results:
+        label = f"{case['operation']:<12} {case['service']:<11} {case['shape']:<10} {case['invalid_ratio']:>4.0%}"
+        if "skipped" in case:
+            print(f"{label}  skipped ({case['skipped']})")
+        else:
+            memory = f"{case['bytes_per_path']:>9.0f} B/path" if "bytes_per_path" in case else ""
+            print(f"{label}  {case['paths_per_sec']:>10.0f} paths/s {memory}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(baseline, results, threshold=args.threshold)
+        for key, old, new, change in regressions:
+            print(f"REGRESSION {' '.join(map(str, key))}: {old:.0f} -> {new:.0f} paths/s ({change:+.1%})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
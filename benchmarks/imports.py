@@ -0,0 +1,59 @@
+"""
+Import-time budgets.
+
+Each statement runs in a fresh interpreter with `-X importtime`; the cost is
+the cumulative time of the modules it imported on top of a bare interpreter,
+best of `repeat` runs. Budgets are deliberately loose so they only trip on
+real regressions (an eager import of every service, Quart at import time).
+"""
+
+import subprocess
+import sys
+
+# statement -> budget in milliseconds
+IMPORT_BUDGETS_MS = {
+    "import FPV": 15.0,
+    "from FPV import FPV_Windows": 60.0,
+    "from FPV.Helpers import FPV_Egnyte": 60.0,
+    "import FPV.API.api": 80.0,
+}
+
+
+def _top_level_import_us(stderr: str) -> int:
+    total = 0
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Nested imports are indented under their parent and already counted in it.
+        if cumulative.strip().isdigit() and not name.startswith("  "):
+            total += int(cumulative)
+    return total
+
+
+def import_time_ms(statement: str, repeat: int = 5) -> float:
+    """Best-of-`repeat` import cost of `statement` in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        baseline = subprocess.run([sys.executable, "-X", "importtime", "-c", "pass"], capture_output=True, text=True)
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", statement], capture_output=True, text=True, check=True)
+        cost = (_top_level_import_us(result.stderr) - _top_level_import_us(baseline.stderr)) / 1000
+        best = cost if best is None else min(best, cost)
+    return max(best, 0.0)
+
+
+def loaded_modules(statement: str) -> set:
+    """Names of the FPV and Quart modules loaded by `statement` in a fresh interpreter."""
+    code = f"{statement}\nimport sys\nprint('\\n'.join(m for m in sys.modules if m.startswith(('FPV', 'quart'))))"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+def check_budgets(budgets: dict = None, repeat: int = 5) -> list:
+    """Return (statement, measured ms, budget ms) for every statement over budget."""
+    over = []
+    for statement, budget in (budgets or IMPORT_BUDGETS_MS).items():
+        measured = import_time_ms(statement, repeat=repeat)
+        if measured > budget:
+            over.append((statement, measured, budget))
+    return over
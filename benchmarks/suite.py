@@ -0,0 +1,188 @@
+"""
+Benchmark cases for every service class, path shape and invalid ratio.
+
+Each case measures throughput (paths per second, best of N repeats) and
+memory (peak bytes allocated per path, measured with tracemalloc in a
+separate pass so it does not distort the timings).
+"""
+
+import asyncio
+import gc
+import os
+import time
+import tracemalloc
+
+from FPV.Helpers import FPV_Windows
+from FPV.Helpers._base import FPV_Base
+from FPV.Helpers.corpus import SERVICES, PathCorpus
+
+# name -> PathCorpus settings (folders per path, long folder names)
+SHAPES = {
+    "short": {"depth": 2, "long_part_rate": 0.0},
+    "deep": {"depth": 30, "long_part_rate": 0.0},
+    "long_part": {"depth": 2, "long_part_rate": 1.0, "long_part_length": (200, 200)},
+}
+
+INVALID_RATIOS = (0.0, 0.1, 1.0)
+
+OPERATIONS = ("validate", "clean", "incremental", "from_state", "routes")
+
+
+def make_paths(service: str, shape: str, invalid_ratio: float, count: int, seed: int = 0):
+    """
+    Return `count` deterministic paths from the synthetic corpus; each ends in a file part.
+    Paths without an injected violation are fitted under the service's max_length.
+    """
+    corpus = PathCorpus(service, seed=f"{seed}:{service}:{shape}:{invalid_ratio}",
+                        violation_rate=invalid_ratio, **SHAPES[shape])
+    return list(corpus.paths(count))
+
+
+def _validate(cls, paths):
+    for path in paths:
+        cls(path, auto_validate=False, file_added=True).validate(raise_error=False)
+
+
+def _clean(cls, paths):
+    for path in paths:
+        cls(path, auto_validate=False, file_added=True).clean(raise_error=False)
+
+
+def _incremental(cls, paths):
+    sep = "\\" if cls is FPV_Windows else "/"
+    for path in paths:
+        parts = path.split(sep)
+        validator = cls.from_state(parts[0])
+        for part in parts[1:-1]:
+            validator.add_part(part)
+        validator.add_part(parts[-1], is_file=True)
+        validator.remove_part(len(parts) - 1)
+
+
+def _prepare_states(cls, paths):
+    states = []
+    for path in paths:
+        validator = cls(path, auto_validate=False, file_added=True)
+        validator.validate(raise_error=False)
+        states.append((path, validator.get_current_state()["errors"]))
+    return states
+
+
+def _from_state(cls, states):
+    for path, errors in states:
+        cls.from_state(path, existing_errors=errors, file_added=True)
+
+
+def _route_client():
+    # Building the app must not leave a class-wide rule hook behind: the other
+    # operations share this process and would be timed with it.
+    saved_hook = FPV_Base.rule_hook
+    os.environ.setdefault("FPV_STATE_SECRET", "benchmark")
+    try:
+        from FPV.API.api import app
+    except ImportError as e:
+        return None, f"API unavailable: {e}"
+    finally:
+        FPV_Base.rule_hook = saved_hook
+    return app.test_client(), None
+
+
+def _routes(client, service, paths):
+    async def run():
+        for path in paths:
+            await client.post("/api/v1/isValid", json={"service": service, "path": path, "file_added": True})
+    asyncio.run(run())
+
+
+def _measure(func, repeat: int) -> float:
+    """Best wall time of `repeat` runs, with the GC paused as timeit does."""
+    best = float("inf")
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return best
+
+
+def _peak_bytes(func) -> int:
+    gc.collect()
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_suite(count: int = 200, repeat: int = 3, services=None, shapes=None, ratios=None, operations=None, seed: int = 0, memory: bool = True):
+    """
+    Run every requested case and return a list of result dicts.
+    Route cases are skipped, with a `skipped` reason, when Quart is not installed.
+    """
+    services = services or list(SERVICES)
+    shapes = shapes or list(SHAPES)
+    ratios = INVALID_RATIOS if ratios is None else ratios
+    operations = operations or list(OPERATIONS)
+
+    client, client_error = _route_client() if "routes" in operations else (None, None)
+    results = []
+
+    for service in services:
+        cls = SERVICES[service]
+        for shape in shapes:
+            for ratio in ratios:
+                paths = make_paths(service, shape, ratio, count, seed=seed)
+                states = _prepare_states(cls, paths) if "from_state" in operations else None
+                for operation in operations:
+                    case = {"operation": operation, "service": service, "shape": shape, "invalid_ratio": ratio, "paths": count}
+                    if operation == "validate":
+                        func = lambda: _validate(cls, paths)
+                    elif operation == "clean":
+                        func = lambda: _clean(cls, paths)
+                    elif operation == "incremental":
+                        func = lambda: _incremental(cls, paths)
+                    elif operation == "from_state":
+                        func = lambda: _from_state(cls, states)
+                    elif operation == "routes":
+                        if client is None:
+                            case["skipped"] = client_error
+                            results.append(case)
+                            continue
+                        func = lambda: _routes(client, service, paths)
+                    else:
+                        raise ValueError(f"Unknown operation: {operation}")
+
+                    elapsed = _measure(func, repeat)
+                    case["seconds"] = elapsed
+                    case["paths_per_sec"] = count / elapsed if elapsed else float("inf")
+                    if memory:
+                        case["bytes_per_path"] = _peak_bytes(func) / count
+                    results.append(case)
+    return results
+
+
+def case_key(case: dict) -> tuple:
+    return (case["operation"], case["service"], case["shape"], case["invalid_ratio"])
+
+
+def compare(baseline: list, current: list, threshold: float = 0.2) -> list:
+    """
+    Return (case, baseline paths/sec, current paths/sec, change) for every case whose
+    throughput dropped by more than `threshold` (0.2 = 20%) against the baseline.
+    """
+    previous = {case_key(case): case for case in baseline if "paths_per_sec" in case}
+    regressions = []
+    for case in current:
+        old = previous.get(case_key(case))
+        if old is None or "paths_per_sec" not in case:
+            continue
+        change = case["paths_per_sec"] / old["paths_per_sec"] - 1
+        if change < -threshold:
+            regressions.append((case_key(case), old["paths_per_sec"], case["paths_per_sec"], change))
+    return regressions